@@ -0,0 +1,489 @@
+"""
+Serviço HTTP do conversor, para uso por outros sistemas
+
+Rotas:
+    GET  /health             Estado do serviço e motor em uso
+    GET  /metrics            Latência por etapa (formato Prometheus)
+    POST /v1/split           {"text", "language", "chunk_size"} -> chunks
+    POST /v1/process         {"text", "speed_option", "voice_filter", "pitch"} -> texto processado
+    POST /v1/speech          {"text", "language", "speed_option", "voice_type",
+                              "voice_filter", "pitch"} -> audio/mpeg em streaming
+    GET  /v1/results/<id>    Áudio completo já gerado, com suporte a Range (também HEAD)
+
+Só "text" é obrigatório. O áudio de /v1/speech é enviado com
+Transfer-Encoding: chunked à medida que as partes ficam prontas, em ordem.
+Ao terminar, o arquivo unido (com cabeçalho Xing) fica em
+`API_CONFIG['results_dir']`, identificado pelo texto e pelos parâmetros:
+o cabeçalho Content-Location aponta para ele, e uma requisição igual é
+servida direto do arquivo.
+
+Cada cliente (cabeçalho X-Client-Id ou, sem ele, o IP) tem um limite de
+requisições de áudio simultâneas; acima dele a resposta é 429.
+
+Exemplo:
+    python api.py --port 8502
+    curl -X POST localhost:8502/v1/speech -d '{"text": "Olá!"}' -o ola.mp3
+"""
+import argparse
+import hashlib
+import json
+import math
+import os
+import re
+import sys
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+from config import (
+    API_CONFIG, LANGUAGES, LIMITS, SPEED_OPTIONS, VOICE_OPTIONS, VOICE_FILTERS,
+    PITCH_OPTIONS, SYNTHESIS_CONFIG
+)
+from utils.audio_utils import (
+    split_text, process_text_for_voice, text_to_speech, adaptive_chunk_size,
+    warm_up_resources
+)
+from utils.backends import get_backend, BackendTimeoutError
+from utils.metrics import metrics
+from utils.mp3 import MP3MergeWriter, audio_frame_spans
+from utils.retry import describe_error
+from utils.synthesis import TokenBucket, ChunkSynthesisError, iter_synthesized
+
+RESULT_ID_RE = re.compile(r'[0-9a-f]{64}')
+RANGE_RE = re.compile(r'bytes=(\d*)-(\d*)')
+
+# Parâmetros de síntese aceitos e valores padrão
+SPEECH_DEFAULTS = {
+    'language': 'pt',
+    'speed_option': 'normal',
+    'voice_type': 'feminina',
+    'voice_filter': 'normal',
+    'pitch': 'normal',
+}
+
+
+class APIError(Exception):
+    """Erro devolvido ao cliente como JSON com o status HTTP correspondente"""
+
+    def __init__(self, status, message, headers=None):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+        self.headers = headers or {}
+
+
+class ClientLimiter:
+    """
+    Limite de requisições simultâneas por cliente e no total (sem espera)
+    """
+
+    def __init__(self, per_client, total):
+        self.per_client = per_client
+        self.total = total
+        self._active = {}
+        self._active_total = 0
+        self._lock = threading.Lock()
+
+    @property
+    def active(self):
+        return self._active_total
+
+    @contextmanager
+    def slot(self, client):
+        with self._lock:
+            if self._active_total >= self.total:
+                raise APIError(HTTPStatus.SERVICE_UNAVAILABLE,
+                               "Servidor ocupado; tente novamente",
+                               {'Retry-After': '1'})
+            if self._active.get(client, 0) >= self.per_client:
+                raise APIError(HTTPStatus.TOO_MANY_REQUESTS,
+                               f"Limite de {self.per_client} requisições "
+                               f"simultâneas por cliente",
+                               {'Retry-After': '1'})
+            self._active[client] = self._active.get(client, 0) + 1
+            self._active_total += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._active_total -= 1
+                self._active[client] -= 1
+                if not self._active[client]:
+                    del self._active[client]
+
+
+def parse_range(header, size):
+    """
+    Intervalo (início, fim inclusivo) pedido em um cabeçalho Range
+
+    Returns:
+        tuple | None: None se o cabeçalho deve ser ignorado (ausente,
+        malformado ou com vários trechos) e o arquivo servido inteiro
+
+    Raises:
+        APIError: 416 se o trecho começa depois do fim do arquivo
+    """
+    match = RANGE_RE.fullmatch(header.strip()) if header else None
+    if match is None or match.groups() == ('', ''):
+        return None
+
+    first, last = match.groups()
+    if not first:
+        # Sufixo: os últimos N bytes
+        start, end = max(0, size - int(last)), size - 1
+    else:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+        if last and int(last) < start:
+            return None
+
+    if start >= size or end < start:
+        raise APIError(HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE,
+                       "Intervalo fora do arquivo",
+                       {'Content-Range': f'bytes */{size}'})
+    return start, end
+
+
+def speech_params(data):
+    """
+    Valida o corpo de /v1/speech
+
+    Returns:
+        tuple: (texto, dict com os parâmetros de SPEECH_DEFAULTS)
+    """
+    text = data.get('text')
+    if not isinstance(text, str) or not text.strip():
+        raise APIError(HTTPStatus.BAD_REQUEST, "Campo 'text' obrigatório")
+    if len(text) > API_CONFIG['max_text_chars']:
+        raise APIError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+                       f"Texto maior que {API_CONFIG['max_text_chars']:,} caracteres")
+
+    params = {name: data.get(name, default) for name, default in SPEECH_DEFAULTS.items()}
+    choices = {
+        'language': LANGUAGES,
+        'speed_option': SPEED_OPTIONS,
+        'voice_type': VOICE_OPTIONS.get(params['language'], {'feminina': None}),
+        'voice_filter': VOICE_FILTERS,
+        'pitch': PITCH_OPTIONS,
+    }
+    for name, options in choices.items():
+        if params[name] not in options:
+            raise APIError(HTTPStatus.BAD_REQUEST,
+                           f"Valor inválido para '{name}': {params[name]!r} "
+                           f"(opções: {', '.join(options)})")
+    return text, params
+
+
+def result_id(text, params, backend_name):
+    """
+    Identificador do resultado: hash do texto, do motor e dos parâmetros
+    """
+    payload = '\x1f'.join([text, backend_name] + [params[name] for name in SPEECH_DEFAULTS])
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def _error_status(error):
+    if isinstance(error, BackendTimeoutError):
+        return HTTPStatus.GATEWAY_TIMEOUT
+    if getattr(error, 'retryable', False):
+        return HTTPStatus.SERVICE_UNAVAILABLE
+    return HTTPStatus.BAD_GATEWAY
+
+
+class APIHandler(BaseHTTPRequestHandler):
+    """Rotas do serviço (uma thread por conexão, com keep-alive)"""
+
+    protocol_version = 'HTTP/1.1'
+    server_version = 'TextToVoice/1.0'
+
+    def do_GET(self):
+        self._dispatch('GET')
+
+    def do_HEAD(self):
+        self._dispatch('HEAD')
+
+    def do_POST(self):
+        self._dispatch('POST')
+
+    def _dispatch(self, method):
+        path = urlsplit(self.path).path
+        try:
+            if method == 'POST':
+                data = self._read_json()
+                if path == '/v1/speech':
+                    self._speech(data)
+                elif path == '/v1/split':
+                    self._split(data)
+                elif path == '/v1/process':
+                    self._process(data)
+                else:
+                    raise APIError(HTTPStatus.NOT_FOUND, "Rota não encontrada")
+            elif path == '/health':
+                self._send_json(HTTPStatus.OK, {
+                    'status': 'ok', 'backend': get_backend().name,
+                    'active_requests': self.server.limiter.active,
+                }, head=method == 'HEAD')
+            elif path == '/metrics':
+                self._send_body(HTTPStatus.OK, metrics.to_prometheus().encode('utf-8'),
+                                'text/plain; version=0.0.4', head=method == 'HEAD')
+            elif path.startswith('/v1/results/'):
+                self._serve_result(path[len('/v1/results/'):], head=method == 'HEAD')
+            else:
+                raise APIError(HTTPStatus.NOT_FOUND, "Rota não encontrada")
+        except APIError as e:
+            self._send_json(e.status, {'error': e.message}, headers=e.headers,
+                            head=method == 'HEAD')
+        except Exception as e:
+            self.log_error("Erro ao atender %s: %r", path, e)
+            self.close_connection = True
+            self._send_json(HTTPStatus.INTERNAL_SERVER_ERROR, {'error': str(e)},
+                            head=method == 'HEAD')
+
+    def _client_id(self):
+        return self.headers.get('X-Client-Id') or self.client_address[0]
+
+    def _read_json(self):
+        if 'chunked' in self.headers.get('Transfer-Encoding', '').lower():
+            self.close_connection = True
+            raise APIError(HTTPStatus.LENGTH_REQUIRED, "Envie o corpo com Content-Length")
+        try:
+            length = int(self.headers.get('Content-Length') or 0)
+        except ValueError:
+            length = -1
+        # Texto no limite em UTF-8 (até 4 bytes por caractere) e os demais campos
+        if not 0 <= length <= API_CONFIG['max_text_chars'] * 4 + 4096:
+            self.close_connection = True  # O corpo não será lido
+            raise APIError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "Corpo da requisição muito grande")
+
+        try:
+            data = json.loads(self.rfile.read(length) or b'{}')
+        except ValueError:
+            raise APIError(HTTPStatus.BAD_REQUEST, "JSON inválido")
+        if not isinstance(data, dict):
+            raise APIError(HTTPStatus.BAD_REQUEST, "O corpo deve ser um objeto JSON")
+        return data
+
+    def _split(self, data):
+        text, params = speech_params(data)
+        chunk_size = data.get('chunk_size')
+        if chunk_size is None:
+            chunk_size = adaptive_chunk_size(text, params['language'])
+        # bool é subclasse de int: `true` no JSON não é um tamanho
+        max_size = min(LIMITS['max_chars'], get_backend().max_chars or LIMITS['max_chars'])
+        if (isinstance(chunk_size, bool) or not isinstance(chunk_size, int)
+                or not 0 < chunk_size <= max_size):
+            raise APIError(HTTPStatus.BAD_REQUEST,
+                           f"'chunk_size' deve ser um inteiro entre 1 e {max_size}")
+        chunks = split_text(text, chunk_size)
+        self._send_json(HTTPStatus.OK, {'chunk_size': chunk_size, 'chunks': chunks})
+
+    def _process(self, data):
+        text, params = speech_params(data)
+        processed = process_text_for_voice(
+            text, params['speed_option'], params['voice_filter'], params['pitch'])
+        self._send_json(HTTPStatus.OK, {'text': processed})
+
+    def _speech(self, data):
+        text, params = speech_params(data)
+        rid = result_id(text, params, get_backend().name)
+        path = self.server.result_path(rid)
+        headers = {'Content-Location': f'/v1/results/{rid}'}
+
+        if os.path.exists(path):
+            headers['X-Cache'] = 'hit'
+            self._serve_file(path, None, headers=headers)
+            return
+
+        with self.server.limiter.slot(self._client_id()):
+            with metrics.timer('api_speech'):
+                self._stream_speech(text, params, path, headers)
+
+    def _stream_speech(self, text, params, path, headers):
+        """
+        Envia as partes em ordem assim que ficam prontas e grava o arquivo unido
+
+        Os cabeçalhos só são enviados com a primeira parte pronta, então uma
+        falha logo no início ainda vira uma resposta de erro; depois disso,
+        a conexão é encerrada sem o chunk final para sinalizar a falha.
+        """
+        language, speed_option = params['language'], params['speed_option']
+        chunks = split_text(text, adaptive_chunk_size(text, language))
+
+        def synthesize(chunk):
+            return text_to_speech(
+                chunk, language, SPEED_OPTIONS[speed_option]['slow'], speed_option,
+                params['voice_type'], params['voice_filter'], params['pitch'],
+                rate_limiter=self.server.rate_limiter)
+
+        pipeline = iter_synthesized(
+            chunks, synthesize,
+            max_workers=SYNTHESIS_CONFIG['max_workers'],
+            lookahead=SYNTHESIS_CONFIG['lookahead'])
+
+        fd, tmp_path = tempfile.mkstemp(dir=self.server.results_dir, suffix='.tmp')
+        started = False
+        try:
+            with os.fdopen(fd, 'wb') as result_file:
+                writer = MP3MergeWriter(result_file)
+                for _, _, audio in pipeline:
+                    if not started:
+                        self.send_response(HTTPStatus.OK)
+                        self.send_header('Content-Type', 'audio/mpeg')
+                        self.send_header('Transfer-Encoding', 'chunked')
+                        self.send_header('X-Chunks', str(len(chunks)))
+                        self.send_header('X-Cache', 'miss')
+                        for name, value in headers.items():
+                            self.send_header(name, value)
+                        self.end_headers()
+                        started = True
+
+                    writer.add(audio)
+                    # Só os quadros de áudio: tags e quadros Xing de cada parte
+                    # atrapalhariam os players no meio do fluxo
+                    view = memoryview(audio)
+                    self._write_chunk([view[start:end]
+                                       for start, end in audio_frame_spans(audio)[0]])
+                writer.finish()
+            # Publicar antes do chunk final: quem recebe o fim da resposta
+            # já encontra o arquivo em Content-Location
+            os.replace(tmp_path, path)
+            self.wfile.write(b'0\r\n\r\n')
+        except (BrokenPipeError, ConnectionResetError):
+            self.close_connection = True  # O cliente desistiu
+        except ChunkSynthesisError as e:
+            if not started:
+                retry_after = math.ceil(getattr(e.cause, 'retry_after', None) or 1)
+                raise APIError(_error_status(e.cause), describe_error(e.cause),
+                               {'Retry-After': str(retry_after)})
+            self.log_error("Falha no meio do streaming: %s", e)
+            self.close_connection = True
+        except Exception as e:
+            if not started:
+                raise
+            self.log_error("Falha no meio do streaming: %r", e)
+            self.close_connection = True
+        finally:
+            pipeline.close()  # Cancela as partes pendentes
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def _write_chunk(self, views):
+        size = sum(view.nbytes for view in views)
+        if not size:
+            return  # Um chunk vazio encerraria a resposta
+        self.wfile.write(f'{size:x}\r\n'.encode('ascii'))
+        for view in views:
+            self.wfile.write(view)
+        self.wfile.write(b'\r\n')
+
+    def _serve_result(self, rid, head=False):
+        path = self.server.result_path(rid) if RESULT_ID_RE.fullmatch(rid) else None
+        if path is None or not os.path.exists(path):
+            raise APIError(HTTPStatus.NOT_FOUND, "Resultado não encontrado")
+        self._serve_file(path, self.headers.get('Range'), head=head)
+
+    def _serve_file(self, path, range_header, headers=None, head=False):
+        with open(path, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            byte_range = parse_range(range_header, size)
+            start, end = byte_range or (0, size - 1)
+
+            self.send_response(HTTPStatus.PARTIAL_CONTENT if byte_range else HTTPStatus.OK)
+            self.send_header('Content-Type', 'audio/mpeg')
+            self.send_header('Accept-Ranges', 'bytes')
+            self.send_header('Content-Length', str(end - start + 1))
+            if byte_range:
+                self.send_header('Content-Range', f'bytes {start}-{end}/{size}')
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+
+            if not head and end >= start:
+                try:
+                    self.connection.sendfile(f, start, end - start + 1)
+                except (BrokenPipeError, ConnectionResetError):
+                    self.close_connection = True
+
+    def _send_json(self, status, payload, headers=None, head=False):
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self._send_body(status, body, 'application/json; charset=utf-8', headers, head)
+
+    def _send_body(self, status, body, content_type, headers=None, head=False):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        if self.close_connection:
+            self.send_header('Connection', 'close')
+        self.end_headers()
+        if not head:
+            self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        if not self.server.quiet:
+            super().log_message(format, *args)
+
+
+class APIServer(ThreadingHTTPServer):
+    """Servidor com os limites e o diretório de resultados compartilhados"""
+
+    daemon_threads = True
+
+    def __init__(self, address, quiet=False):
+        super().__init__(address, APIHandler)
+        self.quiet = quiet
+        self.results_dir = API_CONFIG['results_dir']
+        os.makedirs(self.results_dir, exist_ok=True)
+        self.limiter = ClientLimiter(
+            API_CONFIG['client_concurrency'], API_CONFIG['max_concurrency'])
+
+        rate = API_CONFIG['backend_rate'].get(get_backend().name)
+        self.rate_limiter = TokenBucket(*rate) if rate else None
+
+        self.purge_results(time.time() - API_CONFIG['retention_hours'] * 3600)
+
+    def result_path(self, rid):
+        return os.path.join(self.results_dir, f'{rid}.mp3')
+
+    def purge_results(self, older_than):
+        """
+        Remove resultados (e temporários abandonados) anteriores a `older_than`
+        """
+        removed = 0
+        for name in os.listdir(self.results_dir):
+            path = os.path.join(self.results_dir, name)
+            if name.endswith(('.mp3', '.tmp')) and os.path.getmtime(path) < older_than:
+                os.remove(path)
+                removed += 1
+        return removed
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Serviço HTTP de conversão de texto em áudio")
+    parser.add_argument('--host', default=API_CONFIG['host'])
+    parser.add_argument('--port', type=int, default=API_CONFIG['port'])
+    parser.add_argument('--quiet', action='store_true', help="Não registrar cada requisição")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    warm_up_resources()
+    server = APIServer((args.host, args.port), quiet=args.quiet)
+    print(f"Servindo em http://{args.host}:{server.server_address[1]} "
+          f"(motor: {get_backend().name})", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,16 +1,25 @@
 import streamlit as st
-import io
 import time
 from datetime import datetime
 from config import (
     LANGUAGES, UI_CONFIG, LIMITS, SPEED_OPTIONS, QUALITY_OPTIONS,
-    VOICE_OPTIONS, VOICE_FILTERS, PITCH_OPTIONS
+    VOICE_OPTIONS, VOICE_FILTERS, PITCH_OPTIONS, JOBS_CONFIG
 )
 from utils.audio_utils import (
-    text_to_speech, split_text, get_download_link,
-    get_multiple_download_links, get_audio_info, estimate_duration,
-    get_voice_preview_text
+    text_to_speech, get_part_filename, format_duration,
+    get_audio_info, get_voice_preview_text, get_audio_cache,
+    warm_up_resources, adaptive_chunk_size
 )
+from utils.chunking import get_chunk_controller
+from utils.distributed import get_coordinator
+from utils.backends import get_backend
+from utils.jobs import get_job_manager, QUEUED, RUNNING, FAILED
+from utils.metrics import metrics, STAGE_LABELS
+from utils.previews import get_preview_bundle, preview_bundle_status
+from utils.resources import http_session_stats
+from utils.retry import circuit_states, describe_error
+from utils.speech_rate import get_speech_rate_model
+from utils.text_stats import text_stats
 
 # Configuração da página
 st.set_page_config(
@@ -21,7 +30,17 @@ st.set_page_config(
 )
 
 
+@st.cache_resource
+def load_shared_resources():
+    """Carrega uma única vez por servidor os recursos compartilhados entre sessões"""
+    resources = warm_up_resources()
+    get_preview_bundle()  # Mapeia os previews prontos (ou os gera em segundo plano)
+    return resources
+
+
 def main():
+    load_shared_resources()
+
     # Header com estilo
     st.markdown("""
     <div style='text-align: center; padding: 20px; background: linear-gradient(90deg, #667eea 0%, #764ba2 100%); border-radius: 10px; margin-bottom: 30px;'>
@@ -105,22 +124,36 @@ def main():
         st.markdown("### Teste de Voz")
 
         if st.button("Testar Voz", use_container_width=True):
-            preview_text = get_voice_preview_text(voice_type, voice_filter)
-
-            with st.spinner("Gerando preview..."):
-                preview_audio = text_to_speech(
-                    preview_text,
-                    selected_lang,
-                    SPEED_OPTIONS[speed_option]['slow'],
-                    speed_option,
-                    voice_type,
-                    voice_filter,
-                    pitch_option
-                )
+            # Preview pronto no bundle: sem chamada ao motor
+            bundle = get_preview_bundle()
+            preview_audio = bundle.get(
+                selected_lang, voice_type, voice_filter, speed_option, pitch_option
+            ) if bundle is not None else None
+
+            if preview_audio is not None:
+                st.audio(bytes(preview_audio), format='audio/mp3')
+            else:
+                preview_text = get_voice_preview_text(voice_type, voice_filter)
+
+                with st.spinner("Gerando preview..."):
+                    try:
+                        preview_audio = text_to_speech(
+                            preview_text,
+                            selected_lang,
+                            SPEED_OPTIONS[speed_option]['slow'],
+                            speed_option,
+                            voice_type,
+                            voice_filter,
+                            pitch_option
+                        )
+                    except Exception as e:
+                        st.error(describe_error(e))
+                    else:
+                        st.audio(preview_audio, format='audio/mp3')
+                        st.success("Preview gerado!")
 
-                if preview_audio:
-                    st.audio(preview_audio, format='audio/mp3')
-                    st.success("Preview gerado!")
+        if preview_bundle_status()['state'] == 'building':
+            st.caption("Preparando previews instantâneos em segundo plano...")
 
         # Opções avançadas
         st.markdown("---")
@@ -145,8 +178,10 @@ def main():
         # Informações do sistema
         st.markdown("---")
         st.markdown("### Informações")
-        st.info(f"**Limite por chunk:** {LIMITS['chunk_size']} caracteres")
-        st.info("**Formato:** MP3 (gTTS)")
+        # Preenchido depois de ler o texto: o tamanho é escolhido por texto
+        chunk_info = st.empty()
+        chunk_info.info(f"**Limite por chunk:** ajustado ao texto (padrão {LIMITS['chunk_size']} caracteres)")
+        st.info(f"**Formato:** MP3 ({get_backend().label})")
 
         # Estatísticas da sessão
         if 'conversions_count' not in st.session_state:
@@ -162,6 +197,20 @@ def main():
         with col2:
             st.metric("Caracteres", f"{st.session_state.total_chars:,}")
 
+        audio_cache = get_audio_cache()
+        if audio_cache is not None:
+            cache_stats = audio_cache.stats()
+            col1, col2 = st.columns(2)
+            with col1:
+                st.metric("Cache (acertos)", cache_stats['hits'])
+            with col2:
+                st.metric("Cache (falhas)", cache_stats['misses'])
+
+        # Desempenho (opcional)
+        st.markdown("---")
+        if st.checkbox("Mostrar desempenho", value=False):
+            show_performance_panel()
+
     # Área principal
     col1, col2 = st.columns([2, 1])
 
@@ -177,23 +226,24 @@ def main():
 
         # Informações do texto em tempo real
         if text_input:
-            char_count = len(text_input)
-            word_count = len(text_input.split())
-            estimated_duration = estimate_duration(text_input, speed_option)
+            chunk_size = adaptive_chunk_size(text_input, selected_lang, log=False)
+            chunk_info.info(f"**Limite por chunk:** {chunk_size} caracteres")
+            stats = text_stats(text_input, selected_lang, chunk_size, voice_type, voice_filter)
 
             col_info1, col_info2, col_info3 = st.columns(3)
             with col_info1:
-                st.metric("Caracteres", f"{char_count:,}")
+                st.metric("Caracteres", f"{stats['chars']:,}")
             with col_info2:
-                st.metric("Palavras", f"{word_count:,}")
+                st.metric("Palavras", f"{stats['words']:,}")
             with col_info3:
-                st.metric("⏱Duração estimada", estimated_duration)
+                st.metric("⏱Duração estimada",
+                          format_duration(stats['durations'][speed_option]))
+
+            st.caption(f"{stats['sentences']:,} sentenças · {stats['paragraphs']:,} parágrafos")
 
-            if char_count > LIMITS['chunk_size']:
-                chunks_needed = len(split_text(
-                    text_input, LIMITS['chunk_size']))
+            if stats['chars'] > chunk_size:
                 st.info(
-                    f"ℹ️ Texto longo detectado! Será dividido em **{chunks_needed} partes**.")
+                    f"ℹ️ Texto longo detectado! Será dividido em **{stats['chunks']} partes**.")
 
     with col2:
         # Painel de controle
@@ -237,97 +287,150 @@ def main():
                 st.text_area("", value=preview_text, height=150,
                              disabled=True, key="preview")
 
-    # Processamento
+    # Processamento em segundo plano: a sessão guarda apenas o id do job
     if generate_button and text_input.strip():
-        process_text_to_speech(
-            text_input, selected_lang, speed_option, merge_option,
-            voice_type, voice_filter, pitch_option
+        # O job anterior da sessão guarda as fronteiras dos chunks: só os
+        # trechos editados desde então são sintetizados de novo
+        st.session_state.job_id = get_job_manager().submit(
+            text_input, selected_lang, speed_option, voice_type, voice_filter,
+            pitch_option, merge=merge_option == "Arquivo único",
+            previous_job_id=st.session_state.get('job_id')
         )
 
-
-def process_text_to_speech(text, language, speed_option, merge_option,
-                           voice_type, voice_filter, pitch_option):
-    """Processa a conversão de texto para áudio com configurações avançadas de voz"""
-
-    with st.spinner("Gerando áudio com configurações personalizadas..."):
-        progress_bar = st.progress(0)
-        status_text = st.empty()
-
-        try:
-            # Determinar configurações
-            use_slow = SPEED_OPTIONS[speed_option]['slow']
-
-            # Verificar se precisa dividir o texto
-            if len(text) <= LIMITS['chunk_size']:
-                # Texto curto - processamento direto
-                status_text.text("Convertendo texto em áudio...")
-                progress_bar.progress(50)
-
-                audio_data = text_to_speech(
-                    text, language, use_slow, speed_option,
-                    voice_type, voice_filter, pitch_option
-                )
-                progress_bar.progress(100)
-
-                if audio_data:
-                    display_single_audio_result(
-                        audio_data, text, speed_option, voice_type, voice_filter
-                    )
-                    st.session_state.conversions_count += 1
-                    st.session_state.total_chars += len(text)
-
-            else:
-                # Texto longo
-                chunks = split_text(text, LIMITS['chunk_size'])
-                total_chunks = len(chunks)
-
-                status_text.text(
-                    f"Dividindo texto em {total_chunks} partes...")
-                progress_bar.progress(10)
-                time.sleep(0.5)
-
-                audio_chunks = []
-
-                for i, chunk in enumerate(chunks):
-                    status_text.text(
-                        f"Processando parte {i+1}/{total_chunks}...")
-                    progress = int(10 + (i / total_chunks) * 80)
-                    progress_bar.progress(progress)
-
-                    chunk_audio = text_to_speech(
-                        chunk, language, use_slow, speed_option,
-                        voice_type, voice_filter, pitch_option
-                    )
-                    if chunk_audio:
-                        audio_chunks.append(chunk_audio)
-                    else:
-                        st.error(f"❌ Erro ao processar parte {i+1}")
-                        return
-
-                    # Pausa para evitar rate limiting
-                    time.sleep(0.4)
-
-                status_text.text("Finalizando processamento...")
-                progress_bar.progress(100)
-
-                if audio_chunks:
-                    if merge_option == "Arquivo único":
-                        display_merged_audio_result(
-                            audio_chunks, text, total_chunks, speed_option, voice_type, voice_filter
-                        )
-                    else:
-                        display_multiple_audio_result(
-                            audio_chunks, text, total_chunks, speed_option, voice_type, voice_filter
-                        )
-                    st.session_state.conversions_count += 1
-                    st.session_state.total_chars += len(text)
-
-        except Exception as e:
-            st.error(f"Erro durante o processamento: {str(e)}")
-
-        finally:
-            progress_bar.empty()
-            status_text.empty()
+    if st.session_state.get('job_id'):
+        show_job(st.session_state.job_id)
+
+
+def show_job(job_id):
+    """Exibe o andamento ou o resultado do job da sessão"""
+
+    job = get_job_manager().get(job_id)
+    if job is None:
+        # Removido após o prazo de retenção
+        st.session_state.job_id = None
+        return
+
+    if job['status'] in (QUEUED, RUNNING):
+        show_job_progress(job_id)
+    elif job['status'] == FAILED:
+        show_failed_job(job)
+    else:
+        display_job_result(job)
+
+
+def show_failed_job(job):
+    """Erro do job, com as partes já geradas preservadas para uma nova tentativa"""
+
+    st.error(f"Erro durante o processamento: {job['error']}")
+
+    total_chunks = job['total_chunks']
+    done_chunks = job['done_chunks']
+    if total_chunks:
+        st.progress(done_chunks / total_chunks,
+                    text=f"{done_chunks} de {total_chunks} partes prontas e guardadas")
+
+    missing = total_chunks - done_chunks
+    label = (f"Tentar novamente ({missing} partes restantes)" if total_chunks > 1
+             else "Tentar novamente")
+    if st.button(label, type="primary", key=f"retry_{job['id']}"):
+        get_job_manager().retry(job['id'])
+        st.rerun()
+
+
+@st.fragment(run_every=JOBS_CONFIG['poll_interval'])
+def show_job_progress(job_id):
+    """Progresso do job, atualizado periodicamente sem rerun do app inteiro"""
+
+    manager = get_job_manager()
+    job = manager.get(job_id)
+    if job is None or job['status'] not in (QUEUED, RUNNING):
+        st.rerun()  # Concluído: exibir o resultado no app completo
+
+    total_chunks = job['total_chunks']
+    done_chunks = job['done_chunks']
+    if job['status'] == QUEUED or not total_chunks:
+        st.progress(0, text="Aguardando na fila...")
+        return
+
+    st.progress(done_chunks / total_chunks,
+                text=f"Gerando áudio: parte {done_chunks}/{total_chunks} pronta...")
+
+    coordinator = get_coordinator()
+    if coordinator is not None and not coordinator.queue.workers():
+        st.warning("⚠️ Nenhum worker ativo na fila distribuída: as partes serão "
+                   "geradas quando um worker iniciar.")
+
+    if total_chunks == 1 or not done_chunks:
+        return
+
+    # As partes aparecem assim que ficam prontas
+    st.markdown("### Ouça enquanto o restante é gerado")
+    finished = manager.store.finished_parts(job_id, total_chunks)
+    if job['params']['merge']:
+        if finished and finished[0] == 0:
+            st.caption("Prévia: parte 1")
+            st.audio(manager.store.read_part(job_id, 0), format='audio/mp3')
+        return
+
+    # Apenas as últimas partes: a memória não cresce com o tamanho do documento
+    recent = finished[-JOBS_CONFIG['live_players']:]
+    if len(finished) > len(recent):
+        st.caption(f"{len(finished)} partes prontas; exibindo as mais recentes")
+    for index in recent:
+        chunk_audio = manager.store.read_part(job_id, index)
+        chunk_info = get_audio_info(chunk_audio)
+        with st.expander(f"Parte {index+1}/{total_chunks} "
+                         f"({chunk_info['size']}, {chunk_info['duration'] or '—'})",
+                         expanded=index == recent[-1]):
+            st.audio(chunk_audio, format='audio/mp3')
+
+
+def display_job_result(job):
+    """Exibe o resultado de um job concluído (lido do armazenamento dos jobs)"""
+
+    store = get_job_manager().store
+    params = job['params']
+    text = job['text']
+    total_chunks = job['total_chunks']
+
+    # Contabilizar cada job uma única vez, mesmo com vários reruns
+    if st.session_state.get('counted_job_id') != job['id']:
+        st.session_state.counted_job_id = job['id']
+        st.session_state.conversions_count += 1
+        st.session_state.total_chars += len(text)
+
+    if job['reused_chunks']:
+        st.info(f"✏️ {job['reused_chunks']} de {total_chunks} partes sem alteração "
+                f"reaproveitadas da conversão anterior.")
+    if job['saved_calls']:
+        st.info(f"♻️ {job['saved_calls']} partes repetidas reaproveitadas "
+                f"({total_chunks - job['saved_calls']} sínteses para {total_chunks} partes).")
+
+    if total_chunks <= 1:
+        display_single_audio_result(
+            store.read_part(job['id'], 0), text, params['speed_option'],
+            params['voice_type'], params['voice_filter']
+        )
+    elif params['merge']:
+        # Informações lidas do mmap; player e download recebem o arquivo,
+        # que o Streamlit lê inteiro para a memória ao registrar cada um
+        with store.open_merged(job['id']) as merged_audio, \
+                open(store.merged_path(job['id']), 'rb') as merged_file:
+            display_merged_audio_result(
+                merged_audio, merged_file, text, total_chunks,
+                params['speed_option'], params['voice_type'], params['voice_filter']
+            )
+    else:
+        # Partes mapeadas dos arquivos do job; o ZIP foi gerado ao concluir o
+        # job (ou na primeira exibição, para jobs anteriores) e não é montado
+        # em memória, mas o download o lê inteiro ao ser registrado
+        zip_path = store.ensure_zip(job['id'], total_chunks)
+        with store.open_parts(job['id'], total_chunks) as audio_result, \
+                open(zip_path, 'rb') as zip_file:
+            display_multiple_audio_result(
+                audio_result, zip_file, text, total_chunks, params['speed_option'],
+                params['voice_type'], params['voice_filter']
+            )
 
 
 def display_single_audio_result(audio_data, original_text, speed_option, voice_type, voice_filter):
@@ -337,7 +440,6 @@ def display_single_audio_result(audio_data, original_text, speed_option, voice_t
 
     # Informações detalhadas
     audio_info = get_audio_info(audio_data)
-    estimated_duration = estimate_duration(original_text, speed_option)
 
     col1, col2, col3, col4 = st.columns(4)
     with col1:
@@ -347,7 +449,7 @@ def display_single_audio_result(audio_data, original_text, speed_option, voice_t
     with col3:
         st.metric("Tamanho", audio_info['size'])
     with col4:
-        st.metric("⏱Duração", estimated_duration)
+        st.metric("⏱Duração", audio_info['duration'] or "—")
 
     # Informações da voz
     st.markdown("### Configurações Aplicadas")
@@ -367,19 +469,24 @@ def display_single_audio_result(audio_data, original_text, speed_option, voice_t
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     filename = f"audio_{voice_type}_{voice_filter}_{speed_option}_{timestamp}.mp3"
 
-    download_link = get_download_link(audio_data, filename)
-    st.markdown(download_link, unsafe_allow_html=True)
+    render_download_button("Baixar Áudio MP3", audio_data, filename)
 
 
-def display_multiple_audio_result(audio_chunks, original_text, chunks_count,
-                                  speed_option, voice_type, voice_filter):
-    """Exibe resultado de múltiplos áudios"""
+def display_multiple_audio_result(audio_result, zip_file, original_text, chunks_count,
+                                  speed_option, voice_type, voice_filter,
+                                  show_players=True):
+    """
+    Exibe resultado de múltiplos áudios
+
+    `audio_result` é um AudioResult: as partes são lidas por memoryview e só
+    as exibidas são copiadas para o Streamlit (player e download da parte).
+    `zip_file` é o ZIP das partes já gravado, aberto para leitura.
+    """
 
     st.success("Áudios gerados com sucesso!")
 
     # Informações detalhadas
-    audio_info = get_audio_info(b''.join(audio_chunks))
-    estimated_duration = estimate_duration(original_text, speed_option)
+    audio_info = get_audio_info(audio_result)
 
     col1, col2, col3, col4 = st.columns(4)
     with col1:
@@ -389,7 +496,7 @@ def display_multiple_audio_result(audio_chunks, original_text, chunks_count,
     with col3:
         st.metric("Tamanho Total", audio_info['size'])
     with col4:
-        st.metric("⏱Duração", estimated_duration)
+        st.metric("⏱Duração", audio_info['duration'] or "—")
 
     # Informações da voz
     st.markdown("### Configurações Aplicadas")
@@ -400,41 +507,173 @@ def display_multiple_audio_result(audio_chunks, original_text, chunks_count,
     """
     st.markdown(voice_info)
 
-    # Players de áudio organizados
-    st.markdown("### Players de Áudio")
+    # Players de áudio organizados (com o download de cada parte)
+    if show_players:
+        st.markdown("### Players de Áudio")
 
-    show_all = st.checkbox("Mostrar todos os players", value=False)
-    display_count = len(audio_chunks) if show_all else min(
-        3, len(audio_chunks))
+        show_all = st.checkbox("Mostrar todos os players", value=False)
+        display_count = len(audio_result) if show_all else min(
+            3, len(audio_result))
 
-    for i in range(display_count):
-        audio_data = audio_chunks[i]
-        chunk_info = get_audio_info(audio_data)
+        for i in range(display_count):
+            audio_data = bytes(audio_result.part(i))
+            chunk_info = get_audio_info(audio_data)
 
-        with st.expander(f"Parte {i+1}/{chunks_count} ({chunk_info['size']})", expanded=i == 0):
-            st.audio(audio_data, format='audio/mp3')
+            with st.expander(f"Parte {i+1}/{chunks_count} ({chunk_info['size']}, "
+                             f"{chunk_info['duration'] or '—'})", expanded=i == 0):
+                st.audio(audio_data, format='audio/mp3')
+                render_download_button(
+                    f"Baixar parte {i+1}", audio_data, get_part_filename(i),
+                    key=f"download_part_{i}"
+                )
 
-    if not show_all and len(audio_chunks) > 3:
-        st.info(f"➕ {len(audio_chunks) - 3} players adicionais disponíveis")
+        if not show_all and len(audio_result) > 3:
+            st.info(f"➕ {len(audio_result) - 3} players adicionais disponíveis")
 
     # Downloads
     st.markdown("### Downloads")
-    download_links = get_multiple_download_links(audio_chunks)
-    st.markdown(download_links, unsafe_allow_html=True)
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    render_download_button(
+        "Baixar todas as partes (ZIP)", zip_file,
+        f"audio_partes_{voice_type}_{voice_filter}_{speed_option}_{timestamp}.zip",
+        mime="application/zip"
+    )
+
 
+def render_download_button(label, data, filename, mime="audio/mpeg", key=None):
+    """
+    Botão de download servido pelo endpoint de mídia do Streamlit
 
-def display_merged_audio_result(audio_chunks, original_text, chunks_count,
+    Os bytes (ou o arquivo) são enviados sob demanda, sem base64 no HTML,
+    e o clique não provoca um novo rerun do script.
+    """
+    with metrics.timer('download'):
+        st.download_button(
+            label,
+            data=data,
+            file_name=filename,
+            mime=mime,
+            key=key or f"download_{filename}",
+            on_click="ignore",
+            use_container_width=True
+        )
+
+
+def show_performance_panel():
+    """Painel com a latência por etapa (p50/p95/p99) e exportação das métricas"""
+
+    st.markdown("### Desempenho")
+    summary = metrics.summary()
+
+    if not summary:
+        st.caption("Nenhuma medição ainda. Gere um áudio para coletar métricas.")
+        return
+
+    rows = [
+        {
+            'Etapa': STAGE_LABELS.get(stage, stage),
+            'N': values['count'],
+            'p50 (ms)': round(values['p50'] * 1000, 1),
+            'p95 (ms)': round(values['p95'] * 1000, 1),
+            'p99 (ms)': round(values['p99'] * 1000, 1),
+            'máx (ms)': round(values['max'] * 1000, 1),
+        }
+        for stage, values in summary.items()
+    ]
+    st.dataframe(rows, hide_index=True, use_container_width=True)
+
+    decisions = list(get_chunk_controller().decisions)[-5:]
+    if decisions:
+        st.markdown("**Tamanho dos chunks (últimas decisões)**")
+        st.dataframe([
+            {
+                'Motor': d['backend'],
+                'Idioma': d['language'],
+                'Caracteres': d['total_chars'],
+                'Chunk': d['chunk_size'],
+                'Motivo': d['reason'],
+                'Custo fixo (s)': d.get('overhead_s'),
+                'ms/caractere': d.get('per_char_ms'),
+            }
+            for d in reversed(decisions)
+        ], hide_index=True, use_container_width=True)
+
+    speech_rates = get_speech_rate_model().snapshot()
+    if speech_rates:
+        st.markdown("**Taxa de fala medida (caracteres por segundo)**")
+        st.dataframe([
+            {
+                'Idioma': r['language'],
+                'Voz': r['voice_type'],
+                'Filtro': r['voice_filter'],
+                'Velocidade': r['speed_option'],
+                'Caracteres/s': round(r['chars_per_second'], 2),
+            }
+            for r in speech_rates
+        ], hide_index=True, use_container_width=True)
+
+    open_circuits = [
+        f"{backend} ({tld}): {'aberto' if state == 'open' else 'em teste'}"
+        for (backend, tld), (state, _) in sorted(circuit_states().items())
+        if state != 'closed'
+    ]
+    if open_circuits:
+        st.warning("Circuitos: " + ", ".join(open_circuits))
+
+    coordinator = get_coordinator()
+    if coordinator is not None:
+        status = coordinator.status()
+        st.markdown("**Síntese distribuída**")
+        st.caption("Tarefas na fila: " + (", ".join(
+            f"{state}: {count}" for state, count in sorted(status['tasks'].items()))
+            or "nenhuma"))
+        if status['workers']:
+            st.dataframe([
+                {
+                    'Worker': w['id'],
+                    'Concluídas': w['done'],
+                    'Com erro': w['failed'],
+                    'Último sinal (s)': round(time.time() - w['last_seen'], 1),
+                }
+                for w in status['workers']
+            ], hide_index=True, use_container_width=True)
+        else:
+            st.warning("Nenhum worker ativo na fila distribuída")
+
+    sessions = http_session_stats()
+    if sessions:
+        st.caption("Conexões keep-alive: " + ", ".join(
+            f"{tld}: {s['requests']} requisições, até {s['peak']} simultâneas"
+            for tld, s in sorted(sessions.items())))
+
+    st.download_button(
+        "Exportar (Prometheus)", data=metrics.to_prometheus(),
+        file_name="metricas.prom", mime="text/plain", on_click="ignore",
+        use_container_width=True
+    )
+    st.download_button(
+        "Exportar (JSON)", data=metrics.to_json(),
+        file_name="metricas.json", mime="application/json", on_click="ignore",
+        use_container_width=True
+    )
+    if st.button("Zerar métricas", use_container_width=True):
+        metrics.reset()
+
+
+def display_merged_audio_result(merged_audio, merged_file, original_text, chunks_count,
                                 speed_option, voice_type, voice_filter):
-    """Exibe resultado de áudio mesclado"""
+    """
+    Exibe resultado de áudio mesclado (já unido por MP3MergeWriter)
 
-    st.warning("Modo experimental: Concatenação simples de áudios")
+    `merged_audio` é um AudioResult (informações sem cópia) e `merged_file`
+    o arquivo aberto, entregue ao player e ao download (o Streamlit o lê
+    para a memória ao registrar cada um).
+    """
 
-    merged_audio = b''.join(audio_chunks)
-    st.success("Áudios concatenados!")
+    st.success("Áudios unidos em um único arquivo!")
 
     # Informações
     audio_info = get_audio_info(merged_audio)
-    estimated_duration = estimate_duration(original_text, speed_option)
 
     col1, col2, col3, col4 = st.columns(4)
     with col1:
@@ -444,7 +683,7 @@ def display_merged_audio_result(audio_chunks, original_text, chunks_count,
     with col3:
         st.metric("Tamanho", audio_info['size'])
     with col4:
-        st.metric("⏱Duração", estimated_duration)
+        st.metric("⏱Duração", audio_info['duration'] or "—")
 
     # Informações da voz
     st.markdown("### Configurações Aplicadas")
@@ -457,15 +696,14 @@ def display_merged_audio_result(audio_chunks, original_text, chunks_count,
 
     # Player
     st.markdown("### Player de Áudio Completo")
-    st.audio(merged_audio, format='audio/mp3')
+    st.audio(merged_file, format='audio/mp3')
 
     # Download
     st.markdown("### Download")
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     filename = f"audio_completo_{voice_type}_{voice_filter}_{speed_option}_{timestamp}.mp3"
 
-    download_link = get_download_link(merged_audio, filename)
-    st.markdown(download_link, unsafe_allow_html=True)
+    render_download_button("Baixar Áudio MP3", merged_file, filename)
 
 
 def show_footer():
@@ -0,0 +1,164 @@
+"""
+Micro-benchmark do processamento de texto (velocidade, filtro e tom)
+
+Compara o pipeline compilado (utils/text_pipeline.py) com a implementação
+sequencial original, verificando antes que a saída é idêntica para todas
+as combinações.
+
+Uso:
+    python -m benchmarks.bench_text_processing [--chars 100000] [--repeat 5]
+"""
+import argparse
+import random
+import re
+import time
+from config import SPEED_OPTIONS, VOICE_FILTERS, PITCH_OPTIONS
+from utils.text_pipeline import get_text_pipeline, run_steps
+
+
+# Implementação original (referência), com padrões compilados a cada chamada
+def legacy_process_text_for_voice(text, speed_option, voice_filter, pitch):
+    text = legacy_process_text_for_speed(text, speed_option)
+    text = legacy_apply_voice_filter(text, voice_filter)
+    return legacy_apply_pitch_adjustment(text, pitch)
+
+
+def legacy_process_text_for_speed(text, speed_option):
+    if speed_option == 'muito_lenta':
+        return re.sub(r'\s+', ' ... ', text)
+    elif speed_option == 'lenta':
+        return re.sub(r'\s+', ' .. ', text)
+    elif speed_option == 'rapida':
+        text = re.sub(r'\s*,\s*', ', ', text)
+        text = re.sub(r'\s*\.\s*', '. ', text)
+        return text
+    return text
+
+
+def legacy_apply_voice_filter(text, voice_filter):
+    if voice_filter == 'robotico':
+        text = re.sub(r'\b(\w+)\b', r'\1.', text)
+        text = re.sub(r'\.+', '.', text)
+        return text
+    elif voice_filter == 'eco':
+        words = text.split()
+        processed_words = []
+        for i, word in enumerate(words):
+            processed_words.append(word)
+            if len(word) > 6 and i % 3 == 0:
+                processed_words.append(f"...{word[-3:]}...")
+        return ' '.join(processed_words)
+    elif voice_filter == 'sussurro':
+        return re.sub(r'\s+', ' .. ', text)
+    elif voice_filter == 'dramatico':
+        text = re.sub(r'[.!?]', r'...', text)
+        text = re.sub(r'\b(muito|grande|importante|incrível|fantástico)\b',
+                      r'... \1 ...', text, flags=re.IGNORECASE)
+        return text
+    elif voice_filter == 'animado':
+        text = re.sub(r'\.', '!', text)
+        text = re.sub(r'\b(ótimo|excelente|maravilhoso|fantástico)\b',
+                      r'... \1! ...', text, flags=re.IGNORECASE)
+        return text
+    return text
+
+
+def legacy_apply_pitch_adjustment(text, pitch):
+    multiplier = PITCH_OPTIONS.get(pitch, PITCH_OPTIONS['normal'])['multiplier']
+    if multiplier < 0.9:
+        text = re.sub(r'\s+', ' . ', text)
+    elif multiplier > 1.1:
+        text = re.sub(r'\s*,\s*', ' ', text)
+        text = re.sub(r'\s+', ' ', text)
+    return text
+
+
+VOCABULARY = [
+    'muito', 'Grande', 'IMPORTANTE', 'incrível', 'fantástico', 'ótimo',
+    'excelente', 'Maravilhoso', 'demonstração', 'texto', 'voz', 'a', 'é',
+    'conversão', 'processamento', 'café', 'naïve', '日本語', 'x1', '_id',
+]
+SEPARATORS = [
+    ' ', ' ', ' ', '  ', ', ', ' , ', '. ', '.', '...', '! ', '? ', '\n',
+    '\n\n', '\t', ',', ' .', ' ', ' ', ' - ', ';'
+]
+
+
+def random_text(rng, length):
+    parts = []
+    size = 0
+    if rng.random() < 0.3:
+        parts.append(rng.choice(SEPARATORS))
+    while size < length:
+        word = rng.choice(VOCABULARY)
+        separator = rng.choice(SEPARATORS)
+        parts.append(word)
+        parts.append(separator)
+        size += len(word) + len(separator)
+    return ''.join(parts)
+
+
+def combinations():
+    for speed in SPEED_OPTIONS:
+        for voice_filter in VOICE_FILTERS:
+            for pitch in PITCH_OPTIONS:
+                yield speed, voice_filter, pitch
+
+
+def check_equivalence(samples=300, seed=1234):
+    """
+    Garante saída idêntica à implementação original em textos aleatórios
+    """
+    rng = random.Random(seed)
+    texts = ['', ' ', '\n\n', 'a', ' a ', '...', ',,', ' , ']
+    texts += [random_text(rng, rng.randint(1, 400)) for _ in range(samples)]
+
+    for speed, voice_filter, pitch in combinations():
+        steps = get_text_pipeline(speed, voice_filter, pitch)
+        for text in texts:
+            expected = legacy_process_text_for_voice(text, speed, voice_filter, pitch)
+            actual = run_steps(steps, text)
+            if actual != expected:
+                raise AssertionError(
+                    f"Saída diferente para {(speed, voice_filter, pitch)}: {text!r}")
+    return len(texts)
+
+
+def best_time(function, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--chars', type=int, default=100_000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args(argv)
+
+    checked = check_equivalence()
+    print(f"Saída idêntica em {checked} textos x todas as combinações")
+
+    text = random_text(random.Random(42), args.chars)
+    total_legacy = total_compiled = 0.0
+
+    print(f"{'velocidade':<12} {'filtro':<10} {'tom':<12} {'original':>10} {'compilado':>10} {'ganho':>7}")
+    for speed, voice_filter, pitch in combinations():
+        legacy = best_time(lambda: legacy_process_text_for_voice(
+            text, speed, voice_filter, pitch), args.repeat)
+        compiled = best_time(lambda: run_steps(
+            get_text_pipeline(speed, voice_filter, pitch), text), args.repeat)
+        total_legacy += legacy
+        total_compiled += compiled
+        print(f"{speed:<12} {voice_filter:<10} {pitch:<12} "
+              f"{legacy * 1000:>8.2f}ms {compiled * 1000:>8.2f}ms {legacy / compiled:>6.2f}x")
+
+    print(f"Total: {total_legacy * 1000:.1f}ms -> {total_compiled * 1000:.1f}ms "
+          f"({total_legacy / total_compiled:.2f}x)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,155 @@
+"""
+Escalabilidade da síntese distribuída (utils/distributed.py)
+
+Para cada quantidade de workers (1 a N), inicia os processos com o motor
+fake, envia um documento de chunks distintos pela fila SQLite e mede o
+tempo até o MP3 completo ser remontado em ordem pelo coordenador.
+Relata chunks por segundo, aceleração em relação a 1 worker e eficiência.
+
+Com `--rate`, cada worker tem o próprio limite de requisições por
+segundo, como nós com orçamentos de taxa independentes.
+
+Uso:
+    python -m benchmarks.distributed_scaling --max-workers 8
+    python -m benchmarks.distributed_scaling --rate 2.5 --chunks 60
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from utils.distributed import Coordinator, ContentStore, SQLiteWorkQueue
+from utils.mp3 import MP3MergeWriter
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PARAMS = {
+    'language': 'pt',
+    'speed_option': 'normal',
+    'voice_type': 'feminina',
+    'voice_filter': 'normal',
+    'pitch': 'normal',
+}
+
+
+def make_chunks(count, run):
+    """
+    Chunks distintos (e distintos entre execuções, para não reaproveitar áudio)
+    """
+    return [f"Execução {run}, parte {i}. A conversão de texto em fala é muito "
+            f"importante para a acessibilidade." for i in range(count)]
+
+
+def start_workers(count, workdir, args):
+    env = dict(os.environ,
+               TTV_BACKEND='fake',
+               TTV_FAKE_LATENCY=str(args.latency),
+               TTV_DSP='0',
+               TTV_CACHE_DIR=os.path.join(workdir, 'cache'))
+    command = [sys.executable, '-m', 'utils.distributed', 'worker',
+               '--queue', os.path.join(workdir, 'queue.sqlite3'),
+               '--store', os.path.join(workdir, 'store'),
+               '--threads', str(args.threads)]
+    if args.rate:
+        command += ['--rate', str(args.rate)]
+    return [subprocess.Popen(command, cwd=ROOT, env=env, stdout=subprocess.DEVNULL)
+            for _ in range(count)]
+
+
+def wait_for_workers(queue, count, processes, timeout=60):
+    deadline = time.monotonic() + timeout
+    while len(queue.workers()) < count:
+        if any(process.poll() is not None for process in processes):
+            raise RuntimeError("Um worker terminou ao iniciar")
+        if time.monotonic() > deadline:
+            raise RuntimeError(f"Apenas {len(queue.workers())} de {count} workers iniciaram")
+        time.sleep(0.05)
+
+
+def run_scaling(args):
+    results = []
+    with tempfile.TemporaryDirectory() as workdir:
+        queue = SQLiteWorkQueue(os.path.join(workdir, 'queue.sqlite3'))
+        coordinator = Coordinator(queue, ContentStore(os.path.join(workdir, 'store')),
+                                  poll_interval=0.02)
+
+        for workers in range(1, args.max_workers + 1):
+            processes = start_workers(workers, workdir, args)
+            try:
+                wait_for_workers(queue, workers, processes)
+                chunks = make_chunks(args.chunks, workers)
+
+                started = time.perf_counter()
+                first_part = None
+                with tempfile.TemporaryFile() as merged:
+                    writer = MP3MergeWriter(merged)
+                    for index, audio in coordinator.iter_ordered(
+                            f'bench-{workers}', chunks, PARAMS):
+                        if first_part is None:
+                            first_part = time.perf_counter() - started
+                        writer.add(audio)
+                    writer.finish()
+                    size = merged.tell()
+                elapsed = time.perf_counter() - started
+            finally:
+                for process in processes:
+                    process.terminate()
+                for process in processes:
+                    process.wait()
+                # Workers encerrados não contam na próxima rodada
+                queue.purge(time.time() + 1)
+
+            results.append({
+                'workers': workers,
+                'threads_per_worker': args.threads,
+                'chunks': args.chunks,
+                'seconds': round(elapsed, 3),
+                'first_part_ms': round(first_part * 1000, 1),
+                'chunks_per_second': round(args.chunks / elapsed, 2),
+                'merged_bytes': size,
+            })
+
+    baseline = results[0]['chunks_per_second']
+    for result in results:
+        result['speedup'] = round(result['chunks_per_second'] / baseline, 2)
+        result['efficiency'] = round(result['speedup'] / result['workers'], 2)
+    return results
+
+
+def print_results(results, args):
+    limit = f", {args.rate} req/s por worker" if args.rate else ""
+    print(f"{args.chunks} chunks, {args.threads} threads por worker, "
+          f"latência {args.latency * 1000:.0f} ms{limit}")
+    print(f"{'Workers':>7}  {'Tempo (s)':>9}  {'Chunks/s':>9}  {'1ª parte (ms)':>13}  "
+          f"{'Aceleração':>10}  {'Eficiência':>10}")
+    for r in results:
+        print(f"{r['workers']:>7}  {r['seconds']:>9.2f}  {r['chunks_per_second']:>9.2f}  "
+              f"{r['first_part_ms']:>13.1f}  {r['speedup']:>9.2f}x  {r['efficiency']:>10.0%}")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Escalabilidade da síntese distribuída")
+    parser.add_argument('--max-workers', type=int, default=4, help="Medir de 1 a N workers")
+    parser.add_argument('--threads', type=int, default=2, help="Sínteses simultâneas por worker")
+    parser.add_argument('--chunks', type=int, default=200, help="Chunks por documento")
+    parser.add_argument('--latency', type=float, default=0.05,
+                        help="Latência simulada do motor fake por chunk (s)")
+    parser.add_argument('--rate', type=float, help="Limite de requisições/s de cada worker")
+    parser.add_argument('--output', help="Grava os resultados em JSON")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    results = run_scaling(args)
+    print_results(results, args)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,206 @@
+"""
+Teste de carga do serviço HTTP (api.py)
+
+Sobe o serviço com o motor fake em um processo separado (ou usa --url) e
+dispara POST /v1/speech de vários clientes simultâneos, cada um com sua
+conexão keep-alive. Relata requisições por segundo, latência até o
+primeiro byte e total (p50/p95/p99) e os status HTTP recebidos.
+
+Uso:
+    python -m benchmarks.load_test --clients 16 --requests 400
+    python -m benchmarks.load_test --repeat-text      # resultados já gerados
+    python -m benchmarks.load_test --same-client      # exercita o limite por cliente
+    python -m benchmarks.load_test --url http://localhost:8502
+"""
+import argparse
+import http.client
+import itertools
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from urllib.parse import urlsplit
+from benchmarks.run_benchmarks import make_text
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def start_server(workdir, latency):
+    """
+    Inicia api.py com o motor fake e diretórios temporários
+
+    Returns:
+        tuple: (processo, url)
+    """
+    port = free_port()
+    env = dict(os.environ,
+               TTV_BACKEND='fake',
+               TTV_FAKE_LATENCY=str(latency),
+               TTV_API_DIR=os.path.join(workdir, 'api'),
+               TTV_CACHE_DIR=os.path.join(workdir, 'cache'))
+    process = subprocess.Popen(
+        [sys.executable, os.path.join(ROOT, 'api.py'), '--port', str(port), '--quiet'],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL)
+    url = f'http://127.0.0.1:{port}'
+
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError("O serviço terminou ao iniciar")
+        try:
+            connection = http.client.HTTPConnection('127.0.0.1', port, timeout=1)
+            connection.request('GET', '/health')
+            if connection.getresponse().status == 200:
+                connection.close()
+                return process, url
+        except OSError:
+            time.sleep(0.1)
+    process.kill()
+    raise RuntimeError("O serviço não respondeu a /health")
+
+
+def percentile(values, q):
+    """
+    Percentil pelo método nearest-rank (valores já ordenados)
+    """
+    if not values:
+        return 0.0
+    rank = max(1, min(len(values), round(q * len(values) + 0.5)))
+    return values[rank - 1]
+
+
+def run_load(url, clients, total_requests, chars, repeat_text=False, same_client=False):
+    """
+    Executa o teste e retorna o resumo
+    """
+    parts = urlsplit(url)
+    counter = itertools.count()
+    lock = threading.Lock()
+    results = []  # (status, primeiro byte s, total s, bytes)
+
+    def client(client_index):
+        connection = http.client.HTTPConnection(parts.hostname, parts.port, timeout=120)
+        client_id = 'load-test' if same_client else f'load-test-{client_index}'
+        while True:
+            index = next(counter)
+            if index >= total_requests:
+                break
+            # Textos distintos forçam a síntese; iguais medem os resultados em arquivo
+            text = make_text('pt', chars) if repeat_text else (
+                f"Requisição {index}. " + make_text('pt', chars))
+            body = json.dumps({'text': text}).encode('utf-8')
+
+            started = time.perf_counter()
+            try:
+                connection.request('POST', '/v1/speech', body, {
+                    'Content-Type': 'application/json', 'X-Client-Id': client_id})
+                response = connection.getresponse()
+                first_byte = time.perf_counter() - started
+                size = len(response.read())
+                status = response.status
+                if response.will_close:
+                    connection.close()
+            except (OSError, http.client.HTTPException) as e:
+                connection.close()
+                first_byte, size, status = time.perf_counter() - started, 0, type(e).__name__
+            elapsed = time.perf_counter() - started
+
+            with lock:
+                results.append((status, first_byte, elapsed, size))
+        connection.close()
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(clients)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall_time = time.perf_counter() - started
+
+    ok = [r for r in results if r[0] == 200]
+    first_bytes = sorted(r[1] for r in ok)
+    totals = sorted(r[2] for r in ok)
+    return {
+        'url': url,
+        'clients': clients,
+        'requests': len(results),
+        'chars_per_request': chars,
+        'repeat_text': repeat_text,
+        'same_client': same_client,
+        'wall_time_s': round(wall_time, 3),
+        'requests_per_second': round(len(results) / wall_time, 2),
+        'successful_per_second': round(len(ok) / wall_time, 2),
+        'mb_per_second': round(sum(r[3] for r in ok) / wall_time / 1024 / 1024, 3),
+        'status': dict(Counter(str(r[0]) for r in results)),
+        'first_byte_ms': {f'p{int(q * 100)}': round(percentile(first_bytes, q) * 1000, 1)
+                          for q in (0.5, 0.95, 0.99)},
+        'latency_ms': {f'p{int(q * 100)}': round(percentile(totals, q) * 1000, 1)
+                       for q in (0.5, 0.95, 0.99)},
+    }
+
+
+def print_summary(summary):
+    print(f"{summary['requests']} requisições, {summary['clients']} clientes, "
+          f"{summary['chars_per_request']:,} caracteres cada ({summary['url']})")
+    print(f"  Vazão:          {summary['requests_per_second']:.2f} req/s "
+          f"({summary['successful_per_second']:.2f} com sucesso, "
+          f"{summary['mb_per_second']:.3f} MB/s)")
+    for label, key in (("Primeiro byte", 'first_byte_ms'), ("Total", 'latency_ms')):
+        values = summary[key]
+        print(f"  {label + ':':<15} p50 {values['p50']:.1f} ms | "
+              f"p95 {values['p95']:.1f} ms | p99 {values['p99']:.1f} ms")
+    print(f"  Status:         {summary['status']}")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Teste de carga do serviço HTTP (api.py)")
+    parser.add_argument('--url', help="Serviço já em execução (padrão: inicia um com o motor fake)")
+    parser.add_argument('--clients', type=int, default=8, help="Clientes simultâneos")
+    parser.add_argument('--requests', type=int, default=200, help="Total de requisições")
+    parser.add_argument('--chars', type=int, default=1500, help="Caracteres por requisição")
+    parser.add_argument('--latency', type=float, default=0.05,
+                        help="Latência simulada do motor fake por chunk (s)")
+    parser.add_argument('--repeat-text', action='store_true',
+                        help="Mesmo texto em todas as requisições (servido do arquivo)")
+    parser.add_argument('--same-client', action='store_true',
+                        help="Todos com o mesmo X-Client-Id (limite por cliente)")
+    parser.add_argument('--output', help="Grava o resumo em JSON")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        process = None
+        url = args.url
+        if url is None:
+            process, url = start_server(workdir, args.latency)
+        try:
+            summary = run_load(url, args.clients, args.requests, args.chars,
+                               args.repeat_text, args.same_client)
+        finally:
+            if process is not None:
+                process.terminate()
+                process.wait()
+
+    print_summary(summary)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(summary, f, indent=2, ensure_ascii=False)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
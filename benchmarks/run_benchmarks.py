@@ -0,0 +1,226 @@
+"""
+Suíte de benchmarks dos caminhos críticos do texto para áudio
+
+Mede tempo de relógio (melhor de N execuções) e pico de memória
+(tracemalloc, em execução separada) e grava tudo em JSON para comparar
+commits.
+
+Uso:
+    python -m benchmarks.run_benchmarks --output resultados.json
+    python -m benchmarks.run_benchmarks --max-size 100000 --compare anterior.json
+"""
+import argparse
+import io
+import json
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from config import (
+    LANGUAGES, LIMITS, VOICE_FILTERS, SYNTHESIS_CONFIG, CACHE_CONFIG
+)
+from utils.audio_utils import (
+    split_text, apply_voice_filter, process_text_for_voice, estimate_duration,
+    synthesize_speech, iter_text_chunks, write_zip_bundle
+)
+from utils.backends import FakeBackend
+from utils.mp3 import MP3MergeWriter
+from utils.synthesis import iter_synthesized
+from utils import text_stats
+
+SIZES = [1_000, 10_000, 100_000, 1_000_000, 10_000_000]
+
+SAMPLE_SENTENCES = {
+    'pt': "A conversão de texto em fala é muito importante para a acessibilidade. ",
+    'en': "Text to speech conversion makes written content accessible to everyone. ",
+    'es': "La conversión de texto a voz es muy útil para la accesibilidad. ",
+    'fr': "La synthèse vocale rend le contenu écrit accessible à tous. ",
+    'it': "La sintesi vocale rende i contenuti scritti accessibili a tutti. ",
+    'de': "Die Sprachsynthese macht geschriebene Inhalte für alle zugänglich. ",
+    'ja': "音声合成は書かれた内容を誰にでも利用しやすくします。",
+    'ko': "음성 합성은 글로 된 내용을 누구나 이용할 수 있게 합니다. ",
+    'zh': "语音合成让书面内容对每个人都更容易获取。",
+}
+
+
+def make_text(language, size):
+    """
+    Texto de exemplo com `size` caracteres, com parágrafos a cada ~8 frases
+    """
+    sentence = SAMPLE_SENTENCES[language]
+    paragraph = sentence * 8 + "\n\n"
+    repeats = size // len(paragraph) + 1
+    return (paragraph * repeats)[:size]
+
+
+def measure(function, repeat):
+    """
+    Melhor tempo de relógio em `repeat` execuções e pico de memória em uma execução extra
+    """
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - started)
+
+    tracemalloc.start()
+    try:
+        function()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return best, peak
+
+
+def run_e2e(text, backend):
+    """
+    Pipeline completo como em process_text_to_speech (modo "Arquivo único")
+    """
+    synthesize = lambda chunk: synthesize_speech(chunk, 'pt', backend=backend)
+    merged = io.BytesIO()
+    writer = MP3MergeWriter(merged)
+    for _, _, audio in iter_synthesized(
+            iter_text_chunks(text, LIMITS['chunk_size']), synthesize,
+            max_workers=SYNTHESIS_CONFIG['max_workers'],
+            lookahead=SYNTHESIS_CONFIG['lookahead']):
+        writer.add(audio)
+    return writer.finish()
+
+
+def build_cases(args):
+    """
+    Lista (nome, idioma, tamanho, função) dos casos a medir
+    """
+    languages = args.languages or list(LANGUAGES)
+    sizes = [size for size in SIZES if size <= args.max_size]
+    cases = []
+
+    for language in languages:
+        for size in sizes:
+            text = make_text(language, size)
+            cases.append(('split_text', language, size,
+                          lambda t=text: split_text(t, LIMITS['chunk_size'])))
+            for voice_filter in VOICE_FILTERS:
+                cases.append((f'apply_voice_filter[{voice_filter}]', language, size,
+                              lambda t=text, f=voice_filter: apply_voice_filter(t, f)))
+            cases.append(('process_text_for_voice[muito_lenta,eco,grave]', language, size,
+                          lambda t=text: process_text_for_voice(t, 'muito_lenta', 'eco', 'grave')))
+            cases.append(('estimate_duration', language, size,
+                          lambda t=text: estimate_duration(t, 'normal')))
+            cases.append(('text_stats', language, size,
+                          lambda t=text, l=language: (text_stats.clear_cache(),
+                                                      text_stats.text_stats(t, l))))
+
+    # Preparação do download de várias partes (ZIP em disco)
+    backend = FakeBackend(latency=args.latency)
+    for size in sizes:
+        chunks = [backend.synthesize(chunk) for chunk in
+                  iter_text_chunks(make_text('pt', min(size, args.e2e_max_size)),
+                                   LIMITS['chunk_size'])]
+
+        def zip_bundle(parts=chunks):
+            with tempfile.TemporaryFile() as f:
+                write_zip_bundle(parts, f)
+
+        cases.append(('write_zip_bundle', 'pt', min(size, args.e2e_max_size), zip_bundle))
+
+    # Ponta a ponta com latência injetada
+    for size in sizes:
+        if size > args.e2e_max_size:
+            continue
+        text = make_text('pt', size)
+        cases.append((f'e2e[latency={args.latency}s]', 'pt', size,
+                      lambda t=text: run_e2e(t, backend)))
+
+    return cases
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'],
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline_path):
+    """
+    Imprime a variação de tempo em relação a um JSON anterior
+    """
+    with open(baseline_path, encoding='utf-8') as f:
+        baseline = {
+            (r['name'], r['language'], r['size']): r for r in json.load(f)['results']
+        }
+
+    print(f"\nComparação com {baseline_path}:")
+    for result in results:
+        previous = baseline.get((result['name'], result['language'], result['size']))
+        if previous is None:
+            continue
+        ratio = result['wall_seconds'] / max(previous['wall_seconds'], 1e-12)
+        flag = '  <-- regressão' if ratio > 1.10 else ''
+        print(f"{result['name']:<48} {result['language']:<3} {result['size']:>10,} "
+              f"{ratio:>6.2f}x{flag}")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks do pipeline texto -> áudio")
+    parser.add_argument('--output', default='bench_output.json')
+    parser.add_argument('--max-size', type=int, default=SIZES[-1],
+                        help="Maior entrada em caracteres (padrão: 10 MB)")
+    parser.add_argument('--e2e-max-size', type=int, default=100_000,
+                        help="Maior entrada para o pipeline completo")
+    parser.add_argument('--languages', nargs='*', choices=list(LANGUAGES))
+    parser.add_argument('--latency', type=float, default=0.05,
+                        help="Latência simulada por requisição no motor fake (s)")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--compare', help="JSON de uma execução anterior")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    # Medir sempre o trabalho real, nunca acertos do cache em disco
+    CACHE_CONFIG['enabled'] = False
+
+    results = []
+    for name, language, size, function in build_cases(args):
+        # Entradas grandes são lentas demais para repetir
+        repeat = args.repeat if size <= 1_000_000 else 1
+        wall, peak = measure(function, repeat)
+        results.append({
+            'name': name,
+            'language': language,
+            'size': size,
+            'wall_seconds': wall,
+            'peak_memory_bytes': peak,
+            'repeat': repeat
+        })
+        print(f"{name:<48} {language:<3} {size:>10,} "
+              f"{wall * 1000:>10.2f}ms {peak / 1024:>10.1f}KB")
+
+    report = {
+        'meta': {
+            'commit': git_commit(),
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'python': sys.version.split()[0],
+            'platform': platform.platform(),
+            'args': vars(args)
+        },
+        'results': results
+    }
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"\nResultados gravados em {args.output}")
+
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,321 @@
+"""
+Conversão em lote (sem interface) de diretórios de documentos .txt/.md
+
+Exemplo:
+    python cli.py documentos/ saida/ --lang pt --voice feminina --workers 4
+    python cli.py documentos/ --stats     # apenas estatísticas, sem converter
+"""
+import argparse
+import hashlib
+import json
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import partial
+from config import (
+    LANGUAGES, LIMITS, SPEED_OPTIONS, VOICE_OPTIONS, VOICE_FILTERS, PITCH_OPTIONS,
+    TTS_BACKEND, BATCH_CONFIG
+)
+from utils.audio_result import AudioResult
+from utils.audio_utils import (
+    split_text, synthesize_speech, get_part_filename, format_duration
+)
+from utils.mp3 import MP3MergeWriter
+from utils.synthesis import synthesize_chunks, group_duplicates
+from utils.text_stats import text_stats_batch
+
+DOCUMENT_EXTENSIONS = ('.txt', '.md')
+MANIFEST_NAME = 'manifest.jsonl'
+
+# Estado compartilhado dos processos de trabalho (definido em _init_worker)
+_backend_slots = None
+_manifest_lock = None
+
+
+def _init_worker(backend_slots, manifest_lock):
+    global _backend_slots, _manifest_lock
+    _backend_slots = backend_slots
+    _manifest_lock = manifest_lock
+
+
+def find_documents(input_dir):
+    """
+    Lista os documentos suportados (recursivamente), em ordem estável
+    """
+    documents = []
+    for root, _, files in os.walk(input_dir):
+        for name in files:
+            if name.lower().endswith(DOCUMENT_EXTENSIONS):
+                documents.append(os.path.relpath(os.path.join(root, name), input_dir))
+    return sorted(documents)
+
+
+def chunk_fingerprint(chunk, options):
+    """
+    Identifica um chunk pelo texto e por todos os parâmetros de síntese
+    """
+    payload = '\x1f'.join([
+        chunk, options['backend'], options['lang'], options['voice'],
+        options['filter'], options['pitch'], options['speed']
+    ])
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def load_manifest(output_dir):
+    """
+    Lê os chunks já concluídos, agrupados por documento:
+    {documento: {índice: fingerprint}}
+    """
+    completed = {}
+    path = os.path.join(output_dir, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return completed
+
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # Linha incompleta de uma execução interrompida
+            completed.setdefault(entry['document'], {})[entry['chunk']] = entry['fingerprint']
+    return completed
+
+
+def _append_manifest(output_dir, entry):
+    line = json.dumps(entry, ensure_ascii=False) + '\n'
+    with _manifest_lock:
+        with open(os.path.join(output_dir, MANIFEST_NAME), 'a', encoding='utf-8') as f:
+            f.write(line)
+            f.flush()
+            os.fsync(f.fileno())
+
+
+def convert_document(document, input_dir, output_dir, options, completed):
+    """
+    Converte um documento, pulando os chunks já registrados no manifesto
+
+    `completed` são as entradas do manifesto deste documento: {índice: fingerprint}
+
+    Returns:
+        dict: Estatísticas do documento
+    """
+    with open(os.path.join(input_dir, document), encoding='utf-8') as f:
+        text = f.read()
+
+    # O nome completo (com extensão) evita que a.txt e a.md dividam a mesma saída
+    document_dir = os.path.join(output_dir, document)
+    os.makedirs(document_dir, exist_ok=True)
+
+    chunks = split_text(text, options['chunk_size'])
+    fingerprints = [chunk_fingerprint(chunk, options) for chunk in chunks]
+    paths = [os.path.join(document_dir, get_part_filename(i)) for i in range(len(chunks))]
+
+    pending = [
+        i for i in range(len(chunks))
+        if completed.get(i) != fingerprints[i] or not os.path.exists(paths[i])
+    ]
+
+    # Chunks repetidos no documento são sintetizados uma única vez
+    groups = group_duplicates(pending, chunks)
+
+    def synthesize_and_store(index):
+        with _backend_slots:
+            audio_data = synthesize_speech(
+                chunks[index], options['lang'], SPEED_OPTIONS[options['speed']]['slow'],
+                options['speed'], options['voice'], options['filter'],
+                options['pitch'], backend=options['backend']
+            )
+
+        # Gravar e registrar cada chunk assim que termina (retomada após falhas)
+        for position in groups[index]:
+            tmp_path = paths[position] + '.tmp'
+            with open(tmp_path, 'wb') as f:
+                f.write(audio_data)
+            os.replace(tmp_path, paths[position])
+            _append_manifest(output_dir, {
+                'document': document,
+                'chunk': position,
+                'fingerprint': fingerprints[position],
+                'path': os.path.relpath(paths[position], output_dir),
+                'bytes': len(audio_data)
+            })
+        return len(audio_data) * len(groups[index])
+
+    written = synthesize_chunks(
+        list(groups), synthesize_and_store, max_workers=options['concurrency'])
+
+    if options['merge'] and chunks:
+        with open(document_dir + '.mp3', 'wb') as merged_file, \
+                AudioResult.from_files(paths) as parts:
+            writer = MP3MergeWriter(merged_file)
+            for part in parts.parts():
+                writer.add(part)
+            writer.finish()
+
+    return {
+        'document': document,
+        'chars': sum(len(chunks[i]) for i in pending),
+        'chunks': len(pending),
+        'synthesized_chunks': len(groups),
+        'skipped_chunks': len(chunks) - len(pending),
+        'deduplicated_chunks': len(pending) - len(groups),
+        'bytes': sum(written)
+    }
+
+
+def document_stats(input_dir, documents, options):
+    """
+    Estatísticas de todos os documentos (lidos sob demanda, contados em lote)
+    """
+    def read_documents():
+        for document in documents:
+            with open(os.path.join(input_dir, document), encoding='utf-8') as f:
+                yield f.read()
+
+    return text_stats_batch(read_documents(), options['lang'], options['chunk_size'],
+                            options['voice'], options['filter'])
+
+
+def format_stats(documents, stats, speed_option):
+    """
+    Tabela de estatísticas por documento, com o total
+    """
+    columns = ('chars', 'words', 'sentences', 'paragraphs', 'chunks')
+    totals = {key: sum(s[key] for s in stats) for key in columns}
+    totals['durations'] = {speed_option: sum(s['durations'][speed_option] for s in stats)}
+    width = max([len(d) for d in documents] + [len('Total')])
+
+    lines = [f"{'Documento':<{width}}  {'Caracteres':>11}  {'Palavras':>9}  "
+             f"{'Sentenças':>9}  {'Parágrafos':>10}  {'Chunks':>6}  {'Duração':>9}"]
+    for name, item in list(zip(documents, stats)) + [('Total', totals)]:
+        lines.append(
+            f"{name:<{width}}  {item['chars']:>11,}  {item['words']:>9,}  "
+            f"{item['sentences']:>9,}  {item['paragraphs']:>10,}  {item['chunks']:>6,}  "
+            f"{format_duration(item['durations'][speed_option]):>9}")
+    return "\n".join(lines)
+
+
+def format_summary(results, failures, elapsed):
+    """
+    Resumo de vazão da execução
+    """
+    chars = sum(r['chars'] for r in results)
+    chunks = sum(r['chunks'] for r in results)
+    synthesized = sum(r['synthesized_chunks'] for r in results)
+    skipped = sum(r['skipped_chunks'] for r in results)
+    deduplicated = sum(r['deduplicated_chunks'] for r in results)
+    written = sum(r['bytes'] for r in results)
+    elapsed = max(elapsed, 1e-9)
+
+    return "\n".join([
+        f"Documentos: {len(results)} convertidos, {len(failures)} com erro",
+        f"Chunks: {synthesized} sintetizados ({chunks} gravados), "
+        f"{skipped} retomados do manifesto",
+        f"Chamadas ao motor economizadas (chunks repetidos): {deduplicated}",
+        f"Tempo: {elapsed:.2f}s",
+        f"Vazão: {chars / elapsed:,.0f} caracteres/s, {chunks / elapsed:.2f} chunks/s",
+        f"Bytes gravados: {written:,} ({written / elapsed / 1024:,.1f} KB/s)",
+    ])
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Converte diretórios de documentos .txt/.md em áudio MP3")
+    parser.add_argument('input_dir', help="Diretório com os documentos")
+    parser.add_argument('output_dir', nargs='?',
+                        help="Diretório de saída (contém o manifesto)")
+    parser.add_argument('--lang', default='pt', choices=list(LANGUAGES))
+    parser.add_argument('--voice', default='feminina')
+    parser.add_argument('--filter', default='normal', choices=list(VOICE_FILTERS))
+    parser.add_argument('--pitch', default='normal', choices=list(PITCH_OPTIONS))
+    parser.add_argument('--speed', default='normal', choices=list(SPEED_OPTIONS))
+    parser.add_argument('--backend', default=TTS_BACKEND)
+    parser.add_argument('--chunk-size', type=int, default=LIMITS['chunk_size'])
+    parser.add_argument('--workers', type=int, default=BATCH_CONFIG['workers'],
+                        help="Processos de trabalho (documentos em paralelo)")
+    parser.add_argument('--concurrency', type=int, default=None,
+                        help="Requisições simultâneas ao motor, somando todos os processos")
+    parser.add_argument('--merge', action='store_true',
+                        help="Gera também um MP3 único por documento")
+    parser.add_argument('--stats', action='store_true',
+                        help="Apenas exibe as estatísticas dos documentos, sem converter")
+    args = parser.parse_args(argv)
+    if args.output_dir is None and not args.stats:
+        parser.error("informe o diretório de saída (ou use --stats)")
+    # Idiomas sem opções de voz usam a voz padrão (como na interface)
+    voices = list(VOICE_OPTIONS.get(args.lang, {'feminina': None}))
+    if args.voice not in voices:
+        parser.error(f"voz inválida para '{args.lang}': {args.voice} "
+                     f"(opções: {', '.join(voices)})")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    concurrency = args.concurrency or BATCH_CONFIG['backend_concurrency'].get(
+        args.backend, BATCH_CONFIG['default_concurrency'])
+    options = {
+        'lang': args.lang,
+        'voice': args.voice,
+        'filter': args.filter,
+        'pitch': args.pitch,
+        'speed': args.speed,
+        'backend': args.backend,
+        'chunk_size': args.chunk_size,
+        'concurrency': concurrency,
+        'merge': args.merge
+    }
+
+    documents = find_documents(args.input_dir)
+    if not documents:
+        print(f"Nenhum documento {'/'.join(DOCUMENT_EXTENSIONS)} em {args.input_dir}")
+        return 0
+
+    if args.stats:
+        print(format_stats(documents, document_stats(args.input_dir, documents, options),
+                           args.speed))
+        return 0
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    completed = load_manifest(args.output_dir)
+
+    # Limite de requisições ao motor compartilhado por todos os processos
+    manager = multiprocessing.Manager()
+    backend_slots = manager.BoundedSemaphore(concurrency)
+    manifest_lock = manager.Lock()
+
+    results = []
+    failures = []
+    started = time.perf_counter()
+    convert = partial(convert_document, input_dir=args.input_dir,
+                      output_dir=args.output_dir, options=options)
+
+    with ProcessPoolExecutor(max_workers=args.workers, initializer=_init_worker,
+                             initargs=(backend_slots, manifest_lock)) as executor:
+        futures = {
+            executor.submit(convert, document,
+                            completed=completed.get(document, {})): document
+            for document in documents
+        }
+        for future in as_completed(futures):
+            document = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                failures.append(document)
+                print(f"[erro] {document}: {e}", file=sys.stderr)
+                continue
+
+            results.append(result)
+            print(f"[ok] {document}: {result['chunks']} chunks "
+                  f"({result['skipped_chunks']} retomados)")
+
+    manager.shutdown()
+    print(format_summary(results, failures, time.perf_counter() - started))
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
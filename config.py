@@ -69,17 +69,20 @@ VOICE_FILTERS = {
     'robotico': {
         'label': 'Robótico',
         'description': 'Efeito de voz robótica',
-        'text_processing': 'robot'
+        'text_processing': 'robot',
+        'audio_effect': 'robot'  # Aplicado ao áudio quando há NumPy e ffmpeg
     },
     'eco': {
         'label': 'Eco',
         'description': 'Efeito de eco/reverb',
-        'text_processing': 'echo'
+        'text_processing': 'echo',
+        'audio_effect': 'echo'  # Aplicado ao áudio quando há NumPy e ffmpeg
     },
     'sussurro': {
         'label': 'Sussurro',
         'description': 'Efeito de sussurro',
-        'text_processing': 'whisper'
+        'text_processing': 'whisper',
+        'audio_effect': 'whisper'  # Aplicado ao áudio quando há NumPy e ffmpeg
     },
     'dramatico': {
         'label': 'Dramático',
@@ -94,11 +97,13 @@ VOICE_FILTERS = {
 }
 
 # Opções de velocidade
+# `time_stretch`: andamento aplicado ao áudio (utils/dsp.py); 'slow' e o
+# processamento do texto só são usados quando os efeitos de áudio estão indisponíveis
 SPEED_OPTIONS = {
-    'muito_lenta': {'label': 'Muito Lenta', 'slow': True, 'description': 'Ideal para aprendizado'},
-    'lenta': {'label': 'Lenta', 'slow': True, 'description': 'Boa para compreensão'},
-    'normal': {'label': 'Normal', 'slow': False, 'description': 'Velocidade padrão'},
-    'rapida': {'label': 'Rápida', 'slow': False, 'description': 'Para revisão rápida'}
+    'muito_lenta': {'label': 'Muito Lenta', 'slow': True, 'time_stretch': 0.65, 'description': 'Ideal para aprendizado'},
+    'lenta': {'label': 'Lenta', 'slow': True, 'time_stretch': 0.8, 'description': 'Boa para compreensão'},
+    'normal': {'label': 'Normal', 'slow': False, 'time_stretch': 1.0, 'description': 'Velocidade padrão'},
+    'rapida': {'label': 'Rápida', 'slow': False, 'time_stretch': 1.3, 'description': 'Para revisão rápida'}
 }
 
 # Configurações da interface
@@ -115,6 +120,180 @@ LIMITS = {
     'chunk_size': 500   # Tamanho do chunk para textos longos
 }
 
+# Síntese concorrente de textos longos
+SYNTHESIS_CONFIG = {
+    'max_workers': 4,        # Requisições simultâneas ao serviço de TTS
+    'rate_per_second': 2.5,  # Taxa média de requisições (token bucket)
+    'burst': 4,              # Rajada máxima de requisições
+    'lookahead': 8           # Chunks em andamento/aguardando exibição
+}
+
+# Novas tentativas e circuit breaker por motor/domínio (utils/retry.py)
+RETRY_CONFIG = {
+    'max_attempts': 5,        # Tentativas por chunk (incluindo a primeira)
+    'base_delay': 0.5,        # Espera base do backoff exponencial (s)
+    'max_delay': 30.0,        # Espera máxima entre tentativas (s)
+    'breaker_threshold': 5,   # Falhas seguidas que abrem o circuito
+    'breaker_reset': 20.0     # Tempo com o circuito aberto antes de testar de novo (s)
+}
+
+# Tamanho de chunk adaptativo (utils/chunking.py)
+CHUNKING_CONFIG = {
+    'adaptive': True,
+    'min_size': 200,        # Menor chunk considerado (caracteres)
+    'step': 50,             # Granularidade dos tamanhos avaliados
+    'min_samples': 5,       # Sínteses observadas antes de sair do padrão
+    'decay': 0.95,          # Peso das observações antigas no modelo de latência
+    'backoff': 0.7,         # Após uma falha, teto = 70% do chunk que falhou
+    'recovery': 25,         # Crescimento do teto a cada sucesso (caracteres)
+    'max_growth': 2.0,      # Chunk de até 2x o maior já sintetizado com sucesso
+    'timeout_margin': 0.5,  # Latência prevista máxima em fração do timeout do motor
+    'history': 200,         # Decisões mantidas em memória
+    'log_path': os.environ.get('TTV_CHUNK_LOG')  # Log JSON das decisões (opcional)
+}
+
+# Duração estimada antes da síntese (utils/speech_rate.py): caracteres falados
+# (letras, dígitos e ideogramas) por segundo, ajustados com a duração real
+# de cada áudio gerado por idioma, voz, filtro e velocidade
+SPEECH_RATE_CONFIG = {
+    'default_cps': 13.0,     # Velocidade normal, idiomas alfabéticos
+    'language_cps': {'ja': 7.5, 'ko': 6.5, 'zh': 4.5},  # Um caractere por sílaba
+    'decay': 0.98,           # Peso das observações antigas
+    'min_chars': 200         # Caracteres observados antes de usar a taxa da própria voz
+}
+
+# Estatísticas do texto (utils/text_stats.py)
+TEXT_STATS_CONFIG = {
+    'cache_entries': 64,         # Textos distintos memorizados
+    'batch_chars': 4_000_000     # Caracteres por varredura em lote (memória ~20 bytes/caractere)
+}
+
+# Motor de síntese (ver utils/backends.py): 'gtts', 'espeak' ou 'fake'
+TTS_BACKEND = os.environ.get('TTV_BACKEND', 'gtts')
+
+BACKEND_OPTIONS = {
+    'gtts': {
+        'timeout': (5.0, 30.0)  # Conexão e leitura (s): sem limite, BackendTimeoutError nunca ocorre
+    },
+    'espeak': {
+        'executable': 'espeak-ng',
+        'ffmpeg': 'ffmpeg',
+        'bitrate': '48k'
+    },
+    'fake': {
+        'latency': float(os.environ.get('TTV_FAKE_LATENCY', 0.0)),  # Latência fixa simulada (s)
+        'latency_per_char': 0.0,  # Latência adicional por caractere (s)
+        'chars_per_second': 15.0,  # Duração do áudio gerado
+        'failure_rate': float(os.environ.get('TTV_FAKE_FAILURE_RATE', 0.0))  # Falhas simuladas
+    }
+}
+
+# Conexões HTTP keep-alive com o serviço de TTS (utils/resources.py)
+HTTP_CONFIG = {
+    'pool_maxsize': 16  # Conexões mantidas por domínio (>= requisições simultâneas)
+}
+
+# Conversão em lote (cli.py)
+BATCH_CONFIG = {
+    'workers': os.cpu_count() or 1,  # Processos de trabalho
+    'default_concurrency': 4,        # Requisições simultâneas por motor
+    'backend_concurrency': {
+        'gtts': 4,
+        'espeak': os.cpu_count() or 1,
+        'fake': 64
+    }
+}
+
+# Instrumentação por etapa (painel "Desempenho")
+METRICS_CONFIG = {
+    'enabled': True,
+    'log_path': os.environ.get('TTV_METRICS_LOG')  # Log JSON por observação (opcional)
+}
+
+# Cache de áudio em disco (endereçado por conteúdo)
+CACHE_CONFIG = {
+    'enabled': True,
+    'directory': os.environ.get(
+        'TTV_CACHE_DIR',
+        os.path.join(os.path.expanduser('~'), '.cache', 'text-to-voice', 'audio')
+    ),
+    'max_bytes': 512 * 1024 * 1024  # Limite total antes da remoção LRU
+}
+
+# Conversões em segundo plano (utils/jobs.py)
+JOBS_CONFIG = {
+    'directory': os.environ.get(
+        'TTV_JOBS_DIR',
+        os.path.join(os.path.expanduser('~'), '.cache', 'text-to-voice', 'jobs')
+    ),
+    'max_jobs': 2,           # Jobs executados ao mesmo tempo (todas as sessões)
+    'poll_interval': 1.0,    # Intervalo de atualização do progresso na interface (s)
+    'live_players': 3,       # Partes recentes exibidas durante a geração
+    'retention_hours': 24    # Jobs concluídos são apagados depois deste prazo
+}
+
+# Previews do "Testar Voz" (utils/previews.py): todas as combinações de idioma,
+# voz, filtro, velocidade e tom pré-geradas em um único arquivo
+PREVIEW_CONFIG = {
+    'path': os.environ.get(
+        'TTV_PREVIEW_BUNDLE',
+        os.path.join(os.path.expanduser('~'), '.cache', 'text-to-voice', 'previews.bin')
+    ),
+    # Gerar em segundo plano ao iniciar o app se faltar ou estiver desatualizado
+    # (apenas com motor local ou efeitos de áudio; com gTTS, use o comando)
+    'build_on_startup': os.environ.get('TTV_PREVIEW_BUILD', '0') == '1',
+    'workers': 4  # Previews gerados ao mesmo tempo
+}
+
+# Síntese distribuída (utils/distributed.py): com uma fila definida, os jobs
+# viram tarefas por chunk executadas por workers em outros processos ou nós
+DISTRIBUTED_CONFIG = {
+    'queue': os.environ.get('TTV_QUEUE'),  # Ex.: /dados/fila.sqlite3 (None = síntese local)
+    'store': os.environ.get(
+        'TTV_STORE',
+        os.path.join(os.path.expanduser('~'), '.cache', 'text-to-voice', 'store')
+    ),
+    'lease_seconds': 120,       # Tarefa reservada volta para a fila após este prazo
+    'max_attempts': 3,          # Tentativas por tarefa (falhas e leases vencidos)
+    'retry_delay': 5.0,         # Espera antes de uma nova tentativa (s)
+    'worker_threads': 4,        # Sínteses simultâneas por worker
+    'backend_rate': {'gtts': (2.5, 4)},  # Taxa e rajada por worker (nó)
+    'poll_interval': 0.2,       # Consulta à fila sem tarefas/resultados (s)
+    'heartbeat_interval': 5.0,  # Sinal de vida dos workers (s)
+    'worker_timeout': 30.0,     # Worker sem sinal há mais tempo é considerado inativo
+    'stall_timeout': 300.0,     # Coordenador desiste das tarefas sem progresso por este prazo (s)
+    'retention_hours': 24       # Tarefas e áudios não usados são apagados depois deste prazo
+}
+
+# Serviço HTTP para outros sistemas (api.py)
+API_CONFIG = {
+    'host': os.environ.get('TTV_API_HOST', '127.0.0.1'),
+    'port': int(os.environ.get('TTV_API_PORT', 8502)),
+    'results_dir': os.environ.get(
+        'TTV_API_DIR',
+        os.path.join(os.path.expanduser('~'), '.cache', 'text-to-voice', 'api')
+    ),
+    'max_text_chars': 100_000,  # Tamanho máximo do texto por requisição
+    'client_concurrency': 2,    # Requisições simultâneas por cliente (X-Client-Id ou IP)
+    'max_concurrency': 32,      # Requisições de áudio simultâneas no total
+    'retention_hours': 24,      # Resultados mais antigos são apagados ao iniciar
+    # Taxa de requisições ao motor (por segundo, rajada) somando todos os
+    # clientes; motores sem entrada não são limitados
+    'backend_rate': {'gtts': (2.5, 4)}
+}
+
+# Efeitos de áudio reais (utils/dsp.py); sem NumPy/ffmpeg, simulados no texto
+DSP_CONFIG = {
+    'enabled': os.environ.get('TTV_DSP', '1') != '0',
+    'ffmpeg': 'ffmpeg',
+    'bitrate': '32k',  # Mesma taxa do gTTS
+    'effects': {
+        'echo': {'delay': 0.18, 'decay': 0.45, 'repeats': 4},
+        'robot': {'frequency': 40.0, 'mix': 0.85},
+        'whisper': {'n_fft': 512}
+    }
+}
+
 # Configurações de qualidade
 QUALITY_OPTIONS = {
     'baixa': {'label': 'Baixa', 'description': 'Arquivo menor'},
@@ -122,7 +301,7 @@ QUALITY_OPTIONS = {
     'alta': {'label': 'Alta', 'description': 'Melhor qualidade'}
 }
 
-# Configurações de pitch/tom (simulado via processamento de texto)
+# Configurações de pitch/tom (aplicado ao áudio ou simulado via texto)
 PITCH_OPTIONS = {
     'muito_grave': {'label': 'Muito Grave', 'multiplier': 0.7},
     'grave': {'label': 'Grave', 'multiplier': 0.85},
@@ -0,0 +1,46 @@
+"""
+Configuração comum dos testes: motor fake, sem efeitos de áudio e com
+diretórios temporários (definidos antes de importar o config)
+"""
+import os
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+_TMP_DIR = tempfile.mkdtemp(prefix='ttv-tests-')
+os.environ.update({
+    'TTV_BACKEND': 'fake',
+    'TTV_DSP': '0',
+    'TTV_FAKE_LATENCY': '0',
+    'TTV_FAKE_FAILURE_RATE': '0',
+    'TTV_PREVIEW_BUILD': '0',
+    'TTV_CACHE_DIR': os.path.join(_TMP_DIR, 'cache'),
+    'TTV_JOBS_DIR': os.path.join(_TMP_DIR, 'jobs'),
+    'TTV_STORE': os.path.join(_TMP_DIR, 'store'),
+})
+os.environ.pop('TTV_QUEUE', None)
+
+import pytest  # noqa: E402
+from config import CACHE_CONFIG  # noqa: E402
+from utils.backends import get_backend  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def no_audio_cache(monkeypatch):
+    """Cada síntese chega ao motor (as contagens de chamadas não dependem da ordem)"""
+    monkeypatch.setitem(CACHE_CONFIG, 'enabled', False)
+
+
+@pytest.fixture
+def fake_backend():
+    return get_backend('fake')
+
+
+def paragraphs(*names):
+    """
+    Texto com um parágrafo longo por nome (cada um vira um chunk de 500)
+    """
+    sentence = "Este parágrafo fala sobre {} e continua por mais algumas palavras. "
+    return '\n\n'.join((sentence.format(name) * 5).strip() for name in names)
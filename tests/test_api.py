@@ -0,0 +1,98 @@
+import http.client
+import json
+import threading
+import pytest
+import api
+from config import API_CONFIG, LIMITS
+from conftest import paragraphs
+from utils.mp3 import stream_info
+
+
+@pytest.fixture
+def server(tmp_path, monkeypatch):
+    monkeypatch.setitem(API_CONFIG, 'results_dir', str(tmp_path / 'api'))
+    monkeypatch.setitem(API_CONFIG, 'client_concurrency', 1)
+    server = api.APIServer(('127.0.0.1', 0), quiet=True)
+    thread = threading.Thread(target=server.serve_forever, kwargs={'poll_interval': 0.05},
+                              daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+    thread.join(10)
+
+
+def request(server, method, path, body=None, headers=None):
+    connection = http.client.HTTPConnection(*server.server_address, timeout=30)
+    try:
+        payload = json.dumps(body).encode('utf-8') if body is not None else None
+        connection.request(method, path, payload, headers or {})
+        response = connection.getresponse()
+        return response, response.read()
+    finally:
+        connection.close()
+
+
+def test_speech_is_streamed_and_saved_as_result(server):
+    text = paragraphs('início', 'meio', 'fim')
+
+    response, streamed = request(server, 'POST', '/v1/speech', {'text': text})
+    assert response.status == 200
+    assert response.getheader('Transfer-Encoding') == 'chunked'
+    assert response.getheader('X-Cache') == 'miss'
+    location = response.getheader('Content-Location')
+
+    response, saved = request(server, 'GET', location)
+    assert response.status == 200
+    # O arquivo salvo tem o quadro Xing; o fluxo, só os quadros de áudio
+    assert stream_info(saved)['frames'] == stream_info(streamed)['frames'] > 0
+
+    response, cached = request(server, 'POST', '/v1/speech', {'text': text})
+    assert (response.getheader('X-Cache'), cached) == ('hit', saved)
+
+
+def test_result_ranges(server):
+    response, _ = request(server, 'POST', '/v1/speech', {'text': "Olá, mundo."})
+    location = response.getheader('Content-Location')
+    _, audio = request(server, 'GET', location)
+    size = len(audio)
+
+    response, body = request(server, 'GET', location, headers={'Range': 'bytes=10-99'})
+    assert response.status == 206
+    assert response.getheader('Content-Range') == f'bytes 10-99/{size}'
+    assert body == audio[10:100]
+
+    response, body = request(server, 'GET', location, headers={'Range': 'bytes=-16'})
+    assert (response.status, body) == (206, audio[-16:])
+
+    response, _ = request(server, 'GET', location, headers={'Range': f'bytes={size}-'})
+    assert response.status == 416
+    assert response.getheader('Content-Range') == f'bytes */{size}'
+
+
+def test_concurrent_requests_are_limited_per_client(server):
+    with server.limiter.slot('cliente-a'):
+        response, body = request(server, 'POST', '/v1/speech', {'text': "Olá."},
+                                 headers={'X-Client-Id': 'cliente-a'})
+        assert response.status == 429
+        assert response.getheader('Retry-After') == '1'
+        assert 'simultâneas' in json.loads(body)['error']
+
+        response, _ = request(server, 'POST', '/v1/speech', {'text': "Olá."},
+                              headers={'X-Client-Id': 'cliente-b'})
+        assert response.status == 200
+
+
+@pytest.mark.parametrize('chunk_size', [True, 0, -5, 2.5, "300", LIMITS['max_chars'] + 1])
+def test_split_rejects_invalid_chunk_size(server, chunk_size):
+    response, body = request(server, 'POST', '/v1/split',
+                             {'text': "Olá.", 'chunk_size': chunk_size})
+    assert response.status == 400
+    assert 'chunk_size' in json.loads(body)['error']
+
+
+def test_split_uses_requested_chunk_size(server):
+    text = paragraphs('um', 'dois', 'três')
+    response, body = request(server, 'POST', '/v1/split', {'text': text, 'chunk_size': 500})
+    assert response.status == 200
+    assert len(json.loads(body)['chunks']) == 3
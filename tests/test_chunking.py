@@ -0,0 +1,72 @@
+from types import SimpleNamespace
+import pytest
+import utils.audio_utils as audio_utils
+from config import CHUNKING_CONFIG, LIMITS
+from utils.chunking import ChunkSizeController
+
+
+@pytest.fixture
+def controller():
+    return ChunkSizeController(dict(CHUNKING_CONFIG, adaptive=True, log_path=None))
+
+
+def backend(name='teste', max_chars=5000, timeout=None):
+    return SimpleNamespace(name=name, max_chars=max_chars, timeout=timeout)
+
+
+def observe_linear(controller, tts, overhead, per_char, sizes=(200, 300, 400, 500, 600)):
+    for chars in sizes:
+        controller.observe(tts, 'pt', chars, overhead + per_char * chars)
+
+
+def test_default_size_until_enough_samples(controller):
+    tts = backend()
+    observe_linear(controller, tts, 1.0, 0.001,
+                   sizes=[300] * (CHUNKING_CONFIG['min_samples'] - 1))
+    assert controller.chunk_size(tts, 'pt', 20000) == LIMITS['chunk_size']
+    assert controller.decisions[-1]['reason'] == 'padrão (poucas amostras)'
+
+
+def test_model_grows_at_most_max_growth_over_observed(controller):
+    tts = backend()
+    observe_linear(controller, tts, 2.0, 0.0001, sizes=[300] * 10)
+
+    size = controller.chunk_size(tts, 'pt', 50000)
+    assert controller.decisions[-1]['reason'] == 'modelo'
+    assert LIMITS['chunk_size'] < size <= 300 * CHUNKING_CONFIG['max_growth']
+
+
+def test_predicted_latency_stays_within_timeout_margin(controller):
+    tts = backend(timeout=1.0)
+    observe_linear(controller, tts, 0.0, 0.001)
+
+    size = controller.chunk_size(tts, 'pt', 50000)
+    assert size * 0.001 <= 1.0 * CHUNKING_CONFIG['timeout_margin'] + 1e-9
+
+
+def test_failure_lowers_ceiling_and_successes_recover(controller):
+    tts = backend()
+    controller.observe(tts, 'pt', 400, 5.0, error=True)
+    ceiling = int(400 * CHUNKING_CONFIG['backoff'])
+    assert controller.chunk_size(tts, 'pt', 20000) == ceiling
+
+    controller.observe(tts, 'pt', 250, 1.0)
+    assert controller.chunk_size(tts, 'pt', 20000) == ceiling + CHUNKING_CONFIG['recovery']
+
+
+def test_models_are_kept_per_backend_and_language(controller):
+    observe_linear(controller, backend('a'), 2.0, 0.0001, sizes=[300] * 10)
+    assert controller.chunk_size(backend('b'), 'pt', 50000) == LIMITS['chunk_size']
+    assert controller.chunk_size(backend('a'), 'en', 50000) == LIMITS['chunk_size']
+
+
+def test_synthesis_observes_original_chunk_length(controller, monkeypatch, fake_backend):
+    monkeypatch.setattr(audio_utils, 'get_chunk_controller', lambda: controller)
+    text = 'Olá mundo. Tudo bem, sim.'
+
+    # O filtro dramático acrescenta reticências ao texto enviado ao motor
+    audio_utils.synthesize_speech(text, voice_filter='dramatico', backend='fake')
+
+    [state] = controller.snapshot()
+    assert (state['backend'], state['samples']) == ('fake', 1)
+    assert controller._models[('fake', 'pt')].max_chars == len(text)
@@ -0,0 +1,114 @@
+import os
+import threading
+import pytest
+import cli
+from conftest import paragraphs
+
+OPTIONS = {
+    'lang': 'pt', 'voice': 'feminina', 'filter': 'normal', 'pitch': 'normal',
+    'speed': 'normal', 'backend': 'fake', 'chunk_size': 500, 'concurrency': 2,
+    'merge': False,
+}
+
+
+@pytest.fixture
+def documents(tmp_path, monkeypatch):
+    # Estado que os processos de trabalho recebem em _init_worker
+    monkeypatch.setattr(cli, '_backend_slots', threading.BoundedSemaphore(2))
+    monkeypatch.setattr(cli, '_manifest_lock', threading.Lock())
+    input_dir = tmp_path / 'docs'
+    (input_dir / 'capitulos').mkdir(parents=True)
+    (input_dir / 'letra.txt').write_text(
+        paragraphs('refrão', 'estrofe', 'refrão', 'refrão'), encoding='utf-8')
+    (input_dir / 'capitulos' / 'um.md').write_text(
+        paragraphs('início', 'meio', 'fim'), encoding='utf-8')
+    return str(input_dir), str(tmp_path / 'saida')
+
+
+def convert(document, input_dir, output_dir, options=OPTIONS):
+    completed = cli.load_manifest(output_dir).get(document, {})
+    return cli.convert_document(document, input_dir, output_dir, options, completed)
+
+
+def test_repeated_chunks_are_synthesized_once(documents, fake_backend):
+    input_dir, output_dir = documents
+    calls = fake_backend.calls
+
+    result = convert('letra.txt', input_dir, output_dir)
+
+    assert result['chunks'] == 4
+    assert result['synthesized_chunks'] == 2
+    assert result['deduplicated_chunks'] == 2
+    assert fake_backend.calls - calls == 2
+    assert sorted(os.listdir(os.path.join(output_dir, 'letra.txt'))) == [
+        cli.get_part_filename(i) for i in range(4)]
+
+
+def test_resume_skips_chunks_in_manifest(documents, fake_backend):
+    input_dir, output_dir = documents
+    convert('capitulos/um.md', input_dir, output_dir)
+    calls = fake_backend.calls
+
+    result = convert('capitulos/um.md', input_dir, output_dir)
+    assert (result['chunks'], result['skipped_chunks']) == (0, 3)
+    assert fake_backend.calls == calls
+
+    # Parte apagada do disco: só ela é sintetizada de novo
+    os.remove(os.path.join(output_dir, 'capitulos', 'um.md', cli.get_part_filename(1)))
+    result = convert('capitulos/um.md', input_dir, output_dir)
+    assert (result['chunks'], result['skipped_chunks']) == (1, 2)
+    assert fake_backend.calls - calls == 1
+
+
+def test_same_stem_documents_do_not_share_output(documents):
+    input_dir, output_dir = documents
+    with open(os.path.join(input_dir, 'letra.md'), 'w', encoding='utf-8') as f:
+        f.write(paragraphs('outra', 'letra'))
+    options = dict(OPTIONS, merge=True)
+
+    convert('letra.txt', input_dir, output_dir, options)
+    convert('letra.md', input_dir, output_dir, options)
+    result = convert('letra.txt', input_dir, output_dir, options)
+
+    assert (result['chunks'], result['skipped_chunks']) == (0, 4)
+    assert len(os.listdir(os.path.join(output_dir, 'letra.txt'))) == 4
+    assert len(os.listdir(os.path.join(output_dir, 'letra.md'))) == 2
+    assert (os.path.getsize(os.path.join(output_dir, 'letra.txt.mp3'))
+            > os.path.getsize(os.path.join(output_dir, 'letra.md.mp3')))
+
+
+def test_changed_voice_invalidates_manifest(documents):
+    input_dir, output_dir = documents
+    convert('capitulos/um.md', input_dir, output_dir)
+
+    result = convert('capitulos/um.md', input_dir, output_dir,
+                     dict(OPTIONS, voice='masculina'))
+    assert result['chunks'] == 3
+
+
+def test_manifest_is_grouped_by_document(documents):
+    input_dir, output_dir = documents
+    convert('letra.txt', input_dir, output_dir)
+    convert('capitulos/um.md', input_dir, output_dir)
+
+    manifest = cli.load_manifest(output_dir)
+    assert sorted(manifest) == ['capitulos/um.md', 'letra.txt']
+    assert sorted(manifest['letra.txt']) == [0, 1, 2, 3]
+
+
+def test_main_resumes_previous_run(documents, capsys):
+    input_dir, output_dir = documents
+    args = [input_dir, output_dir, '--backend', 'fake', '--workers', '1']
+
+    assert cli.main(args) == 0
+    assert "Chunks: 5 sintetizados (7 gravados), 0 retomados" in capsys.readouterr().out
+
+    assert cli.main(args) == 0
+    assert "Chunks: 0 sintetizados (0 gravados), 7 retomados" in capsys.readouterr().out
+
+
+def test_voice_is_validated_for_language(documents):
+    input_dir, output_dir = documents
+    with pytest.raises(SystemExit):
+        cli.parse_args([input_dir, output_dir, '--lang', 'en', '--voice', 'infantil'])
+    assert cli.parse_args([input_dir, output_dir, '--lang', 'es']).voice == 'feminina'
@@ -0,0 +1,166 @@
+import threading
+import time
+import pytest
+from config import DISTRIBUTED_CONFIG
+from utils.audio_utils import synthesize_speech
+from utils.distributed import (
+    Coordinator, ContentStore, SQLiteWorkQueue, TaskFailedError, Worker, task_key
+)
+
+PARAMS = dict(language='pt', speed_option='normal', voice_type='feminina',
+              voice_filter='normal', pitch='normal')
+
+
+@pytest.fixture
+def queue(tmp_path):
+    config = dict(DISTRIBUTED_CONFIG, lease_seconds=0.1, max_attempts=2, retry_delay=0.0)
+    return SQLiteWorkQueue(str(tmp_path / 'queue.sqlite3'), config)
+
+
+def enqueue(queue, job_id, chunks):
+    queue.enqueue(job_id, [(i, task_key(chunk, PARAMS), dict(PARAMS, text=chunk))
+                           for i, chunk in enumerate(chunks)])
+
+
+def test_claimed_task_is_not_claimed_again_while_leased(queue):
+    enqueue(queue, 'job', ["Olá."])
+
+    [task] = queue.claim('w1')
+    assert task['attempts'] == 1
+    assert queue.claim('w2') == []
+
+
+def test_expired_lease_is_claimed_by_another_worker(queue):
+    enqueue(queue, 'job', ["Olá."])
+    [first] = queue.claim('w1')
+
+    time.sleep(0.15)
+    [second] = queue.claim('w2')
+    assert second['id'] == first['id']
+    assert (second['worker'], second['attempts']) == ('w2', 2)
+
+
+def test_task_fails_when_leases_expire_on_every_attempt(queue):
+    enqueue(queue, 'job', ["Olá."])
+    queue.claim('w1')
+    time.sleep(0.15)
+    queue.claim('w2')
+    time.sleep(0.15)
+
+    assert queue.claim('w3') == []
+    [row] = queue.collect('job')
+    assert row['status'] == 'failed'
+
+
+def test_failed_attempt_returns_to_queue_until_max_attempts(queue):
+    enqueue(queue, 'job', ["Olá."])
+
+    [task] = queue.claim('w1')
+    queue.fail(task['id'], "erro 1")
+    [task] = queue.claim('w1')
+    assert task['attempts'] == 2
+    queue.fail(task['id'], "erro 2")
+
+    assert queue.claim('w1') == []
+    [row] = queue.collect('job')
+    assert (row['status'], row['error']) == ('failed', "erro 2")
+
+
+def test_late_completion_after_lease_expiry_is_kept(queue):
+    enqueue(queue, 'job', ["Olá."])
+    [task] = queue.claim('w1')
+    time.sleep(0.15)
+    queue.claim('w2')
+
+    queue.complete(task['id'], task['key'], 'digest')
+    [row] = queue.collect('job')
+    assert (row['status'], row['digest']) == ('done', 'digest')
+    assert queue.collect('job') == []
+
+
+def test_known_audio_is_not_enqueued_again(queue):
+    enqueue(queue, 'first', ["Olá."])
+    [task] = queue.claim('w1')
+    queue.complete(task['id'], task['key'], 'digest')
+
+    enqueue(queue, 'second', ["Olá."])
+    assert queue.claim('w1') == []
+    [row] = queue.collect('second')
+    assert row['digest'] == 'digest'
+
+
+def test_workers_produce_the_same_audio_as_local_synthesis(tmp_path, queue):
+    store = ContentStore(str(tmp_path / 'store'))
+    worker = Worker(queue, store, threads=2)
+    thread = threading.Thread(target=worker.run, daemon=True)
+    thread.start()
+    chunks = ["Primeira parte.", "Refrão repetido.", "Segunda parte.", "Refrão repetido."]
+    try:
+        coordinator = Coordinator(queue, store, poll_interval=0.01)
+        received = list(coordinator.iter_ordered('job', chunks, PARAMS))
+    finally:
+        worker.stop()
+        thread.join(10)
+
+    assert [index for index, _ in received] == [0, 1, 2, 3]
+    assert [audio for _, audio in received] == [
+        synthesize_speech(chunk, backend='fake') for chunk in chunks]
+    assert worker.done == 3  # O refrão repetido vira uma única tarefa
+
+
+def test_coordinator_reports_failed_tasks(tmp_path, queue):
+    store = ContentStore(str(tmp_path / 'store'))
+    coordinator = Coordinator(queue, store, poll_interval=0.01)
+    results = coordinator.run('job', ["Olá."], [0], PARAMS)
+
+    def fail_task():
+        failures = 0
+        while failures < 2:
+            tasks = queue.claim('w1')
+            if not tasks:
+                time.sleep(0.01)
+                continue
+            queue.fail(tasks[0]['id'], "motor indisponível")
+            failures += 1
+
+    failer = threading.Thread(target=fail_task, daemon=True)
+    failer.start()
+    [(_, index, error)] = list(results)
+    failer.join(10)
+
+    assert index == 0
+    assert isinstance(error, TaskFailedError)
+    assert queue.counts() == {}  # Tarefas do job removidas ao final
+
+
+def test_coordinator_gives_up_without_workers(tmp_path, queue):
+    coordinator = Coordinator(queue, ContentStore(str(tmp_path / 'store')),
+                              poll_interval=0.01, stall_timeout=0.2)
+
+    started = time.monotonic()
+    results = list(coordinator.run('job', ["Um.", "Dois."], [0, 1], PARAMS))
+
+    assert time.monotonic() - started < 5
+    assert [index for _, index, _ in results] == [0, 1]
+    assert all(isinstance(error, TaskFailedError) for _, _, error in results)
+    assert queue.counts() == {}
+
+
+def test_coordinator_gives_up_on_tasks_removed_from_queue(tmp_path, queue):
+    coordinator = Coordinator(queue, ContentStore(str(tmp_path / 'store')),
+                              poll_interval=0.01, stall_timeout=0.2)
+    queue.heartbeat('w1', 0, 0)  # Worker ativo, mas as tarefas somem da fila
+    results = coordinator.run('job', ["Um."], [0], PARAMS)
+
+    def purge_tasks():
+        while not queue.open_tasks('job'):
+            time.sleep(0.01)
+        queue.release('job')
+
+    purger = threading.Thread(target=purge_tasks, daemon=True)
+    purger.start()
+    [(_, index, error)] = list(results)
+    purger.join(10)
+
+    assert index == 0
+    assert "removida" in str(error)
@@ -0,0 +1,68 @@
+import pytest
+from utils import dsp
+
+np = pytest.importorskip('numpy')
+
+SAMPLE_RATE = 16000
+
+
+def tone(frequency=220.0, seconds=2.0):
+    t = np.arange(int(SAMPLE_RATE * seconds)) / SAMPLE_RATE
+    return (0.5 * np.sin(2 * np.pi * frequency * t)).astype(np.float32)
+
+
+def dominant_frequency(samples):
+    # Trecho central, longe das bordas das janelas
+    middle = samples[samples.size // 4:3 * samples.size // 4]
+    spectrum = np.abs(np.fft.rfft(middle * np.hanning(middle.size)))
+    return np.argmax(spectrum) * SAMPLE_RATE / middle.size
+
+
+@pytest.mark.parametrize('multiplier', [0.8, 1.25, 1.5])
+def test_pitch_shift_keeps_length_and_scales_frequency(multiplier):
+    samples = tone()
+    shifted = dsp.pitch_shift(samples, SAMPLE_RATE, multiplier)
+
+    assert abs(shifted.size - samples.size) <= 2
+    assert dominant_frequency(shifted) == pytest.approx(220 * multiplier, rel=0.02)
+
+
+@pytest.mark.parametrize('effect', ['robot', 'whisper'])
+def test_effects_keep_length(effect):
+    samples = tone()
+    assert dsp.EFFECTS[effect](samples, SAMPLE_RATE).size == samples.size
+
+
+def test_echo_adds_the_tail_of_the_repeats():
+    samples = tone()
+    options = {'delay': 0.1, 'decay': 0.5, 'repeats': 3}
+    echoed = dsp.echo(samples, SAMPLE_RATE, **options)
+    assert echoed.size == samples.size + int(SAMPLE_RATE * 0.1) * 3
+
+
+def test_nothing_to_apply_returns_the_original_audio():
+    audio = b'\xff\xfb' + bytes(100)
+    assert dsp.apply_audio_effects(audio, 'normal', 'normal', 'normal') is audio
+
+
+@pytest.mark.parametrize('ratio', [0.75, 1.25, 1.5])
+def test_time_stretch_scales_length_and_keeps_pitch(ratio):
+    samples = tone()
+    stretched = dsp.time_stretch(samples, SAMPLE_RATE, ratio)
+
+    assert stretched.size == int(samples.size / ratio)
+    assert dominant_frequency(stretched) == pytest.approx(220, rel=0.02)
+
+
+def test_pitch_and_tempo_in_one_pass():
+    samples = tone()
+    shifted = dsp.pitch_shift(samples, SAMPLE_RATE, 1.2, tempo=2.0)
+
+    assert shifted.size == pytest.approx(samples.size / 2, abs=2)
+    assert dominant_frequency(shifted) == pytest.approx(220 * 1.2, rel=0.02)
+
+
+def test_speed_options_map_to_stretch_ratios():
+    assert dsp.speed_ratio('normal') == 1.0
+    assert dsp.speed_ratio('rapida') > 1.0 > dsp.speed_ratio('lenta')
+    assert dsp.needs_processing('normal', 'normal', 'rapida')
@@ -0,0 +1,81 @@
+import base64
+import io
+import pytest
+import requests
+from requests.adapters import BaseAdapter
+import utils.backends as backends
+from gtts import gTTSError
+from utils.backends import (
+    BackendTimeoutError, GTTSBackend, RateLimitError, ServerError
+)
+from utils.metrics import metrics
+
+
+class StubAdapter(BaseAdapter):
+    """Responde às requisições do gTTS sem rede"""
+
+    def __init__(self, status=200, headers=None, error=None):
+        super().__init__()
+        self.status = status
+        self.headers = headers or {}
+        self.error = error
+        self.sent = 0
+
+    def send(self, request, **kwargs):
+        self.sent += 1
+        if self.error:
+            raise self.error
+        response = requests.Response()
+        response.status_code = self.status
+        response.headers.update(self.headers)
+        response.request = request
+        response.url = request.url
+        audio = base64.b64encode(b'parte-%d' % self.sent).decode('ascii')
+        response.raw = io.BytesIO(f'[["wrb.fr","jQ1olc","[\\"{audio}\\"]"]]\n'.encode())
+        return response
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def adapter(monkeypatch):
+    stub = StubAdapter()
+    session = requests.Session()
+    session.mount('https://', stub)
+    monkeypatch.setattr(backends, 'get_http_session', lambda tld: session)
+    return stub
+
+
+def test_parts_use_the_shared_session(adapter):
+    before = metrics.summary().get('tts_first_part', {'count': 0})['count']
+    fp = io.BytesIO()
+    # Acima de 100 caracteres, o gTTS faz uma requisição por frase
+    GTTSBackend().write_to_fp(fp, "Uma frase curta. " * 7)
+
+    assert adapter.sent == 7
+    assert fp.getvalue() == b''.join(b'parte-%d' % i for i in range(1, 8))
+    assert metrics.summary()['tts_first_part']['count'] == before + 1
+
+
+@pytest.mark.parametrize('status, headers, expected', [
+    (429, {'Retry-After': '3'}, RateLimitError),
+    (503, {}, ServerError),
+    (400, {}, gTTSError),
+])
+def test_http_errors_are_translated(adapter, status, headers, expected):
+    adapter.status, adapter.headers = status, headers
+    with pytest.raises(expected) as error:
+        GTTSBackend().write_to_fp(io.BytesIO(), "Olá.")
+    if expected is RateLimitError:
+        assert error.value.retry_after == 3.0
+
+
+@pytest.mark.parametrize('failure, expected', [
+    (requests.exceptions.ReadTimeout("lento"), BackendTimeoutError),
+    (requests.exceptions.ConnectionError("recusada"), ServerError),
+])
+def test_network_errors_are_translated(adapter, failure, expected):
+    adapter.error = failure
+    with pytest.raises(expected):
+        GTTSBackend().write_to_fp(io.BytesIO(), "Olá.")
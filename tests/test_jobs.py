@@ -0,0 +1,90 @@
+import os
+import time
+import pytest
+from conftest import paragraphs
+from config import LIMITS
+from utils.jobs import DONE, FAILED, JobManager, JobStore
+from utils.mp3 import stream_info
+
+VOICE = dict(language='pt', speed_option='normal', voice_type='feminina',
+             voice_filter='normal', pitch='normal')
+
+
+@pytest.fixture
+def manager(tmp_path, monkeypatch):
+    # Motor local: sem o limite de taxa global entre os testes, e chunks do
+    # tamanho padrão (o controle adaptativo aprende com os testes anteriores)
+    monkeypatch.setattr('utils.jobs.get_rate_limiter', lambda: None)
+    monkeypatch.setattr('utils.jobs.adaptive_chunk_size',
+                        lambda text, language: LIMITS['chunk_size'])
+    return JobManager(JobStore(str(tmp_path / 'jobs')), max_jobs=1)
+
+
+def wait_for(manager, job_id, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = manager.get(job_id)
+        if job['status'] in (DONE, FAILED):
+            return job
+        time.sleep(0.02)
+    raise AssertionError(f"job {job_id} não terminou")
+
+
+def test_repeated_chunks_are_synthesized_once(manager, fake_backend):
+    text = paragraphs('refrão', 'estrofe', 'refrão', 'refrão', 'fim')
+    calls = fake_backend.calls
+
+    job = wait_for(manager, manager.submit(text, **VOICE))
+
+    assert job['status'] == DONE
+    assert job['total_chunks'] == 5
+    assert job['saved_calls'] == 2
+    assert fake_backend.calls - calls == 3
+    store = manager.store
+    assert store.read_part(job['id'], 0) == store.read_part(job['id'], 3)
+
+
+def test_retry_synthesizes_only_missing_parts(manager, fake_backend):
+    text = paragraphs('um', 'dois', 'três', 'quatro')
+    job = wait_for(manager, manager.submit(text, **VOICE))
+    store = manager.store
+    original = [store.read_part(job['id'], i) for i in range(4)]
+
+    # Simula uma execução interrompida: duas partes não chegaram a ser gravadas
+    os.remove(store.part_path(job['id'], 1))
+    os.remove(store.part_path(job['id'], 3))
+    store.update(job['id'], status=FAILED, error="interrompido")
+    calls = fake_backend.calls
+
+    assert manager.retry(job['id'])
+    job = wait_for(manager, job['id'])
+
+    assert job['status'] == DONE
+    assert fake_backend.calls - calls == 2
+    assert [store.read_part(job['id'], i) for i in range(4)] == original
+
+
+def test_edit_reuses_unchanged_parts_of_previous_job(manager, fake_backend):
+    previous = wait_for(manager, manager.submit(paragraphs('um', 'dois', 'três'), **VOICE))
+    calls = fake_backend.calls
+
+    job = wait_for(manager, manager.submit(
+        paragraphs('um', 'dois', 'três editado'), previous_job_id=previous['id'], **VOICE))
+
+    assert job['status'] == DONE
+    assert job['reused_chunks'] == 2
+    assert fake_backend.calls - calls == 1
+
+
+def test_merged_job_and_parts_zip(manager):
+    text = paragraphs('um', 'dois', 'três')
+    merged = wait_for(manager, manager.submit(text, merge=True, **VOICE))
+    store = manager.store
+
+    with store.open_parts(merged['id'], 3) as parts, store.open_merged(merged['id']) as audio:
+        expected = sum(stream_info(part)['duration'] for part in parts.parts())
+        assert stream_info(audio.part(0))['duration'] == pytest.approx(expected)
+
+    separate = wait_for(manager, manager.submit(text, **VOICE))
+    assert os.path.exists(store.zip_path(separate['id']))
+    assert not os.path.exists(store.merged_path(separate['id']))
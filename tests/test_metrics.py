@@ -0,0 +1,41 @@
+import json
+import pytest
+from utils.metrics import Histogram, MetricsRegistry
+
+
+def test_histogram_quantiles_interpolate_within_buckets():
+    histogram = Histogram(buckets=(0.1, 0.2, 0.4))
+    for value in (0.05, 0.15, 0.15, 0.3):
+        histogram.observe(value)
+
+    assert (histogram.count, histogram.max) == (4, 0.3)
+    assert histogram.counts == [1, 2, 1, 0]
+    assert histogram.quantile(0.5) == pytest.approx(0.15)
+    assert histogram.quantile(1.0) == pytest.approx(0.3)  # Limitado ao máximo
+    assert Histogram().quantile(0.5) == 0.0
+
+
+def test_registry_summary_and_exports(tmp_path):
+    log_path = tmp_path / 'metricas.jsonl'
+    registry = MetricsRegistry(log_path=str(log_path))
+    registry.observe('merge', 0.002)
+    with registry.timer('split_text'):
+        pass
+
+    summary = registry.summary()
+    assert sorted(summary) == ['merge', 'split_text']
+    assert summary['merge']['count'] == 1
+    assert summary['merge']['mean'] == pytest.approx(0.002)
+
+    assert json.loads(registry.to_json())['stages']['merge']['count'] == 1
+    prometheus = registry.to_prometheus()
+    assert 'ttv_stage_duration_seconds_count{stage="merge"} 1' in prometheus
+    assert 'ttv_stage_duration_seconds_bucket{stage="merge",le="+Inf"} 1' in prometheus
+    assert [json.loads(line)['stage'] for line in log_path.read_text().splitlines()] == [
+        'merge', 'split_text']
+
+
+def test_disabled_registry_records_nothing():
+    registry = MetricsRegistry(enabled=False)
+    registry.observe('merge', 1.0)
+    assert registry.summary() == {}
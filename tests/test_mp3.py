@@ -0,0 +1,54 @@
+import pytest
+from utils.mp3 import (
+    MP3MergeWriter, stream_info, iter_frames, audio_payload_bounds,
+    is_vbr_info_frame, xing_frame_count
+)
+
+TEXTS = ("Primeira parte.", "Segunda parte, um pouco maior que a primeira.", "Fim.")
+
+# Tag ID3v2.4 mínima (10 bytes de cabeçalho + 10 de conteúdo)
+ID3_TAG = b'ID3\x04\x00\x00\x00\x00\x00\x0a' + b'\x00' * 10
+
+
+def merge(parts, path):
+    with open(path, 'w+b') as f:
+        writer = MP3MergeWriter(f)
+        for part in parts:
+            writer.add(part)
+        size = writer.finish()
+        f.seek(0)
+        return size, f.read()
+
+
+def test_merged_duration_comes_from_xing_frame(tmp_path, fake_backend):
+    parts = [fake_backend.synthesize(text) for text in TEXTS]
+    size, merged = merge(parts, tmp_path / 'merged.mp3')
+
+    assert size == len(merged)
+    start, end = audio_payload_bounds(merged)
+    offset, header = next(iter_frames(merged, start, end))
+    assert is_vbr_info_frame(merged, offset, header)
+
+    frames = sum(stream_info(part)['frames'] for part in parts)
+    assert xing_frame_count(merged, offset, header) == frames
+
+    info = stream_info(merged)
+    assert info['frames'] == frames
+    assert info['duration'] == pytest.approx(sum(stream_info(p)['duration'] for p in parts))
+
+
+def test_merge_drops_tags_and_accepts_memoryviews(tmp_path, fake_backend):
+    parts = [fake_backend.synthesize(text) for text in TEXTS]
+    _, plain = merge(parts, tmp_path / 'plain.mp3')
+    _, tagged = merge([memoryview(ID3_TAG + part) for part in parts], tmp_path / 'tagged.mp3')
+
+    assert tagged == plain
+
+
+def test_merging_a_merged_file_keeps_one_xing_frame(tmp_path, fake_backend):
+    parts = [fake_backend.synthesize(text) for text in TEXTS]
+    _, merged = merge(parts, tmp_path / 'merged.mp3')
+    _, twice = merge([merged, parts[0]], tmp_path / 'twice.mp3')
+
+    expected = stream_info(merged)['frames'] + stream_info(parts[0])['frames']
+    assert stream_info(twice)['frames'] == expected
@@ -0,0 +1,74 @@
+import pytest
+import utils.previews as previews
+from config import BACKEND_OPTIONS, SPEED_OPTIONS
+from utils.audio_utils import get_voice_preview_text, text_to_speech
+
+LANGUAGES = ['pt']
+
+
+@pytest.fixture
+def rendered(monkeypatch, tmp_path):
+    # Sem limite de taxa: o motor fake responde na hora
+    monkeypatch.setattr(previews, 'get_rate_limiter', lambda: None)
+    calls = []
+    failing_pitches = set()
+
+    def counting_text_to_speech(text, language, *args, **kwargs):
+        calls.append((text, language) + args)
+        if args[-1] in failing_pitches:
+            raise RuntimeError("motor indisponível")
+        return text_to_speech(text, language, *args, **kwargs)
+
+    monkeypatch.setattr(previews, 'text_to_speech', counting_text_to_speech)
+    return calls, failing_pitches, str(tmp_path / 'previews.bin')
+
+
+def test_bundle_round_trip(rendered):
+    calls, _, path = rendered
+    summary = previews.build_preview_bundle(path, languages=LANGUAGES, workers=2)
+    combinations = list(previews.preview_combinations(LANGUAGES))
+    assert summary['combinations'] == len(combinations) == len(calls)
+    assert summary['failed'] == 0
+    assert summary['distinct_audios'] <= summary['combinations']
+
+    bundle = previews.open_bundle(path, previews.bundle_fingerprint(languages=LANGUAGES))
+    try:
+        assert len(bundle) == len(combinations)
+        for combination in combinations[::37]:
+            language, voice_type, voice_filter, speed_option, pitch = combination
+            audio = bundle.get(*combination)
+            expected = text_to_speech(
+                get_voice_preview_text(voice_type, voice_filter), language,
+                SPEED_OPTIONS[speed_option]['slow'], speed_option, voice_type,
+                voice_filter, pitch)
+            assert audio.tobytes() == expected
+            audio.release()
+        assert bundle.get('pt', 'feminina', 'normal', 'normal', 'inexistente') is None
+    finally:
+        bundle.close()
+
+
+def test_changed_audio_options_invalidate_bundle(rendered, monkeypatch):
+    _, _, path = rendered
+    previews.build_preview_bundle(path, languages=LANGUAGES, workers=2)
+    fingerprint = previews.bundle_fingerprint(languages=LANGUAGES)
+
+    monkeypatch.setitem(BACKEND_OPTIONS, 'fake', {'latencia': 1})
+    assert previews.bundle_fingerprint(languages=LANGUAGES) != fingerprint
+    assert previews.open_bundle(path, previews.bundle_fingerprint(languages=LANGUAGES)) is None
+
+
+def test_rebuild_synthesizes_only_failed_combinations(rendered):
+    calls, failing_pitches, path = rendered
+    failing_pitches.add('grave')
+
+    summary = previews.build_preview_bundle(path, languages=LANGUAGES, workers=2)
+    failed = summary['failed']
+    assert failed > 0 and summary['first_error'].endswith("motor indisponível")
+    assert summary['combinations'] == len(calls) - failed
+
+    calls.clear()
+    failing_pitches.clear()
+    summary = previews.build_preview_bundle(path, languages=LANGUAGES, workers=2)
+    assert (summary['failed'], len(calls)) == (0, failed)
+    assert all(call[-1] == 'grave' for call in calls)
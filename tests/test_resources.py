@@ -0,0 +1,25 @@
+import datetime
+import requests
+from requests.adapters import HTTPAdapter
+from utils.metrics import metrics
+from utils.resources import _TTSAdapter
+
+
+def test_adapter_counts_requests_and_times_headers(monkeypatch):
+    def send(self, request, **kwargs):
+        response = requests.Response()
+        response.status_code = 200
+        response.elapsed = datetime.timedelta(milliseconds=30)
+        return response
+
+    monkeypatch.setattr(HTTPAdapter, 'send', send)
+    adapter = _TTSAdapter()
+    before = metrics.summary().get('tts_headers', {'count': 0})['count']
+
+    for _ in range(3):
+        adapter.send(requests.Request('GET', 'https://exemplo.test/').prepare())
+
+    assert adapter.stats() == {'requests': 3, 'in_flight': 0, 'peak': 1}
+    summary = metrics.summary()['tts_headers']
+    assert summary['count'] == before + 3
+    assert summary['max'] >= 0.03
@@ -0,0 +1,152 @@
+import pytest
+from config import RETRY_CONFIG
+from utils.backends import RateLimitError, ServerError, TTSBackendError
+from utils.retry import CircuitBreaker, CircuitOpenError, call_with_retry
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class CountingLimiter:
+    def __init__(self):
+        self.tokens = 0
+
+    def acquire(self):
+        self.tokens += 1
+
+
+def failing(errors, result=b'audio'):
+    """Função que levanta os erros de `errors` em ordem e depois retorna `result`"""
+    errors = list(errors)
+    calls = []
+
+    def function():
+        calls.append(len(calls))
+        if errors:
+            raise errors.pop(0)
+        return result
+    return function, calls
+
+
+def test_transient_errors_are_retried_with_exponential_backoff():
+    function, calls = failing([ServerError("503"), ServerError("503"), ServerError("503")])
+    delays = []
+
+    assert call_with_retry(function, max_attempts=4, sleep=delays.append) == b'audio'
+    assert len(calls) == 4
+    assert len(delays) == 3
+    for attempt, delay in enumerate(delays):
+        assert 0 <= delay <= min(RETRY_CONFIG['max_delay'],
+                                 RETRY_CONFIG['base_delay'] * 2 ** attempt)
+
+
+def test_retry_after_is_respected():
+    function, _ = failing([RateLimitError("429", retry_after=3.0)])
+    delays = []
+
+    call_with_retry(function, max_attempts=2, sleep=delays.append)
+    assert delays[0] >= 3.0
+
+
+def test_non_retryable_errors_are_raised_immediately():
+    function, calls = failing([TTSBackendError("idioma inválido")])
+    delays = []
+
+    with pytest.raises(TTSBackendError):
+        call_with_retry(function, max_attempts=5, sleep=delays.append)
+    assert len(calls) == 1
+    assert delays == []
+
+
+def test_last_error_is_raised_after_max_attempts():
+    function, calls = failing([ServerError(str(i)) for i in range(5)])
+    delays = []
+
+    with pytest.raises(ServerError, match='2'):
+        call_with_retry(function, max_attempts=3, sleep=delays.append)
+    assert len(calls) == 3
+    assert len(delays) == 2
+
+
+def test_every_attempt_takes_a_rate_limit_token():
+    function, calls = failing([ServerError("503"), ServerError("503")])
+    limiter = CountingLimiter()
+
+    call_with_retry(function, max_attempts=3, sleep=lambda _: None, rate_limiter=limiter)
+    assert limiter.tokens == len(calls) == 3
+
+
+def test_breaker_opens_and_recovers_after_reset_timeout():
+    clock = FakeClock()
+    breaker = CircuitBreaker(('fake', 'com'), failure_threshold=2, reset_timeout=10.0,
+                             clock=clock)
+    breaker.record_failure()
+    breaker.before_call()  # Ainda fechado
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+
+    clock.now = 4.0
+    with pytest.raises(CircuitOpenError) as error:
+        breaker.before_call()
+    assert error.value.retry_after == pytest.approx(6.0)
+
+    # Após o prazo, uma única chamada de teste passa
+    clock.now = 10.0
+    breaker.before_call()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    breaker.before_call()
+
+
+def test_failed_trial_reopens_the_breaker():
+    clock = FakeClock()
+    breaker = CircuitBreaker(('fake', 'com'), failure_threshold=1, reset_timeout=10.0,
+                             clock=clock)
+    breaker.record_failure()
+    clock.now = 10.0
+    breaker.before_call()
+    breaker.record_failure()
+
+    assert breaker.state == CircuitBreaker.OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+
+def test_open_breaker_waits_instead_of_calling_the_backend():
+    clock = FakeClock()
+    breaker = CircuitBreaker(('fake', 'com'), failure_threshold=1, reset_timeout=10.0,
+                             clock=clock)
+    function, calls = failing([ServerError("503")] * 3)
+    delays = []
+
+    def sleep(delay):
+        delays.append(delay)  # Relógio parado: o circuito continua aberto
+
+    with pytest.raises(CircuitOpenError):
+        call_with_retry(function, breaker, max_attempts=3, sleep=sleep)
+    assert len(calls) == 1
+    # A espera segue o tempo restante do circuito (limitado por max_delay)
+    assert delays[1] >= min(10.0, RETRY_CONFIG['max_delay'])
+
+
+def test_non_retryable_error_releases_the_trial_call():
+    clock = FakeClock()
+    breaker = CircuitBreaker(('fake', 'com'), failure_threshold=1, reset_timeout=1.0,
+                             clock=clock)
+    breaker.record_failure()
+    clock.now = 1.0
+    function, _ = failing([TTSBackendError("idioma inválido")])
+
+    with pytest.raises(TTSBackendError):
+        call_with_retry(function, breaker, max_attempts=3, sleep=lambda _: None)
+    # A chamada de teste foi liberada: a próxima pode ser feita
+    breaker.before_call()
@@ -0,0 +1,43 @@
+import pytest
+from config import SPEECH_RATE_CONFIG, SPEED_OPTIONS
+from utils.speech_rate import SpeechRateModel, count_spoken_chars
+
+
+@pytest.fixture
+def model():
+    return SpeechRateModel(dict(SPEECH_RATE_CONFIG, decay=1.0, min_chars=100))
+
+
+def test_spoken_chars_ignore_spaces_and_punctuation():
+    assert count_spoken_chars("Olá, mundo! 42") == 10
+    assert count_spoken_chars("こんにちは、世界。") == 7
+
+
+def test_defaults_per_language_and_speed(model):
+    assert model.chars_per_second('pt') == (SPEECH_RATE_CONFIG['default_cps'], 'padrão')
+    assert model.chars_per_second('ja')[0] == SPEECH_RATE_CONFIG['language_cps']['ja']
+
+    ratio = SPEED_OPTIONS['rapida'].get('time_stretch', 1.0)
+    assert model.chars_per_second('pt', speed_option='rapida')[0] == pytest.approx(
+        SPEECH_RATE_CONFIG['default_cps'] * ratio)
+
+
+def test_voice_rate_after_enough_observations(model):
+    model.observe('pt', 'masculina', 'normal', 'normal', 60, 5.0)
+    # Poucos caracteres: ainda o padrão
+    assert model.chars_per_second('pt', 'masculina')[1] == 'padrão'
+
+    model.observe('pt', 'masculina', 'normal', 'normal', 60, 5.0)
+    assert model.chars_per_second('pt', 'masculina') == (12.0, 'voz')
+    assert model.estimate_seconds("a" * 24, 'pt', 'masculina') == pytest.approx(2.0)
+
+
+def test_other_voices_use_language_rate_at_their_speed(model):
+    ratio = SPEED_OPTIONS['lenta'].get('time_stretch', 1.0)
+    # Observado em velocidade lenta: convertido para a normal no idioma
+    model.observe('pt', 'feminina', 'normal', 'lenta', 150, 10.0)
+
+    cps, source = model.chars_per_second('pt', 'masculina', 'eco', 'normal')
+    assert source == 'idioma'
+    assert cps == pytest.approx(15.0 / ratio)
+    assert model.chars_per_second('pt', 'masculina', 'eco', 'lenta')[0] == pytest.approx(15.0)
@@ -0,0 +1,94 @@
+import random
+import threading
+import pytest
+from utils import text_stats as ts
+from utils.audio_utils import count_chunks
+
+SAMPLES = [
+    "", "   ", "\n\n\n", "Olá mundo.",
+    "Olá, mundo! Tudo bem? Sim.\n\nNovo parágrafo... com 3.14 e \"citação.\" Fim",
+    "日本語のテキストです。二つ目の文！三つ目？",
+    "한국어 문장입니다. 두 번째 문장!",
+    "中文句子。第二句",
+    "emoji 😀 test 𠀀字 — ok . ! ?",
+    "a_b __ -- 'x.' y\n \n\r\n z",
+    "end.)\"' next",
+    ("A conversão de texto em fala ajuda na acessibilidade. " * 8 + "\n\n") * 20,
+]
+
+
+def random_samples(count=200, seed=1):
+    rnd = random.Random(seed)
+    alphabet = list("ab .!?\n\n\t\"')»日本。！한_-—😀1")
+    return [''.join(rnd.choice(alphabet) for _ in range(rnd.randint(0, 60)))
+            for _ in range(count)]
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    ts.clear_cache()
+
+
+def test_vectorized_scan_matches_regex_fallback():
+    pytest.importorskip('numpy')
+    texts = SAMPLES + random_samples()
+
+    batched = ts._scan(texts)
+    for text, counts in zip(texts, batched):
+        expected = dict(ts._scan_regex(text), chars=len(text))
+        assert counts == expected, repr(text)
+        # Isolado ou em lote (documentos separados por parágrafo): mesmo resultado
+        assert ts._scan([text])[0] == expected, repr(text)
+
+
+def test_regex_fallback_without_numpy(monkeypatch):
+    monkeypatch.setattr(ts, 'np', None)
+    stats = ts.text_stats("Olá mundo. Tudo bem?\n\nSim! Até logo")
+
+    assert stats['words'] == 7
+    assert stats['sentences'] == 4
+    assert stats['paragraphs'] == 2
+
+
+def test_chunks_match_count_chunks():
+    text = SAMPLES[-1]
+    for chunk_size in (200, 500, 1000):
+        assert ts.text_stats(text, chunk_size=chunk_size)['chunks'] == \
+            count_chunks(text, chunk_size)
+
+
+def test_batch_matches_single_document_stats():
+    texts = SAMPLES + random_samples(50, seed=2)
+    singles = [ts.text_stats(text) for text in texts]
+    ts.clear_cache()
+
+    assert ts.text_stats_batch(iter(texts)) == singles
+
+
+def test_memoized_stats_follow_the_requested_options():
+    text = SAMPLES[-1]
+    first = ts.text_stats(text, chunk_size=500)
+    again = ts.text_stats(text, chunk_size=200)
+
+    assert again['chunks'] != first['chunks']
+    assert again['words'] == first['words']
+    assert set(first['durations']) == set(again['durations'])
+
+
+def test_concurrent_chunk_sizes_share_one_cache_entry():
+    text = SAMPLES[-1]
+    ts.clear_cache()
+    sizes = [200 + 50 * i for i in range(8)]
+    results = {}
+
+    def worker(chunk_size):
+        results[chunk_size] = ts.text_stats(text, chunk_size=chunk_size)['chunks']
+
+    threads = [threading.Thread(target=worker, args=(size,)) for size in sizes]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == {size: count_chunks(text, size) for size in sizes}
+    assert ts._cached(ts.text_key(text))['chunks'] == results
@@ -0,0 +1,86 @@
+"""
+Resultado de áudio com memória limitada
+
+As partes MP3 de uma conversão já estão em arquivos (jobs, CLI). A leitura
+é feita por `memoryview` sobre um `mmap` de cada arquivo, sem cópias:
+tamanho, mesclagem, ZIP e informações leem do mesmo lugar, e o sistema
+operacional decide quanto do arquivo fica residente.
+"""
+import mmap
+import os
+
+
+def _map_file(f):
+    """
+    Mapeia o arquivo inteiro somente para leitura
+
+    Returns:
+        tuple: (mmap ou None se o arquivo estiver vazio, memoryview)
+    """
+    if os.fstat(f.fileno()).st_size == 0:
+        return None, memoryview(b'')
+    mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    return mapping, memoryview(mapping)
+
+
+class AudioResult:
+    """
+    Sequência de partes MP3 acessadas por memoryview
+
+    Uso:
+        with AudioResult.from_files(paths) as result:
+            result.part(0)
+    """
+
+    def __init__(self):
+        self._views = []      # memoryview de cada parte
+        self._resources = []  # Arquivos e mmaps abertos (fechados em close)
+        self.nbytes = 0
+
+    @classmethod
+    def from_files(cls, paths):
+        """
+        Abre partes já gravadas em disco (ex.: jobs) sem copiá-las
+        """
+        result = cls()
+        for path in paths:
+            f = open(path, 'rb')
+            mapping, view = _map_file(f)
+            result._resources.append(f)
+            if mapping is not None:
+                result._resources.append(mapping)
+            result._views.append(view)
+            result.nbytes += view.nbytes
+        return result
+
+    def __len__(self):
+        return len(self._views)
+
+    def part(self, index):
+        """
+        memoryview da parte `index` (sem cópia)
+        """
+        return self._views[index]
+
+    def parts(self):
+        """
+        memoryviews de todas as partes, em ordem
+        """
+        return list(self._views)
+
+    def close(self):
+        for view in self._views:
+            view.release()
+        self._views = []
+        for resource in reversed(self._resources):
+            try:
+                resource.close()
+            except BufferError:
+                pass  # Ainda há memoryviews externas; o GC fecha depois
+        self._resources = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
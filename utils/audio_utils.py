@@ -1,75 +1,296 @@
-import io
-import base64
-from gtts import gTTS
-import streamlit as st
+import os
+import hashlib
+import tempfile
+import threading
+import zipfile
 import time
 import re
-from config import VOICE_OPTIONS, VOICE_FILTERS, PITCH_OPTIONS
+from config import (
+    VOICE_OPTIONS, VOICE_FILTERS, SPEED_OPTIONS, PITCH_OPTIONS, CACHE_CONFIG
+)
+from utils import dsp
+from utils.backends import get_backend
+from utils.chunking import get_chunk_controller
+from utils.metrics import metrics, timed
+from utils.mp3 import stream_info
+from utils.retry import call_with_retry, get_circuit_breaker
+from utils.speech_rate import count_spoken_chars, get_speech_rate_model
+from utils.text_pipeline import (
+    SPEED_STEPS, FILTER_STEPS, pitch_steps, get_text_pipeline, run_steps
+)
 
 
 def text_to_speech(text, language='pt', slow=False, speed_option='normal',
-                   voice_type='feminina', voice_filter='normal', pitch='normal'):
+                   voice_type='feminina', voice_filter='normal', pitch='normal',
+                   rate_limiter=None):
     """
-    Converte texto em áudio usando gTTS com controle avançado de voz
+    Converte texto em áudio usando o motor configurado com controle avançado de voz
 
     Args:
         text (str): Texto para converter
         language (str): Código do idioma
-        slow (bool): Velocidade lenta (gTTS)
+        slow (bool): Velocidade lenta
         speed_option (str): Opção de velocidade personalizada
         voice_type (str): Tipo de voz (feminina/masculina/infantil)
         voice_filter (str): Filtro de voz aplicado
         pitch (str): Tom da voz
+        rate_limiter (TokenBucket): Limite de taxa aplicado a cada requisição ao motor
 
     Returns:
         bytes: Dados do áudio em formato MP3
+
+    Raises:
+        TTSBackendError: Falha do motor após as novas tentativas (RateLimitError,
+            BackendTimeoutError, ServerError ou CircuitOpenError)
     """
-    try:
-        # Processar texto baseado na velocidade e filtros
-        processed_text = process_text_for_voice(
-            text, speed_option, voice_filter, pitch)
+    return synthesize_speech(text, language, slow, speed_option,
+                             voice_type, voice_filter, pitch, rate_limiter=rate_limiter)
 
-        # Obter configurações da voz
-        voice_config = get_voice_config(language, voice_type)
 
-        # Ajustar velocidade baseada no tipo de voz
-        adjusted_slow = adjust_speed_for_voice(
-            slow, voice_config, speed_option)
+def synthesize_speech(text, language='pt', slow=False, speed_option='normal',
+                      voice_type='feminina', voice_filter='normal', pitch='normal',
+                      backend=None, rate_limiter=None):
+    """
+    Implementação de text_to_speech com escolha do motor
 
-        # Criar objeto gTTS com configurações de voz
-        tts = gTTS(
-            text=processed_text,
-            lang=language,
-            slow=adjusted_slow,
-            tld=voice_config.get('tld', 'com')
-        )
+    Segura para uso fora da thread do Streamlit (ex.: pool de síntese).
+    `backend` permite escolher o motor (padrão: TTS_BACKEND do config).
+    `rate_limiter` é consultado antes de cada requisição, inclusive das
+    novas tentativas; áudios em cache não consomem tokens.
+    """
+    tts_backend = get_backend(backend)
+
+    # Com NumPy e ffmpeg, filtro, tom e velocidade são aplicados ao áudio:
+    # a síntese usa sempre o texto em velocidade normal (um único render em
+    # cache) e o texto só recebe os filtros de entonação (dramático, animado)
+    audio_effects = dsp.is_available() and dsp.needs_processing(
+        voice_filter, pitch, speed_option)
+    text_speed, text_filter, text_pitch = speed_option, voice_filter, pitch
+    if audio_effects:
+        if dsp.audio_effect_for(voice_filter):
+            text_filter = 'normal'
+        text_speed, text_pitch, slow = 'normal', 'normal', False
+
+    # Processar texto baseado na velocidade e filtros
+    processed_text = process_text_for_voice(
+        text, text_speed, text_filter, text_pitch)
+
+    # Obter configurações da voz
+    voice_config = get_voice_config(language, voice_type)
+
+    # Ajustar velocidade baseada no tipo de voz
+    adjusted_slow = adjust_speed_for_voice(
+        slow, voice_config, text_speed)
+    tld = voice_config.get('tld', 'com')
+
+    # Reaproveitar áudio já sintetizado com os mesmos parâmetros
+    cache = get_audio_cache()
+    if cache is not None:
+        cache_key = AudioCache.make_key(
+            processed_text, language, tld, adjusted_slow, tts_backend.name)
+        audio_data = cache.get(cache_key)
+    else:
+        audio_data = None
+
+    fresh = audio_data is None
+    if audio_data is None:
+        chunk_controller = get_chunk_controller()
+
+        def synthesize_once():
+            # Latência e falhas transitórias alimentam o controle do tamanho dos
+            # chunks; o tamanho observado é o do chunk original, a mesma medida
+            # usada por adaptive_chunk_size ao escolher o tamanho
+            started = time.perf_counter()
+            try:
+                with metrics.timer('tts_total'):
+                    result = tts_backend.synthesize(
+                        processed_text, language, adjusted_slow, tld)
+            except Exception as e:
+                if getattr(e, 'retryable', False):
+                    chunk_controller.observe(tts_backend, language, len(text),
+                                             time.perf_counter() - started, error=True)
+                raise
+            chunk_controller.observe(tts_backend, language, len(text),
+                                     time.perf_counter() - started)
+            return result
+
+        # Falhas transitórias são repetidas com backoff (ver utils/retry.py)
+        audio_data = call_with_retry(
+            synthesize_once, get_circuit_breaker(tts_backend.name, tld),
+            rate_limiter=rate_limiter)
+
+        if cache is not None:
+            cache.put(cache_key, audio_data)
+
+    # O cache guarda a voz sem efeitos, compartilhada entre filtros, tons e velocidades
+    if audio_effects:
+        audio_data = dsp.apply_audio_effects(
+            audio_data, voice_filter, pitch, speed_option)
+
+    # A duração real de cada áudio novo calibra a estimativa antes da síntese
+    if fresh or audio_effects:
+        get_speech_rate_model().observe(
+            language, voice_type, voice_filter, speed_option,
+            count_spoken_chars(text), stream_info(audio_data)['duration'])
+
+    return audio_data
+
+
+class AudioCache:
+    """
+    Cache persistente de áudio MP3 em disco, endereçado por conteúdo
 
-        # Salvar em buffer de memória
-        audio_buffer = io.BytesIO()
-        tts.write_to_fp(audio_buffer)
-        audio_buffer.seek(0)
+    Cada entrada é um arquivo <hash>.mp3. Quando o tamanho total passa de
+    `max_bytes`, os arquivos usados há mais tempo (mtime) são removidos.
+    """
 
-        return audio_buffer.getvalue()
+    def __init__(self, directory, max_bytes):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self._total_bytes = sum(size for _, size, _ in self._entries())
+
+    @staticmethod
+    def make_key(processed_text, language, tld, slow, backend='gtts'):
+        """
+        Gera a chave do cache a partir de todos os parâmetros de síntese
+        """
+        payload = '\x1f'.join(
+            [processed_text, language, tld, '1' if slow else '0', backend])
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.mp3")
+
+    def _entries(self):
+        entries = []
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if entry.is_file() and entry.name.endswith('.mp3'):
+                    stat = entry.stat()
+                    entries.append((entry.path, stat.st_size, stat.st_mtime))
+        return entries
+
+    def get(self, key):
+        """
+        Retorna o áudio em cache ou None
+        """
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+            os.utime(path)  # Marca como usado recentemente (LRU)
+        except OSError:
+            with self._lock:
+                self.misses += 1
+            return None
+
+        with self._lock:
+            self.hits += 1
+        return data
+
+    def put(self, key, data):
+        """
+        Armazena o áudio e remove entradas antigas se necessário
+        """
+        path = self._path(key)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            previous_size = os.path.getsize(path) if os.path.exists(path) else 0
+            os.replace(tmp_path, path)  # Escrita atômica
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return
+
+        with self._lock:
+            self._total_bytes += len(data) - previous_size
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+
+    def _evict(self):
+        entries = sorted(self._entries(), key=lambda e: e[2])
+        self._total_bytes = sum(size for _, size, _ in entries)
+
+        for path, size, _ in entries:
+            if self._total_bytes <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+                self._total_bytes -= size
+            except OSError:
+                pass
+
+    def stats(self):
+        """
+        Retorna contadores de acertos/falhas e ocupação do cache
+        """
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'size_bytes': self._total_bytes
+            }
+
+
+_audio_cache = None
+_audio_cache_lock = threading.Lock()
+
+
+def get_audio_cache():
+    """
+    Retorna o cache de áudio compartilhado pelo processo (ou None se desativado)
+    """
+    global _audio_cache
 
-    except Exception as e:
-        st.error(f"Erro ao gerar áudio: {str(e)}")
+    if not CACHE_CONFIG['enabled']:
         return None
 
+    with _audio_cache_lock:
+        if _audio_cache is None:
+            _audio_cache = AudioCache(
+                CACHE_CONFIG['directory'], CACHE_CONFIG['max_bytes'])
+        return _audio_cache
+
+
+# Fallback para voz feminina padrão
+DEFAULT_VOICE_CONFIG = {
+    'label': 'Voz Padrão',
+    'description': 'Voz padrão',
+    'tld': 'com',
+    'slow_adjustment': 1.0
+}
+
 
 def get_voice_config(language, voice_type):
     """
     Obtém configuração da voz baseada no idioma e tipo
     """
-    if language in VOICE_OPTIONS and voice_type in VOICE_OPTIONS[language]:
-        return VOICE_OPTIONS[language][voice_type]
-    else:
-        # Fallback para voz feminina padrão
-        return {
-            'label': 'Voz Padrão',
-            'description': 'Voz padrão',
-            'tld': 'com',
-            'slow_adjustment': 1.0
-        }
+    return VOICE_OPTIONS.get(language, {}).get(voice_type, DEFAULT_VOICE_CONFIG)
+
+
+def warm_up_resources(backend=None):
+    """
+    Prepara os recursos compartilhados do processo: motor de síntese,
+    pipelines de texto de todas as combinações e cache de áudio
+
+    Returns:
+        dict: Resumo do que foi carregado
+    """
+    tts_backend = get_backend(backend)
+    pipelines = {
+        (speed, voice_filter, pitch): get_text_pipeline(speed, voice_filter, pitch)
+        for speed in SPEED_OPTIONS
+        for voice_filter in VOICE_FILTERS
+        for pitch in PITCH_OPTIONS
+    }
+    get_audio_cache()
+    return {'backend': tts_backend.name, 'pipelines': len(pipelines)}
 
 
 def adjust_speed_for_voice(slow, voice_config, speed_option):
@@ -85,10 +306,14 @@ def adjust_speed_for_voice(slow, voice_config, speed_option):
     return slow
 
 
+@timed('text_processing')
 def process_text_for_voice(text, speed_option, voice_filter, pitch):
     """
     Processa o texto para simular diferentes vozes e filtros
 
+    Velocidade, filtro e tom são aplicados por um pipeline pré-compilado
+    (ver utils/text_pipeline.py), com o mínimo de passagens pelo texto.
+
     Args:
         text (str): Texto original
         speed_option (str): Opção de velocidade
@@ -98,207 +323,282 @@ def process_text_for_voice(text, speed_option, voice_filter, pitch):
     Returns:
         str: Texto processado
     """
-    processed_text = text
-
-    # Aplicar processamento de velocidade
-    processed_text = process_text_for_speed(processed_text, speed_option)
-
-    # Aplicar filtros de voz
-    processed_text = apply_voice_filter(processed_text, voice_filter)
-
-    # Aplicar ajustes de pitch via texto
-    processed_text = apply_pitch_adjustment(processed_text, pitch)
-
-    return processed_text
+    return run_steps(get_text_pipeline(speed_option, voice_filter, pitch), text)
 
 
 def process_text_for_speed(text, speed_option):
     """
     Processa o texto para simular diferentes velocidades
     """
-    if speed_option == 'muito_lenta':
-        return re.sub(r'\s+', ' ... ', text)
-    elif speed_option == 'lenta':
-        return re.sub(r'\s+', ' .. ', text)
-    elif speed_option == 'rapida':
-        text = re.sub(r'\s*,\s*', ', ', text)
-        text = re.sub(r'\s*\.\s*', '. ', text)
-        return text
-    else:  # normal
-        return text
+    return run_steps(SPEED_STEPS.get(speed_option, ()), text)
 
 
 def apply_voice_filter(text, voice_filter):
     """
     Aplica filtros de voz através de processamento de texto
     """
-    if voice_filter == 'robotico':
-        # Adicionar pausas robóticas
-        text = re.sub(r'\b(\w+)\b', r'\1.', text)
-        text = re.sub(r'\.+', '.', text)
-        return text
-
-    elif voice_filter == 'eco':
-        # Simular eco repetindo palavras importantes
-        words = text.split()
-        processed_words = []
-        for i, word in enumerate(words):
-            processed_words.append(word)
-            # Adicionar eco em palavras longas
-            if len(word) > 6 and i % 3 == 0:
-                processed_words.append(f"...{word[-3:]}...")
-        return ' '.join(processed_words)
-
-    elif voice_filter == 'sussurro':
-        # Simular sussurro com pausas suaves
-        return re.sub(r'\s+', ' .. ', text)
-
-    elif voice_filter == 'dramatico':
-        # Adicionar ênfase dramática
-        text = re.sub(r'[.!?]', r'...', text)
-        text = re.sub(r'\b(muito|grande|importante|incrível|fantástico)\b',
-                      r'... \1 ...', text, flags=re.IGNORECASE)
-        return text
-
-    elif voice_filter == 'animado':
-        # Tom mais animado com exclamações
-        text = re.sub(r'\.', '!', text)
-        text = re.sub(r'\b(ótimo|excelente|maravilhoso|fantástico)\b',
-                      r'... \1! ...', text, flags=re.IGNORECASE)
-        return text
-
-    else:  # normal
-        return text
+    return run_steps(FILTER_STEPS.get(voice_filter, ()), text)
 
 
 def apply_pitch_adjustment(text, pitch):
     """
     Simula ajuste de pitch através de modificações no texto
     """
-    pitch_config = PITCH_OPTIONS.get(pitch, PITCH_OPTIONS['normal'])
-    multiplier = pitch_config['multiplier']
+    return run_steps(pitch_steps(pitch), text)
+
 
-    if multiplier < 0.9:  # Voz mais grave
-        # Adicionar pausas para simular voz mais grave
-        text = re.sub(r'\s+', ' . ', text)
-    elif multiplier > 1.1:  # Voz mais aguda
-        # Remover algumas pausas para simular voz mais aguda
-        text = re.sub(r'\s*,\s*', ' ', text)
-        text = re.sub(r'\s+', ' ', text)
+PARAGRAPH_BREAK_RE = re.compile(r'\n\s*\n')
+SENTENCE_END_RE = re.compile(r'[.!?]+[\'")\]»”]*(?=\s|$)')
+NON_SPACE_RE = re.compile(r'\S')
+WORD_START_RE = re.compile(r'(?<!\S)\S')
 
-    return text
+# Caracteres iniciais usados para localizar chunks anteriores no texto editado
+ANCHOR_PREFIX = 32
 
 
+@timed('split_text')
 def split_text(text, max_length=500):
     """
     Divide texto longo em chunks menores de forma inteligente
     """
-    text = text.strip()
-    if not text:
-        return []
+    return list(iter_text_chunks(text, max_length))
 
-    paragraphs = text.split('\n\n')
-    chunks = []
-    current_chunk = ""
 
-    for paragraph in paragraphs:
-        paragraph = paragraph.strip()
-        if not paragraph:
-            continue
+def iter_text_chunks(text, max_length=500):
+    """
+    Versão preguiçosa de split_text: produz os chunks um a um
+    """
+    for start, end in iter_chunk_spans(text, max_length):
+        yield text[start:end]
 
-        if len(current_chunk + paragraph) <= max_length:
-            current_chunk += paragraph + "\n\n"
-        else:
-            if current_chunk.strip():
-                chunks.append(current_chunk.strip())
 
-            if len(paragraph) > max_length:
-                sentence_chunks = split_by_sentences(paragraph, max_length)
-                chunks.extend(sentence_chunks)
-                current_chunk = ""
-            else:
-                current_chunk = paragraph + "\n\n"
+def adaptive_chunk_size(text, language='pt', backend=None, concurrency=None, log=True):
+    """
+    Tamanho de chunk escolhido pelo controle adaptativo para este texto
+    """
+    return get_chunk_controller().chunk_size(
+        get_backend(backend), language, len(text), concurrency, log=log)
 
-    if current_chunk.strip():
-        chunks.append(current_chunk.strip())
 
-    return chunks
+@timed('split_text')
+def count_chunks(text, max_length=500):
+    """
+    Conta os chunks sem criar as strings (chunks previstos em utils/text_stats.py)
+    """
+    return sum(1 for _ in iter_chunk_spans(text, max_length))
 
 
-def split_by_sentences(text, max_length):
+def iter_chunk_spans(text, max_length=500):
     """
-    Divide texto por sentenças
+    Percorre o texto uma única vez e produz os chunks como offsets (início, fim)
+
+    Parágrafos (separados por linha em branco) são agrupados enquanto
+    couberem em `max_length`; parágrafos maiores são divididos por sentenças
+    e, se preciso, por palavras. Cada chunk é text[início:fim], sem espaços
+    nas bordas e com a pontuação e os separadores originais.
     """
-    sentences = re.split(r'[.!?]+', text)
-    chunks = []
-    current_chunk = ""
+    current_start = current_end = None
 
-    for sentence in sentences:
-        sentence = sentence.strip()
-        if not sentence:
+    for paragraph_start, paragraph_end in _paragraph_spans(text):
+        if current_start is not None and paragraph_end - current_start <= max_length:
+            current_end = paragraph_end
             continue
 
-        sentence += "."
+        if current_start is not None:
+            yield current_start, current_end
+            current_start = None
 
-        if len(current_chunk + sentence) <= max_length:
-            current_chunk += " " + sentence if current_chunk else sentence
+        if paragraph_end - paragraph_start > max_length:
+            yield from _sentence_chunk_spans(
+                text, paragraph_start, paragraph_end, max_length)
         else:
-            if current_chunk:
-                chunks.append(current_chunk.strip())
-            current_chunk = sentence
+            current_start, current_end = paragraph_start, paragraph_end
+
+    if current_start is not None:
+        yield current_start, current_end
+
+
+def anchored_chunk_spans(text, previous_chunks, max_length=500):
+    """
+    Divide o texto mantendo os chunks de uma execução anterior que não mudaram
+
+    Chunks anteriores que aparecem inalterados no texto novo (na mesma ordem,
+    começando e terminando em fronteira de palavra) são mantidos exatamente
+    como estavam; só os trechos entre eles são divididos de novo. Assim uma
+    edição altera apenas os chunks ao redor dela, em vez de deslocar as
+    fronteiras de todos os seguintes.
+
+    Args:
+        text (str): Texto novo
+        previous_chunks (list[str]): Chunks da execução anterior, em ordem
+        max_length (int): Tamanho máximo dos chunks novos
+
+    Returns:
+        tuple: (spans, reused) com os offsets (início, fim) de cada chunk e
+        {índice novo: índice anterior} dos chunks mantidos
+    """
+    by_prefix = {}
+    for index, chunk in enumerate(previous_chunks):
+        if chunk:
+            by_prefix.setdefault(chunk[:ANCHOR_PREFIX], []).append(index)
+    # Chunks menores que o prefixo formam chaves mais curtas
+    prefix_lengths = sorted({len(prefix) for prefix in by_prefix}, reverse=True)
+
+    spans, reused = [], {}
+    gap_start = 0
+    last_index = -1
+
+    for match in WORD_START_RE.finditer(text):
+        start = match.start()
+        if start < gap_start:
+            continue  # Dentro de um chunk já mantido
+
+        found = None
+        for length in prefix_lengths:
+            for index in by_prefix.get(text[start:start + length], ()):
+                chunk = previous_chunks[index]
+                end = start + len(chunk)
+                if (index > last_index and text.startswith(chunk, start)
+                        and (end == len(text) or text[end].isspace())):
+                    found = index
+                    break
+            if found is not None:
+                break
+        if found is None:
+            continue
+
+        spans.extend(_gap_spans(text, gap_start, start, max_length))
+        reused[len(spans)] = found
+        spans.append((start, start + len(previous_chunks[found])))
+        gap_start = spans[-1][1]
+        last_index = found
+
+    spans.extend(_gap_spans(text, gap_start, len(text), max_length))
+    return spans, reused
+
+
+def _gap_spans(text, start, end, max_length):
+    return [(start + gap_start, start + gap_end)
+            for gap_start, gap_end in iter_chunk_spans(text[start:end], max_length)]
+
+
+def _trim_span(text, start, end):
+    match = NON_SPACE_RE.search(text, start, end)
+    if match is None:
+        return None
 
-    if current_chunk:
-        chunks.append(current_chunk.strip())
+    start = match.start()
+    while text[end - 1].isspace():
+        end -= 1
+    return start, end
 
-    return chunks
 
+def _paragraph_spans(text):
+    start = 0
+    for match in PARAGRAPH_BREAK_RE.finditer(text):
+        span = _trim_span(text, start, match.start())
+        if span:
+            yield span
+        start = match.end()
 
-def get_download_link(audio_data, filename="audio.mp3"):
+    span = _trim_span(text, start, len(text))
+    if span:
+        yield span
+
+
+def _sentence_spans(text, start, end):
+    for match in SENTENCE_END_RE.finditer(text, start, end):
+        span = _trim_span(text, start, match.end())
+        if span:
+            yield span
+        start = match.end()
+
+    span = _trim_span(text, start, end)
+    if span:
+        yield span
+
+
+def _word_split_spans(text, start, end, max_length):
+    # Sentença maior que o limite: cortar no último espaço que couber
+    while end - start > max_length:
+        limit = start + max_length
+        cut = max(text.rfind(' ', start + 1, limit + 1),
+                  text.rfind('\n', start + 1, limit + 1))
+        if cut <= start:
+            cut = limit
+
+        span = _trim_span(text, start, cut)
+        if span:
+            yield span
+        start = _trim_span(text, cut, end)[0]
+
+    yield start, end
+
+
+def _sentence_chunk_spans(text, start, end, max_length):
+    current_start = current_end = None
+
+    for sentence_start, sentence_end in _sentence_spans(text, start, end):
+        if current_start is not None and sentence_end - current_start <= max_length:
+            current_end = sentence_end
+            continue
+
+        if current_start is not None:
+            yield current_start, current_end
+            current_start = None
+
+        if sentence_end - sentence_start > max_length:
+            yield from _word_split_spans(text, sentence_start, sentence_end, max_length)
+        else:
+            current_start, current_end = sentence_start, sentence_end
+
+    if current_start is not None:
+        yield current_start, current_end
+
+
+def split_by_sentences(text, max_length):
     """
-    Gera link de download estilizado para o áudio
+    Divide texto por sentenças, preservando a pontuação original
     """
-    b64 = base64.b64encode(audio_data).decode()
-    href = f'''
-    <a href="data:audio/mp3;base64,{b64}" download="{filename}"
-       style="text-decoration: none; background: linear-gradient(45deg, #4CAF50, #45a049);
-              color: white; padding: 12px 24px; border-radius: 8px;
-              display: inline-block; margin: 5px; font-weight: bold;
-              box-shadow: 0 4px 8px rgba(0,0,0,0.2); transition: all 0.3s;">
-        Baixar Áudio MP3
-    </a>
-    '''
-    return href
+    return [text[start:end]
+            for start, end in _sentence_chunk_spans(text, 0, len(text), max_length)]
 
 
-def get_multiple_download_links(audio_chunks):
+def get_part_filename(index):
     """
-    Gera links de download para múltiplos chunks com design melhorado
+    Nome do arquivo de uma parte (índice começando em 0)
     """
-    links_html = "<div style='display: flex; flex-wrap: wrap; gap: 8px; margin: 10px 0;'>"
+    return f"audio_parte_{index+1:02d}.mp3"
+
 
-    for i, audio_data in enumerate(audio_chunks):
-        filename = f"audio_parte_{i+1:02d}.mp3"
-        b64 = base64.b64encode(audio_data).decode()
-        link = f'''
-        <a href="data:audio/mp3;base64,{b64}" download="{filename}"
-           style="text-decoration: none; background: linear-gradient(45deg, #2196F3, #1976D2);
-                  color: white; padding: 8px 16px; border-radius: 6px;
-                  display: inline-block; font-size: 14px; font-weight: 500;
-                  box-shadow: 0 2px 4px rgba(0,0,0,0.2); transition: all 0.3s;">
-            Parte {i+1}
-        </a>
-        '''
-        links_html += link
+@timed('download')
+def write_zip_bundle(audio_chunks, fp):
+    """
+    Grava as partes em um ZIP de forma incremental, uma parte por vez
+
+    `audio_chunks` pode ser um gerador; nada além da parte atual fica em
+    memória. MP3 já é comprimido, então as entradas são apenas armazenadas.
+    """
+    with zipfile.ZipFile(fp, 'w', compression=zipfile.ZIP_STORED) as bundle:
+        for i, audio_data in enumerate(audio_chunks):
+            with bundle.open(get_part_filename(i), 'w', force_zip64=True) as entry:
+                entry.write(audio_data)
 
-    links_html += "</div>"
-    return links_html
+    fp.seek(0)
+    return fp
 
 
 def get_audio_info(audio_data):
     """
     Retorna informações sobre o áudio
+
+    Aceita bytes, memoryview ou AudioResult (tamanho total, sem juntar as partes).
+    Duração e bitrate são exatos, lidos dos quadros MP3.
     """
-    size_kb = len(audio_data) / 1024
+    size_bytes = getattr(audio_data, 'nbytes', None)
+    if size_bytes is None:
+        size_bytes = len(audio_data)
+    size_kb = size_bytes / 1024
     size_mb = size_kb / 1024
 
     if size_mb >= 1:
@@ -306,34 +606,47 @@ def get_audio_info(audio_data):
     else:
         size_str = f"{size_kb:.1f} KB"
 
+    parts = audio_data.parts() if hasattr(audio_data, 'parts') else [audio_data]
+    duration = sum(stream_info(part)['duration'] for part in parts)
+
     return {
         'size': size_str,
-        'size_bytes': len(audio_data),
-        'format': 'MP3'
+        'size_bytes': size_bytes,
+        'format': 'MP3',
+        'duration_seconds': duration,
+        'duration': format_duration(duration) if duration else None,
+        'bitrate_kbps': round(size_bytes * 8 / duration / 1000, 1) if duration else None
     }
 
 
-def estimate_duration(text, speed_option='normal'):
+def format_duration(seconds):
     """
-    Estima a duração do áudio baseado no texto e velocidade
+    Formata uma duração em segundos como "45s" ou "3m 20s"
     """
-    wpm_rates = {
-        'muito_lenta': 80,
-        'lenta': 120,
-        'normal': 160,
-        'rapida': 200
-    }
+    if seconds < 60:
+        return f"{int(seconds)}s"
+    minutes = int(seconds // 60)
+    return f"{minutes}m {int(seconds - minutes * 60)}s"
 
-    word_count = len(text.split())
-    wpm = wpm_rates.get(speed_option, 160)
-    duration_minutes = word_count / wpm
 
-    if duration_minutes < 1:
-        return f"{int(duration_minutes * 60)}s"
-    else:
-        minutes = int(duration_minutes)
-        seconds = int((duration_minutes - minutes) * 60)
-        return f"{minutes}m {seconds}s"
+def estimate_duration_seconds(text, speed_option='normal', language='pt',
+                              voice_type='feminina', voice_filter='normal'):
+    """
+    Duração prevista do áudio em segundos (ver utils/speech_rate.py)
+    """
+    return get_speech_rate_model().estimate_seconds(
+        text, language, voice_type, voice_filter, speed_option)
+
+
+def estimate_duration(text, speed_option='normal', language='pt',
+                      voice_type='feminina', voice_filter='normal'):
+    """
+    Estima a duração do áudio baseado no texto, idioma, voz e velocidade
+
+    Usa a taxa de fala medida nos áudios já gerados com a mesma combinação.
+    """
+    return format_duration(estimate_duration_seconds(
+        text, speed_option, language, voice_type, voice_filter))
 
 
 def get_voice_preview_text(voice_type, voice_filter):
@@ -0,0 +1,342 @@
+import io
+import contextlib
+import random
+import hashlib
+import shutil
+import subprocess
+import threading
+import time
+import requests
+import gtts.tts
+from gtts import gTTS, gTTSError
+from config import TTS_BACKEND, BACKEND_OPTIONS
+from utils.metrics import metrics
+from utils.resources import get_http_session
+
+
+class TTSBackendError(Exception):
+    """Erro de um motor de síntese"""
+
+    # Falhas transitórias podem ser repetidas (ver utils/retry.py)
+    retryable = False
+
+
+class RateLimitError(TTSBackendError):
+    """O serviço recusou a requisição por excesso de chamadas (HTTP 429)"""
+
+    retryable = True
+
+    def __init__(self, message, retry_after=None):
+        super().__init__(message)
+        self.retry_after = retry_after  # Segundos sugeridos pelo serviço (Retry-After)
+
+
+class BackendTimeoutError(TTSBackendError):
+    """A requisição excedeu o tempo limite"""
+
+    retryable = True
+
+
+class ServerError(TTSBackendError):
+    """Erro do serviço (HTTP 5xx) ou falha de conexão"""
+
+    retryable = True
+
+
+def _retry_after_seconds(response):
+    try:
+        return max(0.0, float(response.headers.get('Retry-After')))
+    except (TypeError, ValueError):
+        return None  # Ausente ou no formato de data HTTP
+
+
+class TTSBackend:
+    """
+    Interface comum dos motores de síntese
+
+    Todos os motores produzem MP3: `write_to_fp` grava o áudio em um
+    arquivo/buffer e `synthesize` retorna os bytes.
+    """
+
+    name = None
+    label = None
+    max_chars = None  # Limite de caracteres por requisição (None = sem limite)
+    remote = False    # Requisições a um serviço externo (sujeitas a limite de taxa)
+
+    def write_to_fp(self, fp, text, language='pt', slow=False, tld='com'):
+        raise NotImplementedError
+
+    def synthesize(self, text, language='pt', slow=False, tld='com'):
+        audio_buffer = io.BytesIO()
+        self.write_to_fp(audio_buffer, text, language, slow, tld)
+        return audio_buffer.getvalue()
+
+
+_BACKEND_CLASSES = {}
+_backend_instances = {}
+_backend_lock = threading.Lock()
+
+
+def register_backend(cls):
+    """
+    Registra uma classe de motor pelo seu atributo `name`
+    """
+    _BACKEND_CLASSES[cls.name] = cls
+    return cls
+
+
+def get_backend(name=None):
+    """
+    Retorna a instância compartilhada do motor (padrão: TTS_BACKEND do config)
+
+    Uma instância de TTSBackend também é aceita e retornada como está.
+    """
+    if isinstance(name, TTSBackend):
+        return name
+
+    name = name or TTS_BACKEND
+    if name not in _BACKEND_CLASSES:
+        raise TTSBackendError(f"Motor de síntese desconhecido: {name}")
+
+    with _backend_lock:
+        if name not in _backend_instances:
+            options = BACKEND_OPTIONS.get(name, {})
+            _backend_instances[name] = _BACKEND_CLASSES[name](**options)
+        return _backend_instances[name]
+
+
+def available_backends():
+    """
+    Lista os nomes dos motores registrados
+    """
+    return list(_BACKEND_CLASSES)
+
+
+class _SharedSessionRequests:
+    """
+    Módulo `requests` visto pelo gTTS
+
+    Depende de um detalhe interno do gTTS (testado na versão fixada em
+    requirements.txt): `gTTS.stream()` abre um `gtts.tts.requests.Session()`
+    por requisição. Substituindo o atributo `requests` do módulo `gtts.tts`,
+    ele recebe a sessão keep-alive compartilhada do domínio em uso na thread
+    (o `with` do gTTS não a fecha). A troca vale para o processo todo, mas
+    fora de GTTSBackend o comportamento original é mantido.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+
+    def __getattr__(self, name):
+        return getattr(requests, name)
+
+    def Session(self):
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            return requests.Session()
+        return contextlib.nullcontext(session)
+
+    @contextlib.contextmanager
+    def using(self, session):
+        self._local.session = session
+        try:
+            yield
+        finally:
+            self._local.session = None
+
+
+# Versões do gTTS em que a troca foi verificada; nas demais o gTTS usa as
+# próprias sessões (sem keep-alive compartilhado, mas sem depender dos internos)
+_GTTS_SHARED_SESSION_VERSIONS = ('2.5.4',)
+
+_gtts_requests = _SharedSessionRequests()
+if (gtts.__version__ in _GTTS_SHARED_SESSION_VERSIONS
+        and getattr(gtts.tts, 'requests', None) is requests):
+    gtts.tts.requests = _gtts_requests
+
+
+@register_backend
+class GTTSBackend(TTSBackend):
+    """
+    Google Text-to-Speech (requer rede)
+
+    Sintetiza com `gTTS.stream()`; a sessão keep-alive de cada domínio é
+    injetada por `_SharedSessionRequests`. Erros HTTP e de rede são
+    convertidos nas exceções transitórias usadas pelas novas tentativas.
+    """
+
+    name = 'gtts'
+    label = 'gTTS'
+    max_chars = 5000
+    remote = True
+
+    def __init__(self, timeout=(5.0, 30.0)):
+        self.timeout = timeout  # (conexão, leitura) em segundos
+
+    def write_to_fp(self, fp, text, language='pt', slow=False, tld='com'):
+        tts = gTTS(text=text, lang=language, slow=slow, tld=tld, timeout=self.timeout)
+
+        session = get_http_session(tld)
+        started = time.perf_counter()
+        first_part = True
+        try:
+            with _gtts_requests.using(session):
+                for audio in tts.stream():
+                    if first_part:
+                        metrics.observe('tts_first_part', time.perf_counter() - started)
+                        first_part = False
+                    fp.write(audio)
+        except gTTSError as e:
+            raise self._translate_error(e) from e
+        metrics.observe('tts_body', time.perf_counter() - started)
+
+    @staticmethod
+    def _translate_error(error):
+        """
+        Exceção transitória correspondente a um gTTSError (ou ele mesmo)
+        """
+        response = error.rsp
+        if response is not None:
+            if response.status_code == 429:
+                return RateLimitError(str(error), _retry_after_seconds(response))
+            if response.status_code >= 500:
+                return ServerError(str(error))
+            return error
+
+        # Falha de rede: o gTTS levanta gTTSError dentro do `except` do requests
+        cause = error.__cause__ or error.__context__
+        if isinstance(cause, requests.exceptions.Timeout):
+            return BackendTimeoutError(f"Tempo limite excedido: {cause}")
+        if isinstance(cause, requests.exceptions.ConnectionError):
+            return ServerError(f"Falha de conexão: {cause}")
+        return error
+
+
+@register_backend
+class EspeakBackend(TTSBackend):
+    """
+    Motor offline: espeak-ng gera WAV e o ffmpeg converte para MP3
+    """
+
+    name = 'espeak'
+    label = 'espeak-ng (offline)'
+
+    # Vozes do espeak-ng por idioma/domínio
+    VOICES = {
+        ('pt', 'com.br'): 'pt-br',
+        ('en', 'co.uk'): 'en-gb',
+        ('en', 'com'): 'en-us',
+        ('zh', None): 'cmn',
+    }
+
+    def __init__(self, executable='espeak-ng', ffmpeg='ffmpeg', bitrate='48k',
+                 words_per_minute=170, slow_words_per_minute=115):
+        self.executable = executable
+        self.ffmpeg = ffmpeg
+        self.bitrate = bitrate
+        self.words_per_minute = words_per_minute
+        self.slow_words_per_minute = slow_words_per_minute
+
+    def _voice(self, language, tld):
+        return (self.VOICES.get((language, tld))
+                or self.VOICES.get((language, None))
+                or language)
+
+    def write_to_fp(self, fp, text, language='pt', slow=False, tld='com'):
+        for executable in (self.executable, self.ffmpeg):
+            if shutil.which(executable) is None:
+                raise TTSBackendError(f"Executável não encontrado: {executable}")
+
+        speed = self.slow_words_per_minute if slow else self.words_per_minute
+        espeak = subprocess.Popen(
+            [self.executable, '-v', self._voice(language, tld),
+             '-s', str(speed), '--stdout', '--stdin'],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL
+        )
+        encoder = subprocess.Popen(
+            [self.ffmpeg, '-loglevel', 'error', '-f', 'wav', '-i', 'pipe:0',
+             '-ac', '1', '-b:a', self.bitrate, '-f', 'mp3', 'pipe:1'],
+            stdin=espeak.stdout, stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE
+        )
+        espeak.stdout.close()  # O ffmpeg passa a ser o único leitor
+
+        # Escrever o texto em paralelo para não travar os pipes em textos longos
+        def feed_text():
+            try:
+                espeak.stdin.write(text.encode('utf-8'))
+            finally:
+                espeak.stdin.close()
+
+        writer = threading.Thread(target=feed_text, daemon=True)
+        writer.start()
+
+        for block in iter(lambda: encoder.stdout.read(64 * 1024), b''):
+            fp.write(block)
+
+        writer.join()
+        encoder.stdout.close()
+        encoder_error = encoder.stderr.read().decode('utf-8', 'replace')
+        encoder.stderr.close()
+        if espeak.wait() != 0 or encoder.wait() != 0:
+            raise TTSBackendError(
+                f"Falha na síntese offline: {encoder_error.strip()}")
+
+
+# Quadro MPEG-2 Layer III, 32 kbps, 24 kHz, mono (mesmo formato do gTTS)
+_FAKE_FRAME_HEADER = b'\xff\xf3\x44\xc4'
+_FAKE_FRAME_SIZE = 96
+_FAKE_FRAME_DURATION = 576 / 24000
+
+
+@register_backend
+class FakeBackend(TTSBackend):
+    """
+    Motor determinístico em processo, para testes e benchmarks
+
+    Gera quadros MP3 de silêncio com duração proporcional ao texto e
+    simula a latência de rede e falhas transitórias (`failure_rate`) de
+    forma configurável.
+    """
+
+    name = 'fake'
+    label = 'Fake (testes)'
+    max_chars = 5000
+
+    def __init__(self, latency=0.0, latency_per_char=0.0, chars_per_second=15.0,
+                 failure_rate=0.0, seed=None):
+        self.latency = latency
+        self.latency_per_char = latency_per_char
+        self.chars_per_second = chars_per_second
+        self.failure_rate = failure_rate
+        self.calls = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def write_to_fp(self, fp, text, language='pt', slow=False, tld='com'):
+        with self._lock:
+            self.calls += 1
+            failed = self.failure_rate and self._random.random() < self.failure_rate
+
+        if failed:
+            raise ServerError("Falha simulada do motor fake")
+
+        delay = self.latency + self.latency_per_char * len(text)
+        if delay:
+            time.sleep(delay)
+
+        chars_per_second = self.chars_per_second / (1.5 if slow else 1.0)
+        duration = max(len(text), 1) / chars_per_second
+        frame_count = max(1, int(duration / _FAKE_FRAME_DURATION))
+
+        # Assinatura do texto nos dados auxiliares do primeiro quadro,
+        # para que textos diferentes gerem bytes diferentes
+        digest = hashlib.sha256(
+            f"{text}\x1f{language}\x1f{tld}\x1f{slow}".encode('utf-8')).digest()
+        payload_size = _FAKE_FRAME_SIZE - len(_FAKE_FRAME_HEADER)
+        first_payload = digest.rjust(payload_size, b'\x00')
+        silent_frame = _FAKE_FRAME_HEADER + b'\x00' * payload_size
+
+        fp.write(_FAKE_FRAME_HEADER + first_payload)
+        fp.write(silent_frame * (frame_count - 1))
@@ -0,0 +1,222 @@
+"""
+Tamanho de chunk adaptativo por motor e idioma
+
+O controlador observa a latência de cada síntese e ajusta um modelo
+linear `latência = custo fixo + custo por caractere` (mínimos quadrados
+com decaimento exponencial, então o modelo acompanha mudanças do serviço).
+Para um texto e uma concorrência, escolhe o tamanho que minimiza o tempo
+total estimado:
+
+    chunks = ceil(caracteres / tamanho)
+    tempo  = max(ceil(chunks / concorrência) * latência(tamanho),
+                 chunks / taxa de requisições)
+
+Custo fixo alto (ida e volta, TLS, fila do serviço) favorece chunks
+maiores; falhas e timeouts reduzem um teto multiplicativamente, que volta
+a crescer aos poucos com os sucessos (AIMD). Para não extrapolar demais o
+modelo, o tamanho escolhido cresce no máximo `max_growth` vezes o maior
+chunk já observado. O resultado fica sempre entre
+`min_size` e o limite do motor (`LIMITS['max_chars']` / `max_chars`).
+"""
+import json
+import math
+import threading
+import time
+from collections import deque
+from config import CHUNKING_CONFIG, LIMITS, SYNTHESIS_CONFIG
+
+
+class LatencyModel:
+    """Regressão linear latência x caracteres com pesos que decaem"""
+
+    __slots__ = ('decay', 'weight', 'sum_x', 'sum_y', 'sum_xx', 'sum_xy',
+                 'samples', 'max_chars')
+
+    def __init__(self, decay):
+        self.decay = decay
+        self.weight = self.sum_x = self.sum_y = self.sum_xx = self.sum_xy = 0.0
+        self.samples = 0
+        self.max_chars = 0  # Maior chunk já sintetizado com sucesso
+
+    def observe(self, chars, seconds):
+        d = self.decay
+        self.weight = self.weight * d + 1.0
+        self.sum_x = self.sum_x * d + chars
+        self.sum_y = self.sum_y * d + seconds
+        self.sum_xx = self.sum_xx * d + chars * chars
+        self.sum_xy = self.sum_xy * d + chars * seconds
+        self.samples += 1
+        self.max_chars = max(self.max_chars, chars)
+
+    def coefficients(self):
+        """
+        (custo fixo em s, custo por caractere em s), ambos >= 0
+        """
+        if not self.weight:
+            return 0.0, 0.0
+
+        mean_x = self.sum_x / self.weight
+        mean_y = self.sum_y / self.weight
+        variance = self.sum_xx / self.weight - mean_x * mean_x
+        if variance <= 1e-9 or mean_x <= 0:
+            # Todos os chunks do mesmo tamanho: sem como separar os custos,
+            # supõe metade fixa e metade proporcional
+            return mean_y / 2, mean_y / 2 / max(mean_x, 1.0)
+
+        slope = (self.sum_xy / self.weight - mean_x * mean_y) / variance
+        slope = max(slope, 0.0)
+        intercept = max(mean_y - slope * mean_x, 0.0)
+        return intercept, slope
+
+    def predict(self, chars):
+        intercept, slope = self.coefficients()
+        return intercept + slope * chars
+
+
+class ChunkSizeController:
+    """
+    Escolhe o tamanho dos chunks a partir das latências e falhas observadas
+
+    Os dados são mantidos por (motor, idioma). Enquanto não houver amostras
+    suficientes, usa `LIMITS['chunk_size']`.
+    """
+
+    def __init__(self, config=CHUNKING_CONFIG):
+        self.config = config
+        self._models = {}
+        self._ceilings = {}
+        self._errors = {}
+        self._lock = threading.Lock()
+        self.decisions = deque(maxlen=config['history'])
+
+    def _hard_limit(self, backend):
+        backend_limit = getattr(backend, 'max_chars', None) or LIMITS['max_chars']
+        return min(LIMITS['max_chars'], backend_limit)
+
+    def observe(self, backend, language, chars, seconds, error=False):
+        """
+        Registra uma síntese (bem-sucedida ou não) de `chars` caracteres
+        """
+        key = (backend.name, language)
+        hard_limit = self._hard_limit(backend)
+
+        with self._lock:
+            ceiling = self._ceilings.get(key, hard_limit)
+            errors = self._errors.get(key, 0.0)
+            if error:
+                # Falha: reduz o teto abaixo do tamanho que falhou
+                ceiling = max(self.config['min_size'],
+                              min(ceiling, int(chars * self.config['backoff'])))
+                errors = errors * self.config['decay'] + 1.0
+            else:
+                model = self._models.get(key)
+                if model is None:
+                    model = self._models[key] = LatencyModel(self.config['decay'])
+                model.observe(chars, seconds)
+                ceiling = min(hard_limit, ceiling + self.config['recovery'])
+                errors = errors * self.config['decay']
+            self._ceilings[key] = ceiling
+            self._errors[key] = errors
+
+    def chunk_size(self, backend, language, total_chars, concurrency=None,
+                   log=True):
+        """
+        Tamanho de chunk para converter `total_chars` caracteres
+
+        Args:
+            backend (TTSBackend): Motor de síntese
+            language (str): Código do idioma
+            total_chars (int): Tamanho do texto
+            concurrency (int): Requisições simultâneas (padrão: SYNTHESIS_CONFIG)
+            log (bool): Registrar a decisão no histórico/log
+
+        Returns:
+            int: Tamanho máximo de cada chunk em caracteres
+        """
+        concurrency = concurrency or SYNTHESIS_CONFIG['max_workers']
+        rate = SYNTHESIS_CONFIG['rate_per_second']
+        key = (backend.name, language)
+        hard_limit = self._hard_limit(backend)
+        min_size = min(self.config['min_size'], hard_limit)
+        timeout = getattr(backend, 'timeout', None)
+
+        with self._lock:
+            model = self._models.get(key)
+            ceiling = self._ceilings.get(key, hard_limit)
+            error_weight = self._errors.get(key, 0.0)
+            samples = model.samples if model else 0
+            coefficients = model.coefficients() if model else (0.0, 0.0)
+            max_observed = model.max_chars if model else 0
+
+        decision = {
+            'backend': backend.name,
+            'language': language,
+            'total_chars': total_chars,
+            'concurrency': concurrency,
+            'samples': samples,
+            'ceiling': ceiling,
+            'error_weight': round(error_weight, 3),
+        }
+
+        if not self.config['adaptive'] or samples < self.config['min_samples']:
+            size = max(min_size, min(LIMITS['chunk_size'], ceiling))
+            reason = 'padrão (poucas amostras)' if self.config['adaptive'] else 'padrão'
+            decision.update(chunk_size=size, reason=reason)
+        else:
+            intercept, slope = coefficients
+            upper = min(ceiling, int(max_observed * self.config['max_growth']))
+            best_size, best_time = None, math.inf
+            for size in range(min_size, max(min_size, upper) + 1, self.config['step']):
+                latency = intercept + slope * size
+                # Margem para não chegar perto do timeout do motor
+                if timeout and latency > timeout * self.config['timeout_margin']:
+                    break
+                chunks = max(1, math.ceil(total_chars / size))
+                wall_time = max(math.ceil(chunks / concurrency) * latency, chunks / rate)
+                # Empate: o menor tamanho entrega a primeira parte mais cedo
+                if wall_time < best_time - 1e-9:
+                    best_size, best_time = size, wall_time
+            size = best_size or min_size
+            decision.update(
+                chunk_size=size, reason='modelo',
+                overhead_s=round(intercept, 4), per_char_ms=round(slope * 1000, 4),
+                predicted_s=round(best_time, 3) if best_size else None)
+
+        if log:
+            self._log(decision)
+        return decision['chunk_size']
+
+    def _log(self, decision):
+        decision['ts'] = time.time()
+        with self._lock:
+            self.decisions.append(decision)
+        if self.config['log_path']:
+            with open(self.config['log_path'], 'a', encoding='utf-8') as f:
+                f.write(json.dumps(decision, ensure_ascii=False) + '\n')
+
+    def snapshot(self):
+        """
+        Estado atual por (motor, idioma), para exibição
+        """
+        with self._lock:
+            return [
+                {
+                    'backend': backend, 'language': language,
+                    'samples': model.samples,
+                    'overhead_s': model.coefficients()[0],
+                    'per_char_s': model.coefficients()[1],
+                    'ceiling': self._ceilings.get((backend, language)),
+                    'error_weight': self._errors.get((backend, language), 0.0),
+                }
+                for (backend, language), model in sorted(self._models.items())
+            ]
+
+
+_chunk_controller = ChunkSizeController()
+
+
+def get_chunk_controller():
+    """
+    Retorna o controlador de tamanho de chunk compartilhado pelo processo
+    """
+    return _chunk_controller
@@ -0,0 +1,676 @@
+"""
+Síntese distribuída: fila de tarefas compartilhada e workers em vários nós
+
+Com `DISTRIBUTED_CONFIG['queue']` definido (TTV_QUEUE), os jobs não são
+sintetizados no processo do aplicativo: cada chunk distinto vira uma
+tarefa na fila. Workers (nesta ou em outras máquinas) reservam tarefas,
+sintetizam com `text_to_speech` e gravam o áudio em um armazenamento
+compartilhado endereçado por conteúdo (sha256 do MP3). O coordenador
+recolhe as tarefas concluídas e entrega as partes ao job, que as grava e
+une na ordem do texto.
+
+Tarefas reservadas têm prazo (lease): se o worker cair, voltam para a
+fila. Áudios já gerados com o mesmo texto e os mesmos parâmetros, por
+qualquer job, são reaproveitados sem nova síntese. Cada worker tem o
+próprio limite de taxa, então a vazão soma o orçamento de cada nó.
+
+A fila é plugável (`register_queue`, pelo esquema da URL). A incluída usa
+SQLite: atende vários processos de uma máquina ou nós que compartilham um
+sistema de arquivos com locks confiáveis.
+
+Worker:
+    TTV_QUEUE=/dados/fila.sqlite3 TTV_STORE=/dados/audio python -m utils.distributed worker
+Estado da fila:
+    python -m utils.distributed status
+"""
+import argparse
+import hashlib
+import json
+import os
+import socket
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from config import DISTRIBUTED_CONFIG, SPEED_OPTIONS, TTS_BACKEND
+from utils.audio_utils import text_to_speech
+from utils.mp3 import stream_info
+from utils.retry import describe_error
+from utils.speech_rate import count_spoken_chars, get_speech_rate_model
+from utils.synthesis import (
+    ChunkSynthesisError, TokenBucket, group_duplicates, normalize_chunk
+)
+
+# Estados de uma tarefa
+PENDING = 'pending'
+LEASED = 'leased'
+DONE = 'done'
+FAILED = 'failed'
+
+# Parâmetros de voz enviados com cada tarefa
+TASK_PARAMS = ('language', 'speed_option', 'voice_type', 'voice_filter', 'pitch')
+
+
+class TaskFailedError(Exception):
+    """Tarefa sem sucesso após todas as tentativas (mensagem do worker)"""
+
+
+def task_key(chunk, params):
+    """
+    Identifica o áudio de um chunk: texto normalizado, voz e motor
+    """
+    payload = '\x1f'.join([normalize_chunk(chunk), TTS_BACKEND,
+                           *(params[name] for name in TASK_PARAMS)])
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class ContentStore:
+    """
+    Áudios endereçados pelo sha256 do conteúdo: <diretório>/<ab>/<hash>.mp3
+
+    Gravações são atômicas e idempotentes, então vários workers podem
+    gravar o mesmo áudio ao mesmo tempo.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, digest):
+        return os.path.join(self.directory, digest[:2], f'{digest}.mp3')
+
+    def exists(self, digest):
+        return os.path.exists(self.path(digest))
+
+    def put(self, data):
+        """
+        Grava o áudio (se ainda não existir) e retorna o hash
+        """
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.path(digest)
+        if os.path.exists(path):
+            os.utime(path)  # Usado de novo: adia a remoção
+            return digest
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        return digest
+
+    def get(self, digest):
+        with open(self.path(digest), 'rb') as f:
+            return f.read()
+
+    def purge(self, older_than):
+        """
+        Remove áudios não usados desde `older_than` (timestamp)
+        """
+        removed = 0
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                path = os.path.join(root, name)
+                try:
+                    if os.path.getmtime(path) < older_than:
+                        os.remove(path)
+                        removed += 1
+                except OSError:
+                    pass
+        return removed
+
+
+class WorkQueue:
+    """
+    Interface das filas de tarefas
+
+    Uma tarefa é um chunk de um job: (job_id, posição, chave, payload).
+    Implementações são registradas pelo esquema da URL (`register_queue`).
+    """
+
+    scheme = None
+
+    def enqueue(self, job_id, tasks):
+        """
+        Adiciona tarefas [(posição, chave, payload)]; chaves com áudio
+        conhecido entram já concluídas
+        """
+        raise NotImplementedError
+
+    def claim(self, worker_id, limit=1):
+        """
+        Reserva até `limit` tarefas pelo prazo do lease (lista de dicts)
+        """
+        raise NotImplementedError
+
+    def complete(self, task_id, key, digest):
+        raise NotImplementedError
+
+    def fail(self, task_id, error):
+        """
+        Registra uma falha; a tarefa volta para a fila enquanto houver tentativas
+        """
+        raise NotImplementedError
+
+    def collect(self, job_id):
+        """
+        Tarefas do job concluídas ou com erro desde a última coleta
+        """
+        raise NotImplementedError
+
+    def open_tasks(self, job_id):
+        """
+        Quantas tarefas do job ainda aguardam ou estão reservadas
+        """
+        raise NotImplementedError
+
+    def release(self, job_id):
+        """
+        Remove as tarefas do job (concluído, com erro ou abandonado)
+        """
+        raise NotImplementedError
+
+    def forget(self, key):
+        """
+        Esquece o áudio conhecido da chave (removido do armazenamento)
+        """
+        raise NotImplementedError
+
+    def heartbeat(self, worker_id, done, failed):
+        raise NotImplementedError
+
+    def workers(self, active_within=None):
+        raise NotImplementedError
+
+    def counts(self):
+        """
+        Tarefas por estado
+        """
+        raise NotImplementedError
+
+    def purge(self, older_than):
+        raise NotImplementedError
+
+
+_QUEUE_CLASSES = {}
+
+
+def register_queue(cls):
+    """
+    Registra uma classe de fila pelo seu atributo `scheme`
+    """
+    _QUEUE_CLASSES[cls.scheme] = cls
+    return cls
+
+
+def open_queue(url):
+    """
+    Abre a fila da URL (ex.: sqlite:///dados/fila.sqlite3; sem esquema = SQLite)
+    """
+    scheme, separator, location = url.partition('://')
+    if not separator:
+        scheme, location = 'sqlite', url
+    if scheme not in _QUEUE_CLASSES:
+        raise ValueError(f"Fila desconhecida: {scheme}")
+    return _QUEUE_CLASSES[scheme](location)
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    job_id TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    key TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    worker TEXT,
+    lease_until REAL,
+    available_at REAL NOT NULL,
+    digest TEXT,
+    error TEXT,
+    collected INTEGER NOT NULL DEFAULT 0,
+    updated_at REAL NOT NULL,
+    UNIQUE (job_id, position)
+);
+CREATE INDEX IF NOT EXISTS tasks_ready ON tasks (status, available_at);
+CREATE INDEX IF NOT EXISTS tasks_job ON tasks (job_id, collected);
+CREATE TABLE IF NOT EXISTS results (
+    key TEXT PRIMARY KEY,
+    digest TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS workers (
+    id TEXT PRIMARY KEY,
+    host TEXT NOT NULL,
+    pid INTEGER NOT NULL,
+    started_at REAL NOT NULL,
+    last_seen REAL NOT NULL,
+    done INTEGER NOT NULL DEFAULT 0,
+    failed INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+
+@register_queue
+class SQLiteWorkQueue(WorkQueue):
+    """
+    Fila em um arquivo SQLite (WAL); reservas em transações IMMEDIATE
+    """
+
+    scheme = 'sqlite'
+
+    def __init__(self, path, config=DISTRIBUTED_CONFIG):
+        self.path = path
+        self.config = config
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with self._connect() as db:
+            db.execute('PRAGMA journal_mode=WAL')
+            db.executescript(_SCHEMA)
+
+    def _connect(self):
+        db = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        db.row_factory = sqlite3.Row
+        return _Transaction(db)
+
+    def enqueue(self, job_id, tasks):
+        now = time.time()
+        with self._connect() as db:
+            db.execute('BEGIN IMMEDIATE')
+            for position, key, payload in tasks:
+                known = db.execute('SELECT digest FROM results WHERE key = ?',
+                                   (key,)).fetchone()
+                status, digest = (DONE, known['digest']) if known else (PENDING, None)
+                # Reenvio (nova tentativa ou retomada do coordenador): tarefas
+                # com erro voltam para a fila e as concluídas são entregues de novo
+                db.execute(
+                    'INSERT INTO tasks (job_id, position, key, payload, status, digest, '
+                    'available_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?) '
+                    'ON CONFLICT (job_id, position) DO UPDATE SET collected = 0, '
+                    'attempts = CASE WHEN status = ? THEN 0 ELSE attempts END, '
+                    'error = CASE WHEN status = ? THEN NULL ELSE error END, '
+                    'status = CASE WHEN status = ? THEN ? ELSE status END',
+                    (job_id, position, key, json.dumps(payload), status, digest, now, now,
+                     FAILED, FAILED, FAILED, PENDING))
+
+    def claim(self, worker_id, limit=1):
+        now = time.time()
+        with self._connect() as db:
+            db.execute('BEGIN IMMEDIATE')
+            # Leases vencidos sem tentativas restantes: o worker caiu repetidamente
+            db.execute(
+                'UPDATE tasks SET status = ?, error = ?, updated_at = ? '
+                'WHERE status = ? AND lease_until < ? AND attempts >= ?',
+                (FAILED, "Nenhum worker concluiu a tarefa", now,
+                 LEASED, now, self.config['max_attempts']))
+            rows = db.execute(
+                'SELECT * FROM tasks WHERE (status = ? AND available_at <= ?) '
+                'OR (status = ? AND lease_until < ?) ORDER BY id LIMIT ?',
+                (PENDING, now, LEASED, now, limit)).fetchall()
+            db.executemany(
+                'UPDATE tasks SET status = ?, worker = ?, lease_until = ?, '
+                'attempts = attempts + 1, updated_at = ? WHERE id = ?',
+                [(LEASED, worker_id, now + self.config['lease_seconds'], now, row['id'])
+                 for row in rows])
+
+        tasks = []
+        for row in rows:
+            task = dict(row, status=LEASED, worker=worker_id, attempts=row['attempts'] + 1)
+            task['payload'] = json.loads(task['payload'])
+            tasks.append(task)
+        return tasks
+
+    def complete(self, task_id, key, digest):
+        now = time.time()
+        with self._connect() as db:
+            db.execute('BEGIN IMMEDIATE')
+            db.execute('INSERT OR REPLACE INTO results (key, digest, created_at) '
+                       'VALUES (?, ?, ?)', (key, digest, now))
+            # Vale mesmo se o lease venceu: o áudio é o mesmo
+            db.execute('UPDATE tasks SET status = ?, digest = ?, error = NULL, '
+                       'updated_at = ? WHERE id = ? AND status != ?',
+                       (DONE, digest, now, task_id, DONE))
+
+    def fail(self, task_id, error):
+        now = time.time()
+        with self._connect() as db:
+            db.execute(
+                'UPDATE tasks SET error = ?, updated_at = ?, worker = NULL, '
+                'status = CASE WHEN attempts >= ? THEN ? ELSE ? END, '
+                'available_at = ? WHERE id = ? AND status = ?',
+                (error, now, self.config['max_attempts'], FAILED, PENDING,
+                 now + self.config['retry_delay'], task_id, LEASED))
+
+    def collect(self, job_id):
+        with self._connect() as db:
+            db.execute('BEGIN IMMEDIATE')
+            rows = db.execute(
+                'SELECT id, position, key, status, digest, error FROM tasks '
+                'WHERE job_id = ? AND collected = 0 AND status IN (?, ?) ORDER BY position',
+                (job_id, DONE, FAILED)).fetchall()
+            db.executemany('UPDATE tasks SET collected = 1 WHERE id = ?',
+                           [(row['id'],) for row in rows])
+        return [dict(row) for row in rows]
+
+    def open_tasks(self, job_id):
+        with self._connect() as db:
+            row = db.execute('SELECT COUNT(*) AS n FROM tasks WHERE job_id = ? '
+                             'AND status IN (?, ?)', (job_id, PENDING, LEASED)).fetchone()
+        return row['n']
+
+    def release(self, job_id):
+        with self._connect() as db:
+            db.execute('DELETE FROM tasks WHERE job_id = ?', (job_id,))
+
+    def forget(self, key):
+        with self._connect() as db:
+            db.execute('DELETE FROM results WHERE key = ?', (key,))
+
+    def heartbeat(self, worker_id, done, failed):
+        now = time.time()
+        with self._connect() as db:
+            db.execute(
+                'INSERT INTO workers (id, host, pid, started_at, last_seen, done, failed) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?) ON CONFLICT (id) DO UPDATE SET '
+                'last_seen = excluded.last_seen, done = excluded.done, '
+                'failed = excluded.failed',
+                (worker_id, socket.gethostname(), os.getpid(), now, now, done, failed))
+
+    def workers(self, active_within=None):
+        active_within = active_within or self.config['worker_timeout']
+        with self._connect() as db:
+            rows = db.execute('SELECT * FROM workers WHERE last_seen >= ? ORDER BY started_at',
+                              (time.time() - active_within,)).fetchall()
+        return [dict(row) for row in rows]
+
+    def counts(self):
+        with self._connect() as db:
+            rows = db.execute('SELECT status, COUNT(*) AS n FROM tasks GROUP BY status')
+            return {row['status']: row['n'] for row in rows}
+
+    def purge(self, older_than):
+        with self._connect() as db:
+            db.execute('DELETE FROM results WHERE created_at < ?', (older_than,))
+            db.execute('DELETE FROM workers WHERE last_seen < ?', (older_than,))
+            # Tarefas de coordenadores que não voltaram
+            db.execute('DELETE FROM tasks WHERE updated_at < ?', (older_than,))
+
+
+class _Transaction:
+    """Conexão em modo autocommit: COMMIT/ROLLBACK da transação aberta ao sair"""
+
+    def __init__(self, db):
+        self.db = db
+
+    def __enter__(self):
+        return self.db
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            if self.db.in_transaction:
+                self.db.execute('ROLLBACK' if exc_type else 'COMMIT')
+        finally:
+            self.db.close()
+
+
+class Worker:
+    """
+    Reserva tarefas da fila e as sintetiza com `threads` requisições simultâneas
+    """
+
+    def __init__(self, queue, store, threads=None, rate=None, idle_exit=None):
+        self.queue = queue
+        self.store = store
+        self.threads = threads or DISTRIBUTED_CONFIG['worker_threads']
+        self.idle_exit = idle_exit
+        self.id = f'{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}'
+        self.done = 0
+        self.failed = 0
+        # Orçamento de requisições deste nó (rate, burst)
+        rate = rate or DISTRIBUTED_CONFIG['backend_rate'].get(TTS_BACKEND)
+        self._rate_limiter = TokenBucket(*rate) if rate else None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+
+    def stop(self):
+        self._stop.set()
+
+    def run(self):
+        """
+        Executa até `stop()` (ou até ficar ocioso por `idle_exit` segundos)
+        """
+        threads = [threading.Thread(target=self._loop, name=f'ttv-worker-{i}', daemon=True)
+                   for i in range(self.threads)]
+        for thread in threads:
+            thread.start()
+        while any(thread.is_alive() for thread in threads):
+            self._heartbeat()
+            deadline = time.monotonic() + DISTRIBUTED_CONFIG['heartbeat_interval']
+            for thread in threads:
+                thread.join(max(0.0, deadline - time.monotonic()))
+        self._heartbeat()
+
+    def _heartbeat(self):
+        with self._lock:
+            done, failed = self.done, self.failed
+        self.queue.heartbeat(self.id, done, failed)
+
+    def _loop(self):
+        idle_since = None
+        while not self._stop.is_set():
+            tasks = self.queue.claim(self.id)
+            if not tasks:
+                idle_since = idle_since or time.monotonic()
+                if self.idle_exit and time.monotonic() - idle_since > self.idle_exit:
+                    return
+                self._stop.wait(DISTRIBUTED_CONFIG['poll_interval'])
+                continue
+            idle_since = None
+            self._process(tasks[0])
+
+    def _process(self, task):
+        payload = task['payload']
+        try:
+            audio = text_to_speech(
+                payload['text'], payload['language'],
+                SPEED_OPTIONS[payload['speed_option']]['slow'], payload['speed_option'],
+                payload['voice_type'], payload['voice_filter'], payload['pitch'],
+                rate_limiter=self._rate_limiter)
+            digest = self.store.put(audio)
+        except Exception as e:
+            self.queue.fail(task['id'], describe_error(e))
+            with self._lock:
+                self.failed += 1
+            return
+        self.queue.complete(task['id'], task['key'], digest)
+        with self._lock:
+            self.done += 1
+
+
+class Coordinator:
+    """
+    Envia os chunks de um job para a fila e recolhe o áudio dos workers
+    """
+
+    def __init__(self, queue, store, poll_interval=None, stall_timeout=None):
+        self.queue = queue
+        self.store = store
+        self.poll_interval = poll_interval or DISTRIBUTED_CONFIG['poll_interval']
+        self.stall_timeout = stall_timeout or DISTRIBUTED_CONFIG['stall_timeout']
+
+    def run(self, job_id, chunks, indices, params):
+        """
+        Sintetiza `chunks[i]` para cada i de `indices` nos workers
+
+        Sem nenhuma tarefa concluída por `stall_timeout` segundos, as
+        restantes falham se não houver worker ativo ou se as tarefas não
+        estiverem mais na fila (apagadas por `purge`, por exemplo).
+
+        Yields:
+            tuple: (ordem de chegada, índice, bytes ou exceção), na ordem
+                em que as tarefas terminam
+        """
+        voice = {name: params[name] for name in TASK_PARAMS}
+        self.queue.enqueue(job_id, [
+            (index, task_key(chunks[index], params), dict(voice, text=chunks[index]))
+            for index in indices])
+
+        remaining = set(indices)
+        arrived = 0
+        last_progress = time.monotonic()
+        try:
+            while remaining:
+                finished = [row for row in self.queue.collect(job_id)
+                            if row['position'] in remaining]
+                if finished:
+                    last_progress = time.monotonic()
+                elif time.monotonic() - last_progress > self.stall_timeout:
+                    error = self._stall_error(job_id)
+                    if error:
+                        for position in sorted(remaining):
+                            yield arrived, position, TaskFailedError(error)
+                            arrived += 1
+                        return
+                    last_progress = time.monotonic()
+                for row in finished:
+                    remaining.discard(row['position'])
+                    if row['status'] == DONE:
+                        try:
+                            result = self.store.get(row['digest'])
+                            # A síntese foi em outro processo: calibrar a estimativa daqui
+                            get_speech_rate_model().observe(
+                                params['language'], params['voice_type'],
+                                params['voice_filter'], params['speed_option'],
+                                count_spoken_chars(chunks[row['position']]),
+                                stream_info(result)['duration'])
+                        except OSError as e:
+                            # Removido do armazenamento: uma nova tentativa sintetiza de novo
+                            self.queue.forget(row['key'])
+                            result = e
+                    else:
+                        result = TaskFailedError(row['error'])
+                    yield arrived, row['position'], result
+                    arrived += 1
+                if not finished:
+                    time.sleep(self.poll_interval)
+        finally:
+            self.queue.release(job_id)
+
+    def _stall_error(self, job_id):
+        """
+        Motivo para desistir de um job parado (None: continuar esperando)
+        """
+        if not self.queue.workers():
+            return f"Nenhum worker ativo há {self.stall_timeout:.0f}s"
+        if not self.queue.open_tasks(job_id):
+            return "Tarefa removida da fila antes de ser concluída"
+        return None
+
+    def iter_ordered(self, job_id, chunks, params):
+        """
+        Áudio de todos os chunks na ordem do texto, à medida que ficam contíguos
+
+        Chunks repetidos viram uma única tarefa.
+
+        Yields:
+            tuple: (índice, bytes do áudio)
+
+        Raises:
+            ChunkSynthesisError: Uma tarefa falhou após todas as tentativas
+        """
+        groups = group_duplicates(range(len(chunks)), chunks)
+        representative = {position: index for index, positions in groups.items()
+                          for position in positions}
+        uses = {index: len(positions) for index, positions in groups.items()}
+        ready = {}
+        next_position = 0
+
+        for _, index, result in self.run(job_id, chunks, list(groups), params):
+            if isinstance(result, Exception):
+                raise ChunkSynthesisError(index, result)
+            ready[index] = result
+            while next_position < len(chunks) and representative[next_position] in ready:
+                index = representative[next_position]
+                yield next_position, ready[index]
+                uses[index] -= 1
+                if not uses[index]:
+                    del ready[index]
+                next_position += 1
+
+    def status(self):
+        """
+        Workers ativos e tarefas por estado (painel "Desempenho")
+        """
+        return {'workers': self.queue.workers(), 'tasks': self.queue.counts()}
+
+    def purge(self, older_than):
+        self.queue.purge(older_than)
+        self.store.purge(older_than)
+
+
+_coordinator = None
+_coordinator_lock = threading.Lock()
+
+
+def get_coordinator():
+    """
+    Retorna o coordenador do processo (None sem fila configurada)
+    """
+    global _coordinator
+    if not DISTRIBUTED_CONFIG['queue']:
+        return None
+    with _coordinator_lock:
+        if _coordinator is None:
+            _coordinator = Coordinator(open_queue(DISTRIBUTED_CONFIG['queue']),
+                                       ContentStore(DISTRIBUTED_CONFIG['store']))
+        return _coordinator
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Workers da síntese distribuída")
+    parser.add_argument('command', choices=['worker', 'status'])
+    parser.add_argument('--queue', default=DISTRIBUTED_CONFIG['queue'],
+                        help="URL da fila (padrão: TTV_QUEUE)")
+    parser.add_argument('--store', default=DISTRIBUTED_CONFIG['store'],
+                        help="Diretório compartilhado dos áudios (padrão: TTV_STORE)")
+    parser.add_argument('--threads', type=int, default=DISTRIBUTED_CONFIG['worker_threads'],
+                        help="Sínteses simultâneas neste worker")
+    parser.add_argument('--rate', type=float, help="Requisições por segundo deste worker")
+    parser.add_argument('--burst', type=int, default=1)
+    parser.add_argument('--idle-exit', type=float,
+                        help="Encerrar após este tempo sem tarefas (s)")
+    args = parser.parse_args(argv)
+
+    if not args.queue:
+        parser.error("defina a fila com --queue ou TTV_QUEUE")
+    queue = open_queue(args.queue)
+
+    if args.command == 'status':
+        workers = queue.workers()
+        print(f"Tarefas: {queue.counts() or 'nenhuma'}")
+        print(f"Workers ativos: {len(workers)}")
+        for worker in workers:
+            print(f"  {worker['id']}: {worker['done']} concluídas, {worker['failed']} com erro")
+        return 0
+
+    worker = Worker(queue, ContentStore(args.store), args.threads,
+                    (args.rate, args.burst) if args.rate else None, args.idle_exit)
+    print(f"Worker {worker.id}: {worker.threads} threads, fila {args.queue}", flush=True)
+    try:
+        worker.run()
+    except KeyboardInterrupt:
+        worker.stop()
+    print(f"Worker {worker.id}: {worker.done} tarefas concluídas, {worker.failed} com erro")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
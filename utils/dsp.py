@@ -0,0 +1,269 @@
+"""
+Efeitos de áudio reais (eco, robô, sussurro, tom e velocidade) sobre PCM decodificado
+
+O MP3 é decodificado com ffmpeg para PCM mono, os efeitos são aplicados
+de forma vetorizada com NumPy e o resultado é codificado de volta em MP3.
+Se NumPy ou ffmpeg não estiverem disponíveis, `is_available()` retorna
+False e o aplicativo volta à simulação dos efeitos por texto.
+"""
+import shutil
+import subprocess
+from functools import lru_cache
+from config import DSP_CONFIG, VOICE_FILTERS, PITCH_OPTIONS, SPEED_OPTIONS
+from utils.metrics import timed
+from utils.mp3 import audio_frame_spans
+
+try:
+    import numpy as np
+except ImportError:  # Dependência opcional
+    np = None
+
+
+class DSPError(Exception):
+    """Erro ao decodificar, processar ou codificar áudio"""
+
+
+@lru_cache(maxsize=None)
+def is_available():
+    """
+    Indica se os efeitos de áudio podem ser aplicados neste ambiente
+    """
+    return (DSP_CONFIG['enabled'] and np is not None
+            and shutil.which(DSP_CONFIG['ffmpeg']) is not None)
+
+
+def audio_effect_for(voice_filter):
+    """
+    Nome do efeito de áudio do filtro (None se o filtro é aplicado ao texto)
+    """
+    return VOICE_FILTERS.get(voice_filter, {}).get('audio_effect')
+
+
+def pitch_multiplier(pitch):
+    return PITCH_OPTIONS.get(pitch, PITCH_OPTIONS['normal'])['multiplier']
+
+
+def speed_ratio(speed_option):
+    return SPEED_OPTIONS.get(speed_option, SPEED_OPTIONS['normal']).get('time_stretch', 1.0)
+
+
+def _run_ffmpeg(arguments, data):
+    result = subprocess.run(
+        [DSP_CONFIG['ffmpeg'], '-loglevel', 'error'] + arguments,
+        input=data, capture_output=True
+    )
+    if result.returncode != 0:
+        raise DSPError(result.stderr.decode('utf-8', 'replace').strip())
+    return result.stdout
+
+
+def decode_mp3(data):
+    """
+    Decodifica MP3 para PCM mono float32 na taxa de amostragem original
+
+    Returns:
+        tuple: (amostras, taxa de amostragem)
+    """
+    _, _, first_header = audio_frame_spans(data)
+    sample_rate = first_header.sample_rate if first_header else 24000
+
+    pcm = _run_ffmpeg(
+        ['-f', 'mp3', '-i', 'pipe:0', '-ac', '1', '-ar', str(sample_rate),
+         '-f', 's16le', 'pipe:1'],
+        data
+    )
+    samples = np.frombuffer(pcm, dtype='<i2').astype(np.float32) / 32768.0
+    return samples, sample_rate
+
+
+def encode_mp3(samples, sample_rate):
+    """
+    Codifica PCM mono float32 em MP3 (sem tags ID3 nem quadro Xing, como o gTTS)
+    """
+    pcm = (np.clip(samples, -1.0, 1.0) * 32767).astype('<i2').tobytes()
+    return _run_ffmpeg(
+        ['-f', 's16le', '-ar', str(sample_rate), '-ac', '1', '-i', 'pipe:0',
+         '-b:a', DSP_CONFIG['bitrate'], '-write_xing', '0', '-id3v2_version', '0',
+         '-f', 'mp3', 'pipe:1'],
+        pcm
+    )
+
+
+def _normalize(samples, peak=0.95):
+    maximum = np.max(np.abs(samples)) if samples.size else 0.0
+    if maximum > peak:
+        samples = samples * (peak / maximum)
+    return samples.astype(np.float32)
+
+
+def _fft_convolve(samples, impulse_response):
+    size = samples.size + impulse_response.size - 1
+    fft_size = 1 << (size - 1).bit_length()
+    spectrum = np.fft.rfft(samples, fft_size) * np.fft.rfft(impulse_response, fft_size)
+    return np.fft.irfft(spectrum, fft_size)[:size]
+
+
+def _stft(samples, n_fft, hop):
+    window = np.hanning(n_fft).astype(np.float32)
+    padded = np.pad(samples, (n_fft // 2, n_fft))
+    frames = np.lib.stride_tricks.sliding_window_view(padded, n_fft)[::hop]
+    return np.fft.rfft(frames * window, axis=1)
+
+
+def _istft(spectrum, n_fft, hop, length):
+    window = np.hanning(n_fft).astype(np.float32)
+    frames = np.fft.irfft(spectrum, n_fft, axis=1) * window
+    frame_count = frames.shape[0]
+    overlap = n_fft // hop
+
+    # Overlap-add vetorizado: cada quadro ocupa `overlap` blocos de `hop` amostras
+    blocks = frames.reshape(frame_count, overlap, hop)
+    window_blocks = (window ** 2).reshape(overlap, hop)
+    output = np.zeros((frame_count + overlap, hop))
+    norm = np.zeros((frame_count + overlap, hop))
+    for k in range(overlap):
+        output[k:k + frame_count] += blocks[:, k, :]
+        norm[k:k + frame_count] += window_blocks[k]
+
+    output = (output / np.maximum(norm, 1e-8)).reshape(-1)
+    return output[n_fft // 2:n_fft // 2 + length]
+
+
+def echo(samples, sample_rate, delay=0.18, decay=0.45, repeats=4):
+    """
+    Eco por linha de atraso: resposta ao impulso com `repeats` reflexões
+    """
+    delay_samples = max(1, int(delay * sample_rate))
+    impulse_response = np.zeros(delay_samples * repeats + 1, dtype=np.float32)
+    impulse_response[0] = 1.0
+    impulse_response[delay_samples::delay_samples] = decay ** np.arange(1, repeats + 1)
+    return _normalize(_fft_convolve(samples, impulse_response))
+
+
+def robot(samples, sample_rate, frequency=40.0, mix=0.85):
+    """
+    Voz robótica por modulação em anel com uma portadora senoidal
+    """
+    t = np.arange(samples.size, dtype=np.float32) / sample_rate
+    carrier = np.sin(2 * np.pi * frequency * t)
+    return _normalize((1 - mix) * samples + mix * samples * carrier)
+
+
+def whisper(samples, sample_rate, n_fft=512, seed=0):
+    """
+    Sussurro: mantém o envelope espectral e descarta a fase (sem vozeamento)
+    """
+    hop = n_fft // 4
+    spectrum = _stft(samples, n_fft, hop)
+    rng = np.random.default_rng(seed)  # Determinístico para o mesmo áudio
+    phase = np.exp(2j * np.pi * rng.random(spectrum.shape))
+    whispered = _istft(np.abs(spectrum) * phase, n_fft, hop, samples.size)
+    return _normalize(whispered * 0.8)
+
+
+def resample(samples, factor):
+    """
+    Reamostragem por interpolação linear (factor > 1 encurta o sinal)
+    """
+    length = max(1, int(round(samples.size / factor)))
+    positions = np.arange(length) * factor
+    return np.interp(positions, np.arange(samples.size), samples).astype(np.float32)
+
+
+def time_stretch(samples, sample_rate, ratio, frame_ms=30, tolerance_ms=8):
+    """
+    Altera a duração sem mudar o tom (WSOLA)
+
+    ratio > 1 acelera (áudio mais curto), ratio < 1 desacelera. Cada janela
+    de saída é buscada na entrada em torno da posição nominal, na
+    vizinhança que melhor continua a janela anterior (correlação via FFT).
+    """
+    if abs(ratio - 1.0) < 1e-3 or samples.size == 0:
+        return samples
+
+    frame = int(sample_rate * frame_ms / 1000) & ~1
+    hop_out = frame // 2
+    hop_in = hop_out * ratio
+    tolerance = int(sample_rate * tolerance_ms / 1000)
+    window = np.hanning(frame).astype(np.float32)
+
+    output_length = int(samples.size / ratio)
+    frame_count = output_length // hop_out + 1
+    padded = np.pad(samples, (tolerance, frame + tolerance + int(hop_in) + hop_out))
+
+    search_size = frame + 2 * tolerance
+    fft_size = 1 << (search_size + frame - 1).bit_length()
+
+    output = np.zeros(frame_count * hop_out + frame, dtype=np.float32)
+    norm = np.zeros_like(output)
+    previous = tolerance  # Posição (em `padded`) da última janela copiada
+
+    for k in range(frame_count):
+        nominal = tolerance + int(k * hop_in)
+        if k == 0:
+            best = nominal
+        else:
+            # Continuação natural da janela anterior
+            target = padded[previous + hop_out:previous + hop_out + frame]
+            region = padded[nominal - tolerance:nominal - tolerance + search_size]
+            correlation = np.fft.irfft(
+                np.fft.rfft(region, fft_size) * np.conj(np.fft.rfft(target, fft_size)),
+                fft_size)[:2 * tolerance + 1]
+            best = nominal - tolerance + int(np.argmax(correlation))
+
+        start = k * hop_out
+        output[start:start + frame] += padded[best:best + frame] * window
+        norm[start:start + frame] += window
+        previous = best
+
+    return (output / np.maximum(norm, 1e-3))[:output_length]
+
+
+def pitch_shift(samples, sample_rate, multiplier, tempo=1.0):
+    """
+    Muda o tom por `multiplier` e o andamento por `tempo` (reamostragem + WSOLA)
+
+    Com tempo=1.0 a duração é mantida. Tom e andamento são aplicados em
+    uma única passagem do WSOLA.
+    """
+    if abs(multiplier - 1.0) < 1e-3:
+        return time_stretch(samples, sample_rate, tempo)
+    stretched = time_stretch(samples, sample_rate, tempo / multiplier)
+    return resample(stretched, multiplier)
+
+
+EFFECTS = {
+    'echo': echo,
+    'robot': robot,
+    'whisper': whisper,
+}
+
+
+def needs_processing(voice_filter, pitch, speed_option='normal'):
+    return (audio_effect_for(voice_filter) is not None
+            or pitch_multiplier(pitch) != 1.0 or speed_ratio(speed_option) != 1.0)
+
+
+@timed('audio_effects')
+def apply_audio_effects(audio_data, voice_filter='normal', pitch='normal',
+                        speed_option='normal'):
+    """
+    Aplica o efeito do filtro, o ajuste de tom e a velocidade ao MP3
+
+    Returns:
+        bytes: MP3 processado (o original se não houver nada a aplicar)
+    """
+    effect = audio_effect_for(voice_filter)
+    multiplier = pitch_multiplier(pitch)
+    tempo = speed_ratio(speed_option)
+    if effect is None and multiplier == 1.0 and tempo == 1.0:
+        return audio_data
+
+    samples, sample_rate = decode_mp3(audio_data)
+    if multiplier != 1.0 or tempo != 1.0:
+        samples = pitch_shift(samples, sample_rate, multiplier, tempo)
+    if effect is not None:
+        options = DSP_CONFIG['effects'].get(effect, {})
+        samples = EFFECTS[effect](samples, sample_rate, **options)
+
+    return encode_mp3(samples, sample_rate)
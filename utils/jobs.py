@@ -0,0 +1,402 @@
+"""
+Fila de conversões em segundo plano
+
+Cada conversão vira um job com id próprio. O estado fica em SQLite e o
+áudio de cada parte em arquivos, então o resultado sobrevive aos reruns
+do Streamlit (a sessão guarda apenas o id do job). Um único JobManager
+por processo atende todas as sessões, com um pool de workers e um
+limite de taxa compartilhados.
+
+Com a síntese distribuída configurada (utils/distributed.py), os chunks
+do job são enviados à fila compartilhada e sintetizados pelos workers;
+o JobManager grava as partes recebidas e as une como no modo local.
+"""
+import json
+import os
+import shutil
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from config import DISTRIBUTED_CONFIG, JOBS_CONFIG, SPEED_OPTIONS, SYNTHESIS_CONFIG
+from utils.audio_utils import (
+    synthesize_speech, split_text, get_part_filename, adaptive_chunk_size,
+    iter_chunk_spans, anchored_chunk_spans, write_zip_bundle
+)
+from utils.audio_result import AudioResult
+from utils.distributed import get_coordinator
+from utils.mp3 import MP3MergeWriter
+from utils.retry import CircuitOpenError, describe_error
+from utils.synthesis import get_rate_limiter, iter_synthesized, group_duplicates
+
+MERGED_FILENAME = 'audio_completo.mp3'
+ZIP_FILENAME = 'audio_partes.zip'
+
+# Estados de um job
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+
+# Parâmetros que mudam o áudio de um chunk: só com eles iguais as partes
+# de um job anterior podem ser reaproveitadas
+VOICE_PARAMS = ('language', 'speed_option', 'voice_type', 'voice_filter', 'pitch')
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    text TEXT NOT NULL,
+    params TEXT NOT NULL,
+    total_chunks INTEGER NOT NULL DEFAULT 0,
+    done_chunks INTEGER NOT NULL DEFAULT 0,
+    saved_calls INTEGER NOT NULL DEFAULT 0,
+    reused_chunks INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+)
+"""
+
+
+class JobIncompleteError(Exception):
+    """Algumas partes do job falharam; as concluídas ficam guardadas"""
+
+
+class JobStore:
+    """
+    Estado dos jobs em SQLite e áudio das partes em <diretório>/<id>/
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self.db_path = os.path.join(directory, 'jobs.sqlite3')
+        with self._connect() as db:
+            db.execute('PRAGMA journal_mode=WAL')
+            db.execute(_SCHEMA)
+            # Bancos criados antes da deduplicação e do reaproveitamento de chunks
+            columns = {row['name'] for row in db.execute('PRAGMA table_info(jobs)')}
+            for column in ('saved_calls', 'reused_chunks'):
+                if column not in columns:
+                    db.execute(f'ALTER TABLE jobs ADD COLUMN {column} '
+                               'INTEGER NOT NULL DEFAULT 0')
+
+    def _connect(self):
+        db = sqlite3.connect(self.db_path, timeout=30)
+        db.row_factory = sqlite3.Row
+        return db
+
+    def job_dir(self, job_id):
+        return os.path.join(self.directory, job_id)
+
+    def part_path(self, job_id, index):
+        return os.path.join(self.job_dir(job_id), get_part_filename(index))
+
+    def merged_path(self, job_id):
+        return os.path.join(self.job_dir(job_id), MERGED_FILENAME)
+
+    def zip_path(self, job_id):
+        return os.path.join(self.job_dir(job_id), ZIP_FILENAME)
+
+    def create(self, text, params):
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        os.makedirs(self.job_dir(job_id), exist_ok=True)
+        with self._connect() as db:
+            db.execute(
+                'INSERT INTO jobs (id, status, text, params, created_at, updated_at) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                (job_id, QUEUED, text, json.dumps(params), now, now))
+        return job_id
+
+    def update(self, job_id, **fields):
+        fields['updated_at'] = time.time()
+        assignments = ', '.join(f'{name} = ?' for name in fields)
+        with self._connect() as db:
+            db.execute(f'UPDATE jobs SET {assignments} WHERE id = ?',
+                       (*fields.values(), job_id))
+
+    def get(self, job_id):
+        """
+        Retorna o job como dict (None se não existir)
+        """
+        with self._connect() as db:
+            row = db.execute('SELECT * FROM jobs WHERE id = ?', (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = dict(row)
+        job['params'] = json.loads(job['params'])
+        return job
+
+    def ids_with_status(self, *statuses):
+        placeholders = ', '.join('?' * len(statuses))
+        with self._connect() as db:
+            rows = db.execute(
+                f'SELECT id FROM jobs WHERE status IN ({placeholders}) ORDER BY created_at',
+                statuses).fetchall()
+        return [row['id'] for row in rows]
+
+    def chunks(self, job):
+        """
+        Chunks de texto do job, com as fronteiras gravadas no envio
+        """
+        params = job['params']
+        if 'spans' not in params:
+            # Jobs criados antes das fronteiras gravadas
+            return split_text(job['text'], params['chunk_size'])
+        return [job['text'][start:end] for start, end in params['spans']]
+
+    def finished_parts(self, job_id, total_chunks):
+        """
+        Índices das partes já gravadas, em ordem
+        """
+        return [i for i in range(total_chunks) if os.path.exists(self.part_path(job_id, i))]
+
+    def read_part(self, job_id, index):
+        with open(self.part_path(job_id, index), 'rb') as f:
+            return f.read()
+
+    def open_parts(self, job_id, total_chunks):
+        """
+        AudioResult com as partes mapeadas em memória (sem cópia)
+        """
+        return AudioResult.from_files(
+            [self.part_path(job_id, i) for i in range(total_chunks)])
+
+    def open_merged(self, job_id):
+        return AudioResult.from_files([self.merged_path(job_id)])
+
+    def ensure_zip(self, job_id, total_chunks):
+        """
+        ZIP com todas as partes, gerado uma única vez no diretório do job
+
+        Returns:
+            str: Caminho do ZIP
+        """
+        path = self.zip_path(job_id)
+        if not os.path.exists(path):
+            tmp_path = path + '.tmp'
+            with open(tmp_path, 'wb') as f, self.open_parts(job_id, total_chunks) as parts:
+                write_zip_bundle(parts.parts(), f)
+            os.replace(tmp_path, path)
+        return path
+
+    def purge(self, older_than):
+        """
+        Remove jobs concluídos ou com erro anteriores a `older_than` (timestamp)
+        """
+        with self._connect() as db:
+            rows = db.execute(
+                'SELECT id FROM jobs WHERE status IN (?, ?) AND updated_at < ?',
+                (DONE, FAILED, older_than)).fetchall()
+            db.executemany('DELETE FROM jobs WHERE id = ?', [(row['id'],) for row in rows])
+        for row in rows:
+            shutil.rmtree(self.job_dir(row['id']), ignore_errors=True)
+        return len(rows)
+
+
+class JobManager:
+    """
+    Executa os jobs em segundo plano, compartilhado por todas as sessões
+
+    Jobs que ficaram na fila ou em execução quando o processo anterior
+    terminou são retomados, pulando as partes já gravadas.
+    """
+
+    def __init__(self, store, max_jobs):
+        self.store = store
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_jobs, thread_name_prefix='ttv-job')
+        # Limite de taxa global: vale para a soma de todos os jobs (e dos previews)
+        self._rate_limiter = get_rate_limiter()
+
+        # Síntese nos workers da fila compartilhada (None = neste processo)
+        self._coordinator = get_coordinator()
+
+        store.purge(time.time() - JOBS_CONFIG['retention_hours'] * 3600)
+        if self._coordinator is not None:
+            self._coordinator.purge(
+                time.time() - DISTRIBUTED_CONFIG['retention_hours'] * 3600)
+        for job_id in store.ids_with_status(QUEUED, RUNNING):
+            self._executor.submit(self._run, job_id)
+
+    def submit(self, text, language, speed_option, voice_type, voice_filter,
+               pitch, merge=False, previous_job_id=None):
+        """
+        Enfileira uma conversão e retorna o id do job
+
+        Com `previous_job_id` (a conversão anterior da sessão), os chunks que
+        não mudaram mantêm as mesmas fronteiras e o áudio já gerado é
+        reaproveitado; só os trechos editados são sintetizados.
+        """
+        params = {
+            'language': language,
+            'speed_option': speed_option,
+            'voice_type': voice_type,
+            'voice_filter': voice_filter,
+            'pitch': pitch,
+            'merge': merge,
+            'chunk_size': adaptive_chunk_size(text, language),
+        }
+
+        # Fronteiras definidas no envio e gravadas: a retomada usa a mesma divisão
+        previous = self.store.get(previous_job_id) if previous_job_id else None
+        if previous is not None and all(
+                previous['params'][name] == params[name] for name in VOICE_PARAMS):
+            spans, reused = anchored_chunk_spans(
+                text, self.store.chunks(previous), params['chunk_size'])
+            if reused:
+                params['reuse'] = {'job_id': previous_job_id,
+                                   'parts': sorted(reused.items())}
+        else:
+            spans = list(iter_chunk_spans(text, params['chunk_size']))
+        params['spans'] = spans
+
+        job_id = self.store.create(text, params)
+        self._executor.submit(self._run, job_id)
+        return job_id
+
+    def get(self, job_id):
+        return self.store.get(job_id)
+
+    def retry(self, job_id):
+        """
+        Reenfileira um job com erro; apenas as partes que faltam são sintetizadas
+        """
+        job = self.store.get(job_id)
+        if job is None or job['status'] != FAILED:
+            return False
+        self.store.update(job_id, status=QUEUED, error=None)
+        self._executor.submit(self._run, job_id)
+        return True
+
+    def _run(self, job_id):
+        job = self.store.get(job_id)
+        if job is None:
+            return
+        params = job['params']
+
+        try:
+            chunks = self.store.chunks(job)
+            if 'reuse' in params:
+                reused_chunks = self._splice_previous(job_id, params['reuse'])
+                self.store.update(job_id, reused_chunks=reused_chunks)
+            finished = set(self.store.finished_parts(job_id, len(chunks)))
+            pending = [i for i in range(len(chunks)) if i not in finished]
+            self.store.update(job_id, status=RUNNING, total_chunks=len(chunks),
+                              done_chunks=len(finished))
+
+            def synthesize(index):
+                # A falha definitiva de uma parte não interrompe as demais
+                try:
+                    return synthesize_speech(
+                        chunks[index], params['language'],
+                        SPEED_OPTIONS[params['speed_option']]['slow'],
+                        params['speed_option'], params['voice_type'],
+                        params['voice_filter'], params['pitch'],
+                        rate_limiter=self._rate_limiter)
+                except Exception as e:
+                    return e
+
+            # Chunks repetidos (títulos, avisos, refrões) são sintetizados uma
+            # única vez; os parâmetros de voz são os mesmos em todo o job
+            groups = group_duplicates(pending, chunks)
+            saved_calls = job['saved_calls']
+
+            if self._coordinator is not None:
+                # Partes chegam na ordem em que os workers terminam
+                pipeline = self._coordinator.run(job_id, chunks, list(groups), params)
+            else:
+                pipeline = iter_synthesized(
+                    list(groups), synthesize,
+                    max_workers=SYNTHESIS_CONFIG['max_workers'],
+                    lookahead=SYNTHESIS_CONFIG['lookahead'])
+
+            # Cada parte é gravada assim que fica pronta (checkpoint): uma
+            # nova tentativa sintetiza apenas as que faltam
+            done_chunks = len(finished)
+            failures = []
+            for _, index, result in pipeline:
+                if isinstance(result, Exception):
+                    failures.append((index, result))
+                    if isinstance(result, CircuitOpenError):
+                        break  # Motor indisponível: não insistir nas restantes
+                    continue
+                for position in groups[index]:
+                    self._write_atomic(self.store.part_path(job_id, position), result)
+                done_chunks += len(groups[index])
+                saved_calls += len(groups[index]) - 1
+                self.store.update(job_id, done_chunks=done_chunks, saved_calls=saved_calls)
+
+            if failures:
+                index, error = failures[0]
+                missing = len(chunks) - done_chunks
+                raise JobIncompleteError(
+                    f"{missing} de {len(chunks)} partes não foram geradas "
+                    f"(parte {index + 1}: {describe_error(error)})")
+
+            if params['merge'] and len(chunks) > 1:
+                with open(self.store.merged_path(job_id), 'wb') as merged_file, \
+                        self.store.open_parts(job_id, len(chunks)) as parts:
+                    writer = MP3MergeWriter(merged_file)
+                    for part in parts.parts():
+                        writer.add(part)
+                    writer.finish()
+            elif len(chunks) > 1:
+                # Servido pelo botão de download em todos os reruns
+                self.store.ensure_zip(job_id, len(chunks))
+
+            self.store.update(job_id, status=DONE)
+        except JobIncompleteError as e:
+            self.store.update(job_id, status=FAILED, error=str(e))
+        except Exception as e:
+            self.store.update(job_id, status=FAILED, error=describe_error(e))
+
+    def _splice_previous(self, job_id, reuse):
+        """
+        Traz as partes inalteradas do job anterior (link, sem cópia se possível)
+
+        Returns:
+            int: Partes disponíveis no job a partir do anterior
+        """
+        spliced = 0
+        for index, previous_index in reuse['parts']:
+            source = self.store.part_path(reuse['job_id'], previous_index)
+            target = self.store.part_path(job_id, index)
+            if os.path.exists(target):
+                spliced += 1  # Retomada: já trazida antes
+                continue
+            if not os.path.exists(source):
+                continue  # Job anterior já removido: a parte será sintetizada
+            try:
+                os.link(source, target)
+            except OSError:
+                with open(source, 'rb') as f:
+                    self._write_atomic(target, f.read())
+            spliced += 1
+        return spliced
+
+    @staticmethod
+    def _write_atomic(path, data):
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+
+_job_manager = None
+_job_manager_lock = threading.Lock()
+
+
+def get_job_manager():
+    """
+    Retorna o JobManager do processo (criado na primeira chamada)
+    """
+    global _job_manager
+    with _job_manager_lock:
+        if _job_manager is None:
+            _job_manager = JobManager(
+                JobStore(JOBS_CONFIG['directory']), JOBS_CONFIG['max_jobs'])
+        return _job_manager
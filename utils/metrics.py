@@ -0,0 +1,182 @@
+import json
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+from config import METRICS_CONFIG
+
+# Limites superiores dos buckets dos histogramas (segundos)
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1,
+                   0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Descrição das etapas instrumentadas (exibida no painel "Desempenho")
+STAGE_LABELS = {
+    'split_text': 'Divisão do texto',
+    'text_stats': 'Estatísticas do texto',
+    'text_processing': 'Processamento do texto',
+    'tts_total': 'Síntese (total por chunk)',
+    'tts_headers': 'TTS: envio até os cabeçalhos da resposta',
+    'tts_first_part': 'TTS: primeira parte do áudio decodificada',
+    'tts_body': 'TTS: corpo completo',
+    'tts_retry_wait': 'TTS: espera antes de nova tentativa',
+    'audio_effects': 'Efeitos de áudio (filtro, tom e velocidade)',
+    'merge': 'Mesclagem MP3',
+    'download': 'Preparação do download',
+    'api_speech': 'API: requisição de áudio (total)',
+}
+
+
+class Histogram:
+    """Histograma cumulativo de latências no estilo Prometheus"""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # Último = +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value):
+        index = len(self.buckets)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                index = i
+                break
+        self.counts[index] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def quantile(self, q):
+        """
+        Quantil aproximado por interpolação linear dentro do bucket
+        """
+        if not self.count:
+            return 0.0
+
+        rank = q * self.count
+        cumulative = 0
+        lower = 0.0
+        for i, count in enumerate(self.counts):
+            upper = self.buckets[i] if i < len(self.buckets) else self.max
+            if count and cumulative + count >= rank:
+                fraction = (rank - cumulative) / count
+                return min(self.max, lower + (upper - lower) * fraction)
+            cumulative += count
+            lower = upper
+        return self.max
+
+
+class MetricsRegistry:
+    """
+    Registro de histogramas por etapa, seguro entre threads
+
+    Se `log_path` for informado, cada observação também é gravada como
+    uma linha JSON (útil para analisar a cauda de latência).
+    """
+
+    def __init__(self, log_path=None, enabled=True):
+        self.enabled = enabled
+        self.log_path = log_path
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+    def observe(self, stage, seconds):
+        if not self.enabled:
+            return
+
+        with self._lock:
+            histogram = self._histograms.get(stage)
+            if histogram is None:
+                histogram = self._histograms[stage] = Histogram()
+            histogram.observe(seconds)
+
+            if self.log_path:
+                entry = {'ts': time.time(), 'stage': stage, 'seconds': seconds}
+                with open(self.log_path, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps(entry) + '\n')
+
+    @contextmanager
+    def timer(self, stage):
+        """
+        Mede o bloco `with` e registra na etapa indicada
+        """
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - started)
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+
+    def summary(self):
+        """
+        Resumo por etapa: contagem, média e quantis (segundos)
+        """
+        with self._lock:
+            return {
+                stage: {
+                    'count': h.count,
+                    'mean': h.sum / h.count if h.count else 0.0,
+                    'p50': h.quantile(0.50),
+                    'p95': h.quantile(0.95),
+                    'p99': h.quantile(0.99),
+                    'max': h.max,
+                }
+                for stage, h in sorted(self._histograms.items())
+            }
+
+    def to_json(self):
+        """
+        Exporta os histogramas completos em JSON
+        """
+        with self._lock:
+            data = {
+                stage: {
+                    'buckets': list(h.buckets),
+                    'counts': list(h.counts),
+                    'count': h.count,
+                    'sum': h.sum,
+                    'max': h.max,
+                }
+                for stage, h in sorted(self._histograms.items())
+            }
+        return json.dumps({'timestamp': time.time(), 'stages': data}, indent=2)
+
+    def to_prometheus(self, name='ttv_stage_duration_seconds'):
+        """
+        Exporta no formato de texto do Prometheus
+        """
+        lines = [
+            f"# HELP {name} Duração das etapas do pipeline texto -> áudio",
+            f"# TYPE {name} histogram",
+        ]
+        with self._lock:
+            for stage, h in sorted(self._histograms.items()):
+                cumulative = 0
+                for bound, count in zip(h.buckets, h.counts):
+                    cumulative += count
+                    lines.append(f'{name}_bucket{{stage="{stage}",le="{bound}"}} {cumulative}')
+                lines.append(f'{name}_bucket{{stage="{stage}",le="+Inf"}} {h.count}')
+                lines.append(f'{name}_sum{{stage="{stage}"}} {h.sum}')
+                lines.append(f'{name}_count{{stage="{stage}"}} {h.count}')
+        return '\n'.join(lines) + '\n'
+
+
+metrics = MetricsRegistry(
+    log_path=METRICS_CONFIG['log_path'], enabled=METRICS_CONFIG['enabled'])
+
+
+def timed(stage):
+    """
+    Decorador que registra a duração de cada chamada na etapa indicada
+    """
+    def decorator(function):
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            with metrics.timer(stage):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorator
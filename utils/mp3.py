@@ -0,0 +1,399 @@
+import struct
+from array import array
+from utils.metrics import metrics, timed
+
+# Índices de versão MPEG no cabeçalho do quadro
+MPEG_25, MPEG_2, MPEG_1 = 0, 2, 3
+
+# Bitrates (kbps) para Layer III
+_BITRATES = {
+    MPEG_1: (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),
+    MPEG_2: (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+}
+_BITRATES[MPEG_25] = _BITRATES[MPEG_2]
+
+_SAMPLE_RATES = {
+    MPEG_1: (44100, 48000, 32000),
+    MPEG_2: (22050, 24000, 16000),
+    MPEG_25: (11025, 12000, 8000),
+}
+
+XING_FLAGS = 0x0001 | 0x0002 | 0x0004  # frames + bytes + TOC
+TOC_ENTRIES = 100
+
+
+class FrameHeader:
+    """Cabeçalho de um quadro MPEG Layer III"""
+
+    __slots__ = ('version', 'bitrate_index', 'bitrate', 'sample_rate_index',
+                 'sample_rate', 'padding', 'protected', 'channel_mode',
+                 'raw')
+
+    def __init__(self, raw):
+        self.raw = raw
+        self.version = (raw >> 19) & 0x3
+        self.protected = not (raw >> 16) & 0x1
+        self.bitrate_index = (raw >> 12) & 0xF
+        self.sample_rate_index = (raw >> 10) & 0x3
+        self.padding = (raw >> 9) & 0x1
+        self.channel_mode = (raw >> 6) & 0x3
+        self.bitrate = _BITRATES[self.version][self.bitrate_index] * 1000
+        self.sample_rate = _SAMPLE_RATES[self.version][self.sample_rate_index]
+
+    @property
+    def samples_per_frame(self):
+        return 1152 if self.version == MPEG_1 else 576
+
+    @property
+    def frame_length(self):
+        coefficient = 144 if self.version == MPEG_1 else 72
+        return coefficient * self.bitrate // self.sample_rate + self.padding
+
+    @property
+    def side_info_size(self):
+        mono = self.channel_mode == 3
+        if self.version == MPEG_1:
+            return 17 if mono else 32
+        return 9 if mono else 17
+
+    @property
+    def duration(self):
+        return self.samples_per_frame / self.sample_rate
+
+
+def parse_frame_header(data, offset):
+    """
+    Lê o cabeçalho do quadro em `offset` (None se não for um quadro Layer III válido)
+    """
+    if offset + 4 > len(data):
+        return None
+
+    raw = struct.unpack_from('>I', data, offset)[0]
+    if (raw >> 21) & 0x7FF != 0x7FF:  # Sincronismo
+        return None
+    if (raw >> 19) & 0x3 == 1:  # Versão reservada
+        return None
+    if (raw >> 17) & 0x3 != 1:  # Somente Layer III
+        return None
+    if (raw >> 12) & 0xF in (0, 0xF):  # Bitrate livre/inválido
+        return None
+    if (raw >> 10) & 0x3 == 3:  # Taxa de amostragem reservada
+        return None
+
+    return FrameHeader(raw)
+
+
+def id3v2_size(data, offset=0):
+    """
+    Tamanho da tag ID3v2 em `offset` (0 se não houver)
+    """
+    if data[offset:offset + 3] != b'ID3' or len(data) < offset + 10:
+        return 0
+
+    flags = data[offset + 5]
+    size_bytes = data[offset + 6:offset + 10]
+    size = 0
+    for byte in size_bytes:  # Inteiro "syncsafe" de 28 bits
+        size = (size << 7) | (byte & 0x7F)
+
+    footer = 10 if flags & 0x10 else 0
+    return 10 + size + footer
+
+
+def audio_payload_bounds(data):
+    """
+    Retorna (início, fim) da região de quadros, sem tags ID3v2/ID3v1
+    """
+    start = 0
+    while True:
+        tag_size = id3v2_size(data, start)
+        if not tag_size:
+            break
+        start += tag_size
+
+    end = len(data)
+    if end - start >= 128 and data[end - 128:end - 125] == b'TAG':
+        end -= 128
+
+    return start, end
+
+
+def is_vbr_info_frame(data, offset, header):
+    """
+    Verifica se o quadro é um cabeçalho Xing/Info/VBRI (sem áudio)
+    """
+    xing_offset = offset + 4 + (2 if header.protected else 0) + header.side_info_size
+    if data[xing_offset:xing_offset + 4] in (b'Xing', b'Info'):
+        return True
+    return data[offset + 36:offset + 40] == b'VBRI'
+
+
+def find_sync(data, start, end):
+    """
+    Próximo byte 0xFF em data[start:end] (-1 se não houver)
+
+    Também funciona com memoryview (ex.: partes mapeadas com mmap), que não
+    tem `find`: a busca é feita em janelas pequenas copiadas.
+    """
+    find = getattr(data, 'find', None)
+    if find is not None:
+        return find(b'\xff', start, end)
+
+    window = 64 * 1024
+    for window_start in range(start, end, window):
+        position = bytes(data[window_start:min(window_start + window, end)]).find(b'\xff')
+        if position >= 0:
+            return window_start + position
+    return -1
+
+
+def iter_frames(data, start=0, end=None):
+    """
+    Percorre os quadros MP3 em data[start:end]
+
+    Bytes que não formam um quadro válido são ignorados até o próximo
+    sincronismo.
+
+    Yields:
+        tuple: (offset, FrameHeader)
+    """
+    end = len(data) if end is None else end
+    offset = start
+
+    while offset + 4 <= end:
+        header = parse_frame_header(data, offset)
+        if header is None or offset + header.frame_length > end:
+            offset = find_sync(data, offset + 1, end)
+            if offset < 0:
+                return
+            continue
+
+        yield offset, header
+        offset += header.frame_length
+
+
+def xing_frame_count(data, offset, header):
+    """
+    Total de quadros declarado no quadro Xing/Info em `offset` (None se ausente)
+    """
+    xing_offset = offset + 4 + (2 if header.protected else 0) + header.side_info_size
+    if data[xing_offset:xing_offset + 4] not in (b'Xing', b'Info'):
+        return None
+    flags, frames = struct.unpack_from('>II', data, xing_offset + 4)
+    return frames if flags & 0x0001 else None
+
+
+def _build_frame_table():
+    """
+    (tamanho, amostras, taxa de amostragem) indexados pelos bits 9-20 do
+    cabeçalho (versão, camada, CRC, bitrate, taxa e padding); None se inválido
+    """
+    table = []
+    for bits in range(1 << 12):
+        header = parse_frame_header(struct.pack('>I', 0xFFE00000 | bits << 9), 0)
+        table.append(None if header is None else
+                     (header.frame_length, header.samples_per_frame, header.sample_rate))
+    return table
+
+
+_FRAME_TABLE = _build_frame_table()
+_HEADER = struct.Struct('>I')
+
+
+def stream_info(data):
+    """
+    Duração e bitrate exatos de um MP3, sem decodificar o áudio
+
+    Se o primeiro quadro for um Xing/Info com a contagem de quadros (como
+    nos arquivos gerados por MP3MergeWriter), a duração sai direto dela; senão
+    os cabeçalhos dos quadros são percorridos com uma tabela pré-calculada.
+
+    Returns:
+        dict: duration (s), frames, bitrate (bps médio) e sample_rate
+    """
+    start, end = audio_payload_bounds(data)
+    first = next(iter_frames(data, start, end), None)
+    info = {'duration': 0.0, 'frames': 0, 'bitrate': 0, 'sample_rate': 0}
+    if first is None:
+        return info
+
+    offset, header = first
+    info['sample_rate'] = header.sample_rate
+    if is_vbr_info_frame(data, offset, header):
+        frames = xing_frame_count(data, offset, header)
+        offset += header.frame_length
+        if frames is not None:
+            info['frames'] = frames
+            info['duration'] = frames * header.samples_per_frame / header.sample_rate
+            if info['duration']:
+                info['bitrate'] = round((end - offset) * 8 / info['duration'])
+            return info
+
+    table = _FRAME_TABLE
+    unpack = _HEADER.unpack_from
+    frames = audio_bytes = 0
+    samples = {}  # Taxa de amostragem -> amostras (normalmente uma só)
+    while offset + 4 <= end:
+        raw = unpack(data, offset)[0]
+        entry = table[(raw >> 9) & 0xFFF] if raw >> 21 == 0x7FF else None
+        if entry is None or offset + entry[0] > end:
+            offset = find_sync(data, offset + 1, end)
+            if offset < 0:
+                break
+            continue
+
+        length, frame_samples, sample_rate = entry
+        frames += 1
+        audio_bytes += length
+        samples[sample_rate] = samples.get(sample_rate, 0) + frame_samples
+        offset += length
+
+    info['frames'] = frames
+    info['duration'] = sum(count / rate for rate, count in samples.items())
+    if info['duration']:
+        info['bitrate'] = round(audio_bytes * 8 / info['duration'])
+    return info
+
+
+def audio_frame_spans(data):
+    """
+    Lista os trechos contíguos de quadros de áudio, sem tags nem quadros Xing
+
+    Returns:
+        tuple: (spans, frame_offsets, first_header) onde spans é uma lista
+        de (início, fim) em `data` e frame_offsets o início de cada quadro
+    """
+    start, end = audio_payload_bounds(data)
+    spans = []
+    frame_offsets = array('Q')
+    first_header = None
+
+    for offset, header in iter_frames(data, start, end):
+        if first_header is None:
+            if is_vbr_info_frame(data, offset, header):
+                continue
+            first_header = header
+        frame_offsets.append(offset)
+
+        frame_end = offset + header.frame_length
+        if spans and spans[-1][1] == offset:
+            spans[-1] = (spans[-1][0], frame_end)
+        else:
+            spans.append((offset, frame_end))
+
+    return spans, frame_offsets, first_header
+
+
+def xing_frame_header(reference):
+    """
+    Cabeçalho do quadro Xing: menor bitrate cujo quadro comporte a tag e o TOC
+    """
+    needed = 4 + reference.side_info_size + 4 + 4 + 4 + 4 + TOC_ENTRIES
+
+    for bitrate_index in range(1, 15):
+        raw = (reference.raw & ~(0xF << 12) & ~(1 << 9)) | (bitrate_index << 12)
+        raw |= 1 << 16  # Sem CRC
+        header = FrameHeader(raw)
+        if header.frame_length >= needed:
+            break
+
+    return header
+
+
+def build_xing_frame(reference, audio_offsets, audio_bytes):
+    """
+    Monta um quadro Xing com contagem de quadros, tamanho total e TOC de busca
+
+    Args:
+        reference (FrameHeader): Quadro de áudio usado como modelo de formato
+        audio_offsets (array): Offset de cada quadro de áudio, a partir do fim do quadro Xing
+        audio_bytes (int): Total de bytes de áudio (sem o quadro Xing)
+    """
+    header = xing_frame_header(reference)
+    xing_offset = 4 + reference.side_info_size
+    frame_length = header.frame_length
+    total_bytes = frame_length + audio_bytes
+    frame_count = len(audio_offsets)
+
+    # TOC: posição (0-255) no arquivo para cada 1% da duração
+    toc = bytearray(TOC_ENTRIES)
+    if frame_count:
+        for i in range(TOC_ENTRIES):
+            position = frame_length + audio_offsets[i * frame_count // TOC_ENTRIES]
+            toc[i] = min(255, position * 256 // total_bytes)
+
+    frame = bytearray(frame_length)
+    struct.pack_into('>I', frame, 0, header.raw)
+    struct.pack_into('>4sIII', frame, xing_offset,
+                     b'Xing', XING_FLAGS, frame_count, total_bytes)
+    frame[xing_offset + 16:xing_offset + 16 + TOC_ENTRIES] = toc
+    return bytes(frame)
+
+
+def _collect_audio_frames(data, audio_offsets, audio_bytes):
+    """
+    Anexa os offsets dos quadros de `data` (no áudio unificado) a `audio_offsets`
+
+    Returns:
+        tuple: (views, first_header, audio_bytes) com as fatias de quadros
+        da parte e o novo total de bytes de áudio
+    """
+    spans, frame_offsets, first_header = audio_frame_spans(data)
+    view = memoryview(data)
+    views = [view[start:end] for start, end in spans]
+
+    span_index = 0
+    position = audio_bytes
+    for offset in frame_offsets:
+        while offset >= spans[span_index][1]:
+            position += spans[span_index][1] - spans[span_index][0]
+            span_index += 1
+        audio_offsets.append(position + offset - spans[span_index][0])
+
+    audio_bytes += sum(end - start for start, end in spans)
+    return views, first_header, audio_bytes
+
+
+class MP3MergeWriter:
+    """
+    Une vários MP3 em um arquivo com seek, com cabeçalho Xing correto
+
+    Tags ID3 e quadros Xing/Info de cada parte são descartados e um novo
+    quadro Xing (total de quadros, bytes e TOC) é escrito no início, para
+    que players calculem a duração e façam seek corretamente. Assume que
+    todas as partes usam o mesmo formato (taxa de amostragem/versão), como
+    no gTTS. As partes são gravadas à medida que chegam; o espaço do quadro
+    Xing é reservado no início e preenchido em `finish()`.
+    """
+
+    def __init__(self, fp):
+        self.fp = fp
+        self._start = fp.tell()
+        self._audio_offsets = array('Q')
+        self._audio_bytes = 0
+        self._reference = None
+
+    @timed('merge')
+    def add(self, data):
+        views, first_header, self._audio_bytes = _collect_audio_frames(
+            data, self._audio_offsets, self._audio_bytes)
+
+        if self._reference is None and first_header is not None:
+            self._reference = first_header
+            self.fp.write(bytes(xing_frame_header(first_header).frame_length))
+
+        for view in views:
+            self.fp.write(view)
+
+    def finish(self):
+        """
+        Escreve o quadro Xing definitivo e retorna o tamanho total do arquivo
+        """
+        with metrics.timer('merge'):
+            end = self.fp.tell()
+            if self._reference is not None:
+                self.fp.seek(self._start)
+                self.fp.write(build_xing_frame(
+                    self._reference, self._audio_offsets, self._audio_bytes))
+                self.fp.seek(end)
+        return end - self._start
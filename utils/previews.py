@@ -0,0 +1,332 @@
+"""
+Previews do "Testar Voz" pré-gerados em um único arquivo
+
+Os textos de preview são fixos e as opções formam um produto pequeno
+(idioma x voz x filtro x velocidade x tom), então todas as combinações são
+geradas uma vez e gravadas em um bundle:
+
+    cabeçalho  'TTVPREV1' + impressão digital (sha256) + tamanho do índice
+    índice     JSON {"idioma|voz|filtro|velocidade|tom": [offset, tamanho]}
+    dados      MP3s concatenados (áudios idênticos são gravados uma vez)
+
+O arquivo é mapeado em memória (mmap) e cada preview é uma fatia dele, sem
+chamadas ao motor. A impressão digital cobre as opções de voz, os textos de
+preview, o motor e os efeitos de áudio: se algo mudar, o bundle é ignorado
+e gerado de novo. Combinações que falharem ficam fora do índice (o preview
+é sintetizado na hora) e são geradas na próxima execução do comando.
+
+Gerar (ou completar):
+    python -m utils.previews
+"""
+import argparse
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+import tempfile
+import threading
+import time
+from config import (
+    LANGUAGES, VOICE_OPTIONS, VOICE_FILTERS, SPEED_OPTIONS, PITCH_OPTIONS,
+    PREVIEW_CONFIG, BACKEND_OPTIONS, DSP_CONFIG
+)
+from utils import dsp
+from utils.audio_utils import text_to_speech, get_voice_preview_text
+from utils.backends import get_backend
+from utils.retry import describe_error
+from utils.synthesis import get_rate_limiter, iter_synthesized
+
+MAGIC = b'TTVPREV1'
+_HEADER = struct.Struct('>8s32sI')  # Marca, impressão digital, tamanho do índice
+
+
+def preview_key(language, voice_type, voice_filter, speed_option, pitch):
+    return '|'.join([language, voice_type, voice_filter, speed_option, pitch])
+
+
+def preview_combinations(languages=None):
+    """
+    Todas as combinações exibidas pela interface, em ordem estável
+
+    Yields:
+        tuple: (idioma, voz, filtro, velocidade, tom)
+    """
+    for language in languages or LANGUAGES:
+        # Idiomas sem opções de voz usam a voz padrão (como na interface)
+        for voice_type in VOICE_OPTIONS.get(language, {'feminina': None}):
+            for voice_filter in VOICE_FILTERS:
+                for speed_option in SPEED_OPTIONS:
+                    for pitch in PITCH_OPTIONS:
+                        yield language, voice_type, voice_filter, speed_option, pitch
+
+
+def bundle_fingerprint(backend=None, languages=None):
+    """
+    sha256 de tudo que muda o conteúdo do bundle
+
+    Apenas as opções que alteram o áudio entram na conta: mudar outras
+    partes do config.py não invalida o bundle.
+    """
+    tts_backend = get_backend(backend)
+    options = {
+        'voices': VOICE_OPTIONS,
+        'filters': VOICE_FILTERS,
+        'speeds': SPEED_OPTIONS,
+        'pitches': PITCH_OPTIONS,
+        'backend': [tts_backend.name, BACKEND_OPTIONS.get(tts_backend.name)],
+        'dsp': DSP_CONFIG if dsp.is_available() else None,
+    }
+    digest = hashlib.sha256()
+    digest.update(json.dumps(options, sort_keys=True, default=str).encode('utf-8'))
+    for combination in preview_combinations(languages):
+        digest.update(preview_key(*combination).encode('utf-8'))
+        digest.update(get_voice_preview_text(combination[1], combination[2]).encode('utf-8'))
+    return digest.digest()
+
+
+class PreviewBundle:
+    """Bundle aberto com mmap; `get` retorna memoryview sem cópia"""
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, 'rb')
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, fingerprint, index_size = _HEADER.unpack_from(self._map, 0)
+            if magic != MAGIC:
+                raise ValueError(f"Arquivo de previews inválido: {path}")
+            data_start = _HEADER.size + index_size
+            index = json.loads(self._map[_HEADER.size:data_start])
+        except Exception:
+            self._file.close()
+            raise
+
+        self.fingerprint = fingerprint
+        self._view = memoryview(self._map)
+        self._index = {key: (data_start + offset, length)
+                       for key, (offset, length) in index.items()}
+
+    def get(self, language, voice_type, voice_filter, speed_option, pitch):
+        """
+        Áudio do preview (memoryview) ou None se a combinação não existir
+        """
+        entry = self._index.get(
+            preview_key(language, voice_type, voice_filter, speed_option, pitch))
+        if entry is None:
+            return None
+        offset, length = entry
+        return self._view[offset:offset + length]
+
+    def __len__(self):
+        return len(self._index)
+
+    @property
+    def nbytes(self):
+        return len(self._map)
+
+    def close(self):
+        self._view.release()
+        self._map.close()
+        self._file.close()
+
+
+def open_bundle(path, fingerprint):
+    """
+    Abre o bundle se existir e corresponder à impressão digital (senão None)
+    """
+    try:
+        bundle = PreviewBundle(path)
+    except (OSError, ValueError, struct.error):
+        return None
+    if bundle.fingerprint != fingerprint:
+        bundle.close()
+        return None
+    return bundle
+
+
+def build_preview_bundle(path=None, backend=None, languages=None, workers=None):
+    """
+    Gera os previews e grava o bundle (substituição atômica)
+
+    Previews de um bundle atual no mesmo caminho são reaproveitados; só as
+    combinações que faltam são sintetizadas. Uma combinação que falhar fica
+    fora do índice sem descartar as demais.
+
+    Returns:
+        dict: Resumo (combinações, áudios distintos, falhas, bytes, segundos)
+    """
+    path = path or PREVIEW_CONFIG['path']
+    workers = workers or PREVIEW_CONFIG['workers']
+    started = time.perf_counter()
+    fingerprint = bundle_fingerprint(backend, languages)
+    combinations = list(preview_combinations(languages))
+    # O limite de taxa do processo vale só para requisições ao motor (o
+    # cache de áudio não consome tokens), então é sempre compartilhado
+    rate_limiter = get_rate_limiter()
+
+    def render(combination):
+        language, voice_type, voice_filter, speed_option, pitch = combination
+        try:
+            return text_to_speech(
+                get_voice_preview_text(voice_type, voice_filter), language,
+                SPEED_OPTIONS[speed_option]['slow'], speed_option, voice_type,
+                voice_filter, pitch, rate_limiter=rate_limiter)
+        except Exception as e:
+            return e
+
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    index = {}
+    offsets = {}  # sha256 do áudio -> (offset, tamanho)
+    failures = []
+    data_size = 0
+
+    def add(combination, audio):
+        nonlocal data_size
+        digest = hashlib.sha256(audio).digest()
+        if digest not in offsets:
+            offsets[digest] = (data_size, len(audio))
+            data.write(audio)
+            data_size += len(audio)
+        index[preview_key(*combination)] = offsets[digest]
+
+    with tempfile.TemporaryFile(dir=directory) as data:
+        previous = open_bundle(path, fingerprint)
+        pending = combinations
+        if previous is not None:
+            try:
+                pending = []
+                for combination in combinations:
+                    audio = previous.get(*combination)
+                    if audio is None:
+                        pending.append(combination)
+                        continue
+                    with audio:  # Libera a fatia antes de fechar o mmap
+                        add(combination, audio)
+            finally:
+                previous.close()
+
+        for _, combination, audio in iter_synthesized(
+                pending, render, max_workers=workers, lookahead=workers * 2):
+            if isinstance(audio, Exception):
+                failures.append((combination, audio))
+                continue
+            add(combination, audio)
+
+        index_bytes = json.dumps(index, separators=(',', ':')).encode('utf-8')
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(_HEADER.pack(MAGIC, fingerprint, len(index_bytes)))
+                f.write(index_bytes)
+                data.seek(0)
+                while True:
+                    block = data.read(1024 * 1024)
+                    if not block:
+                        break
+                    f.write(block)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+
+    return {
+        'combinations': len(index),
+        'distinct_audios': len(offsets),
+        'failed': len(failures),
+        'first_error': (f"{preview_key(*failures[0][0])}: {describe_error(failures[0][1])}"
+                        if failures else None),
+        'bytes': _HEADER.size + len(index_bytes) + data_size,
+        'seconds': round(time.perf_counter() - started, 2),
+    }
+
+
+_bundle = None
+_bundle_state = {'state': 'not_loaded', 'error': None}
+_bundle_lock = threading.Lock()
+
+
+def get_preview_bundle():
+    """
+    Retorna o bundle do processo (None se faltar ou estiver desatualizado)
+
+    Na primeira chamada verifica a impressão digital; com
+    `PREVIEW_CONFIG['build_on_startup']` e um motor local (ou efeitos de
+    áudio, que derivam quase tudo de poucos áudios), um bundle ausente ou
+    antigo é gerado em segundo plano e passa a ser usado quando ficar pronto.
+    Com motores remotos, o bundle é gerado pelo comando `python -m utils.previews`.
+    """
+    global _bundle
+    with _bundle_lock:
+        if _bundle_state['state'] != 'not_loaded':
+            return _bundle
+
+        _bundle = open_bundle(PREVIEW_CONFIG['path'], bundle_fingerprint())
+        if _bundle is not None:
+            _bundle_state['state'] = 'ready'
+        elif PREVIEW_CONFIG['build_on_startup'] and (
+                not get_backend().remote or dsp.is_available()):
+            _bundle_state['state'] = 'building'
+            threading.Thread(target=_build_in_background, name='ttv-previews',
+                             daemon=True).start()
+        else:
+            _bundle_state['state'] = 'missing'
+        return _bundle
+
+
+def _build_in_background():
+    global _bundle
+    try:
+        build_preview_bundle()
+        bundle = PreviewBundle(PREVIEW_CONFIG['path'])
+    except Exception as e:
+        with _bundle_lock:
+            _bundle_state.update(state='failed', error=str(e))
+        return
+    with _bundle_lock:
+        _bundle = bundle
+        _bundle_state['state'] = 'ready'
+
+
+def preview_bundle_status():
+    """
+    Estado do bundle: 'ready', 'building', 'failed', 'missing' ou 'not_loaded'
+    """
+    with _bundle_lock:
+        return dict(_bundle_state, entries=len(_bundle) if _bundle is not None else 0)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Gera o bundle de previews do 'Testar Voz'")
+    parser.add_argument('--output', default=PREVIEW_CONFIG['path'], help="Arquivo do bundle")
+    parser.add_argument('--workers', type=int, default=PREVIEW_CONFIG['workers'])
+    parser.add_argument('--force', action='store_true',
+                        help="Gerar mesmo que o bundle atual esteja atualizado")
+    args = parser.parse_args(argv)
+
+    if args.force:
+        if os.path.exists(args.output):
+            os.remove(args.output)
+    else:
+        bundle = open_bundle(args.output, bundle_fingerprint())
+        if bundle is not None:
+            complete = len(bundle) == sum(1 for _ in preview_combinations())
+            bundle.close()
+            if complete:
+                print(f"Bundle atualizado: {args.output}")
+                return 0
+
+    summary = build_preview_bundle(args.output, workers=args.workers)
+    print(f"{summary['combinations']} previews ({summary['distinct_audios']} áudios distintos, "
+          f"{summary['bytes'] / 1024 / 1024:.1f} MB) em {summary['seconds']:.1f}s: {args.output}")
+    if summary['failed']:
+        print(f"{summary['failed']} previews falharam (ex.: {summary['first_error']}); "
+              f"execute novamente para completá-los", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
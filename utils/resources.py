@@ -0,0 +1,87 @@
+"""
+Recursos de rede compartilhados pelo processo
+
+Uma `requests.Session` com pool de conexões keep-alive por domínio (tld)
+do serviço de TTS, reutilizada por todas as sessões do Streamlit, pelos
+jobs em segundo plano e pela linha de comando. Assim cada chunk reaproveita
+uma conexão TLS já aberta em vez de refazer o handshake.
+"""
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from config import HTTP_CONFIG
+from utils.metrics import metrics
+
+_http_sessions = {}
+_http_sessions_lock = threading.Lock()
+
+
+class _TTSAdapter(HTTPAdapter):
+    """
+    Adaptador com pool keep-alive que mede o tempo até os cabeçalhos e
+    conta as requisições enviadas (total, em andamento e pico simultâneo)
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._counts_lock = threading.Lock()
+        self.requests = 0
+        self.in_flight = 0
+        self.peak = 0  # Conexões necessárias no pool: o resto é reaproveitado
+
+    def send(self, request, **kwargs):
+        with self._counts_lock:
+            self.requests += 1
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+        try:
+            response = super().send(request, **kwargs)
+        finally:
+            with self._counts_lock:
+                self.in_flight -= 1
+        # `elapsed` vai do envio da requisição até os cabeçalhos da resposta
+        metrics.observe('tts_headers', response.elapsed.total_seconds())
+        return response
+
+    def stats(self):
+        with self._counts_lock:
+            return {'requests': self.requests, 'in_flight': self.in_flight,
+                    'peak': self.peak}
+
+
+def get_http_session(tld='com'):
+    """
+    Retorna a sessão HTTP compartilhada para o domínio `tld`
+    """
+    with _http_sessions_lock:
+        session = _http_sessions.get(tld)
+        if session is None:
+            session = requests.Session()
+            adapter = _TTSAdapter(
+                pool_connections=1, pool_maxsize=HTTP_CONFIG['pool_maxsize'])
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+            _http_sessions[tld] = session
+        return session
+
+
+def close_http_sessions():
+    """
+    Fecha todas as conexões abertas (ex.: ao encerrar um processo de trabalho)
+    """
+    with _http_sessions_lock:
+        for session in _http_sessions.values():
+            session.close()
+        _http_sessions.clear()
+
+
+def http_session_stats():
+    """
+    Requisições por domínio com sessão aberta: total, em andamento e pico
+
+    O pico de requisições simultâneas é o número de conexões que o pool
+    precisou abrir; as demais requisições reaproveitaram uma conexão.
+    """
+    with _http_sessions_lock:
+        return {tld: session.get_adapter('https://').stats()
+                for tld, session in _http_sessions.items()}
@@ -0,0 +1,182 @@
+"""
+Novas tentativas com backoff exponencial e circuit breaker por motor/domínio
+
+Só falhas transitórias (`retryable`: limite de taxa, timeout, erro do
+servidor) são repetidas, com espera exponencial e jitter completo
+(aleatória entre 0 e base * 2^tentativa) para não sincronizar as threads.
+Se o serviço sugerir uma espera (Retry-After), ela é respeitada.
+
+O circuit breaker de cada (motor, tld) abre após várias falhas seguidas:
+enquanto aberto, as chamadas falham na hora com CircuitOpenError (sem
+gastar requisições); depois de `reset_timeout` uma chamada de teste é
+liberada e, se der certo, o circuito fecha.
+"""
+import random
+import threading
+import time
+from config import RETRY_CONFIG
+from utils.backends import (
+    TTSBackendError, RateLimitError, BackendTimeoutError, ServerError
+)
+from utils.metrics import metrics
+
+
+class CircuitOpenError(TTSBackendError):
+    """O circuito do motor está aberto após falhas seguidas"""
+
+    retryable = True
+
+    def __init__(self, key, retry_after):
+        backend, tld = key
+        super().__init__(
+            f"Motor {backend} ({tld}) indisponível após falhas seguidas; "
+            f"nova tentativa em {retry_after:.0f}s")
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """Circuit breaker fechado/aberto/meio-aberto (thread-safe)"""
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, key, failure_threshold, reset_timeout, clock=time.monotonic):
+        self.key = key
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self._opened_at = 0.0
+        self._trial_running = False
+        self._clock = clock
+        self._lock = threading.Lock()
+
+    def before_call(self):
+        """
+        Levanta CircuitOpenError se a chamada não deve ser feita agora
+        """
+        with self._lock:
+            if self.state == self.CLOSED:
+                return
+
+            remaining = self._opened_at + self.reset_timeout - self._clock()
+            if self.state == self.OPEN and remaining <= 0:
+                self.state = self.HALF_OPEN
+            if self.state == self.HALF_OPEN and not self._trial_running:
+                self._trial_running = True  # Uma única chamada de teste
+                return
+            raise CircuitOpenError(self.key, max(remaining, 0.0) or self.reset_timeout)
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+            self._trial_running = False
+
+    def release(self):
+        """
+        Libera a chamada de teste sem contar sucesso nem falha
+        """
+        with self._lock:
+            self._trial_running = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._trial_running = False
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self._opened_at = self._clock()
+
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+def get_circuit_breaker(backend_name, tld):
+    """
+    Retorna o circuit breaker compartilhado de (motor, tld)
+    """
+    key = (backend_name, tld)
+    with _breakers_lock:
+        breaker = _breakers.get(key)
+        if breaker is None:
+            breaker = _breakers[key] = CircuitBreaker(
+                key, RETRY_CONFIG['breaker_threshold'], RETRY_CONFIG['breaker_reset'])
+        return breaker
+
+
+def circuit_states():
+    """
+    Estado de cada circuito: {(motor, tld): (estado, falhas seguidas)}
+    """
+    with _breakers_lock:
+        return {key: (b.state, b.failures) for key, b in _breakers.items()}
+
+
+def backoff_delay(attempt, error=None, base_delay=None, max_delay=None):
+    """
+    Espera antes da tentativa `attempt + 1` (jitter completo)
+    """
+    base_delay = RETRY_CONFIG['base_delay'] if base_delay is None else base_delay
+    max_delay = RETRY_CONFIG['max_delay'] if max_delay is None else max_delay
+    delay = random.uniform(0, min(max_delay, base_delay * 2 ** attempt))
+
+    retry_after = getattr(error, 'retry_after', None)
+    if retry_after is not None:
+        delay = max(delay, min(retry_after, max_delay))
+    return delay
+
+
+def call_with_retry(function, breaker=None, max_attempts=None, sleep=time.sleep,
+                    rate_limiter=None):
+    """
+    Chama `function()` repetindo falhas transitórias com backoff
+
+    Erros não transitórios (ex.: idioma inválido) são levantados na hora;
+    após `max_attempts` tentativas, o último erro é levantado. Com
+    `rate_limiter`, cada tentativa (inclusive as repetições) consome um token.
+    """
+    max_attempts = max_attempts or RETRY_CONFIG['max_attempts']
+
+    for attempt in range(max_attempts):
+        try:
+            if breaker is not None:
+                breaker.before_call()
+            if rate_limiter is not None:
+                rate_limiter.acquire()
+            result = function()
+        except Exception as e:
+            if not getattr(e, 'retryable', False):
+                # Erro que não indica indisponibilidade (ex.: idioma inválido)
+                if breaker is not None:
+                    breaker.release()
+                raise
+            if breaker is not None and not isinstance(e, CircuitOpenError):
+                breaker.record_failure()
+            if attempt + 1 >= max_attempts:
+                raise
+
+            delay = backoff_delay(attempt, e)
+            metrics.observe('tts_retry_wait', delay)
+            sleep(delay)
+        else:
+            if breaker is not None:
+                breaker.record_success()
+            return result
+
+
+def describe_error(error):
+    """
+    Mensagem para o usuário conforme o tipo de falha
+    """
+    if isinstance(error, RateLimitError):
+        return "O serviço de voz limitou as requisições (excesso de chamadas)."
+    if isinstance(error, BackendTimeoutError):
+        return "O serviço de voz demorou demais para responder."
+    if isinstance(error, CircuitOpenError):
+        return str(error)
+    if isinstance(error, ServerError):
+        return f"O serviço de voz está instável: {error}"
+    return f"Erro ao gerar áudio: {error}"
@@ -0,0 +1,111 @@
+"""
+Duração da fala estimada antes da síntese
+
+Cada áudio gerado tem a duração exata medida nos quadros MP3
+(`utils.mp3.stream_info`) e alimenta uma taxa de caracteres falados por
+segundo por (idioma, voz, filtro, velocidade), com decaimento exponencial.
+Contar caracteres em vez de palavras funciona também para japonês, coreano
+e chinês, que não separam palavras por espaços.
+
+Enquanto uma combinação tem poucas observações, usa a taxa do idioma
+(todas as vozes, convertida para a velocidade normal) e, sem nenhuma, o
+valor padrão de `SPEECH_RATE_CONFIG`, ajustados pelo `time_stretch` da
+velocidade escolhida.
+"""
+import re
+import threading
+from config import SPEECH_RATE_CONFIG, SPEED_OPTIONS
+
+# Tudo que não é letra, dígito ou ideograma (espaços, pontuação, símbolos)
+_NOT_SPOKEN = re.compile(r'[\W_]+')
+
+
+def count_spoken_chars(text):
+    """
+    Caracteres que viram fala: letras, dígitos e ideogramas
+    """
+    return len(_NOT_SPOKEN.sub('', text))
+
+
+def _speed_ratio(speed_option):
+    return SPEED_OPTIONS.get(speed_option, {}).get('time_stretch', 1.0)
+
+
+class SpeechRateModel:
+    """Caracteres falados por segundo, aprendidos com a duração real dos áudios"""
+
+    def __init__(self, config=SPEECH_RATE_CONFIG):
+        self.config = config
+        self._voices = {}     # (idioma, voz, filtro, velocidade) -> [caracteres, segundos]
+        self._languages = {}  # idioma -> [caracteres, segundos] na velocidade normal
+        self._lock = threading.Lock()
+
+    def _add(self, table, key, chars, seconds):
+        totals = table.setdefault(key, [0.0, 0.0])
+        totals[0] = totals[0] * self.config['decay'] + chars
+        totals[1] = totals[1] * self.config['decay'] + seconds
+
+    def observe(self, language, voice_type, voice_filter, speed_option, chars, seconds):
+        """
+        Registra um áudio de `seconds` segundos gerado a partir de `chars` caracteres falados
+        """
+        if chars <= 0 or seconds <= 0:
+            return
+        with self._lock:
+            self._add(self._voices, (language, voice_type, voice_filter, speed_option),
+                      chars, seconds)
+            self._add(self._languages, language,
+                      chars, seconds * _speed_ratio(speed_option))
+
+    def chars_per_second(self, language, voice_type='feminina', voice_filter='normal',
+                         speed_option='normal'):
+        """
+        Taxa estimada para a combinação
+
+        Returns:
+            tuple: (caracteres por segundo, origem: 'voz', 'idioma' ou 'padrão')
+        """
+        min_chars = self.config['min_chars']
+        with self._lock:
+            voice = self._voices.get((language, voice_type, voice_filter, speed_option))
+            if voice and voice[0] >= min_chars:
+                return voice[0] / voice[1], 'voz'
+            base = self._languages.get(language)
+            if base and base[0] >= min_chars:
+                return base[0] / base[1] * _speed_ratio(speed_option), 'idioma'
+
+        default = self.config['language_cps'].get(language, self.config['default_cps'])
+        return default * _speed_ratio(speed_option), 'padrão'
+
+    def estimate_seconds(self, text, language, voice_type='feminina', voice_filter='normal',
+                         speed_option='normal'):
+        """
+        Duração prevista do áudio de `text`, em segundos
+        """
+        cps, _ = self.chars_per_second(language, voice_type, voice_filter, speed_option)
+        return count_spoken_chars(text) / cps
+
+    def snapshot(self):
+        """
+        Taxa observada por (idioma, voz, filtro, velocidade), para exibição
+        """
+        with self._lock:
+            return [
+                {
+                    'language': language, 'voice_type': voice_type,
+                    'voice_filter': voice_filter, 'speed_option': speed_option,
+                    'chars': chars, 'chars_per_second': chars / seconds,
+                }
+                for (language, voice_type, voice_filter, speed_option), (chars, seconds)
+                in sorted(self._voices.items())
+            ]
+
+
+_speech_rate_model = SpeechRateModel()
+
+
+def get_speech_rate_model():
+    """
+    Retorna o modelo de taxa de fala compartilhado pelo processo
+    """
+    return _speech_rate_model
@@ -0,0 +1,199 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from config import SYNTHESIS_CONFIG
+
+
+class ChunkSynthesisError(Exception):
+    """Falha ao sintetizar um chunk específico"""
+
+    def __init__(self, index, cause):
+        super().__init__(f"Erro ao processar parte {index + 1}: {cause}")
+        self.index = index
+        self.cause = cause
+
+
+class TokenBucket:
+    """
+    Limitador de taxa no estilo token bucket (thread-safe)
+
+    Permite rajadas de até `capacity` requisições e, em média,
+    `rate` requisições por segundo.
+    """
+
+    def __init__(self, rate, capacity, clock=time.monotonic, sleep=time.sleep):
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self._tokens = float(capacity)
+        self._clock = clock
+        self._sleep = sleep
+        self._last = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = self._clock()
+        elapsed = now - self._last
+        self._last = now
+        self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+
+    def acquire(self, tokens=1):
+        """
+        Bloqueia até haver tokens disponíveis e os consome
+        """
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                wait = (tokens - self._tokens) / self.rate
+            self._sleep(wait)
+
+
+_rate_limiter = None
+_rate_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter():
+    """
+    Limite de taxa global do processo (SYNTHESIS_CONFIG)
+
+    Compartilhado por jobs e previews: o limite vale para a soma das
+    requisições ao motor, não para cada um separadamente.
+    """
+    global _rate_limiter
+    with _rate_limiter_lock:
+        if _rate_limiter is None:
+            _rate_limiter = TokenBucket(
+                SYNTHESIS_CONFIG['rate_per_second'], SYNTHESIS_CONFIG['burst'])
+        return _rate_limiter
+
+
+def normalize_chunk(chunk):
+    """
+    Forma canônica de um chunk para detectar repetições (espaços colapsados)
+    """
+    return ' '.join(chunk.split())
+
+
+def group_duplicates(indices, chunks, key=normalize_chunk):
+    """
+    Agrupa posições cujos chunks são iguais após a normalização
+
+    A comparação é por chunk inteiro: uma frase repetida dentro de chunks
+    diferentes é sintetizada em cada um deles. Isolar frases repetidas em
+    chunks próprios aumentaria o número de requisições e mudaria a
+    entonação do texto em volta.
+
+    Args:
+        indices (iterable[int]): Posições a sintetizar
+        chunks (list[str]): Texto de cada posição
+        key (callable): Normalização aplicada antes da comparação
+
+    Returns:
+        dict: {posição representante: [todas as posições com o mesmo texto]},
+            na ordem da primeira ocorrência
+    """
+    groups = {}
+    representative_for = {}
+    for index in indices:
+        normalized = key(chunks[index])
+        representative = representative_for.setdefault(normalized, index)
+        groups.setdefault(representative, []).append(index)
+    return groups
+
+
+def synthesize_chunks(chunks, synthesize, max_workers=4, on_progress=None):
+    """
+    Sintetiza vários chunks simultaneamente, preservando a ordem
+
+    Args:
+        chunks (list[str]): Trechos de texto já divididos
+        synthesize (callable): Função texto -> bytes (deve levantar exceção em caso de erro)
+        max_workers (int): Número máximo de requisições simultâneas
+        on_progress (callable): Chamado como on_progress(concluídos, total, índice)
+            na thread chamadora sempre que um chunk termina
+
+    Returns:
+        list[bytes]: Áudio de cada chunk, na mesma ordem dos textos
+    """
+    total = len(chunks)
+    results = [None] * total
+    if total == 0:
+        return results
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, total))) as executor:
+        futures = {
+            executor.submit(synthesize, chunk): index
+            for index, chunk in enumerate(chunks)
+        }
+        completed = 0
+        try:
+            for future in as_completed(futures):
+                index = futures[future]
+                try:
+                    results[index] = future.result()
+                except Exception as e:
+                    raise ChunkSynthesisError(index, e) from e
+
+                completed += 1
+                if on_progress is not None:
+                    on_progress(completed, total, index)
+        except BaseException:
+            # Não esperar pelos chunks restantes em caso de falha
+            for future in futures:
+                future.cancel()
+            raise
+
+    return results
+
+
+def iter_synthesized(chunks, synthesize, max_workers=4, lookahead=8):
+    """
+    Pipeline em streaming: sintetiza os chunks e os entrega em ordem
+
+    Os chunks são consumidos preguiçosamente (podem vir de um gerador) e no
+    máximo `lookahead` resultados ficam em andamento ou aguardando consumo,
+    o que limita a memória. O primeiro chunk é entregue assim que fica
+    pronto, enquanto os seguintes continuam sendo sintetizados.
+
+    Args:
+        chunks (iterable[str]): Trechos de texto
+        synthesize (callable): Função texto -> bytes (deve levantar exceção em caso de erro)
+        max_workers (int): Número máximo de requisições simultâneas
+        lookahead (int): Janela máxima de chunks submetidos e ainda não entregues
+
+    Yields:
+        tuple: (índice, texto do chunk, bytes do áudio)
+    """
+    lookahead = max(1, lookahead)
+    numbered_chunks = enumerate(chunks)
+    pending = deque()
+
+    executor = ThreadPoolExecutor(max_workers=max(1, min(max_workers, lookahead)))
+
+    def fill_window():
+        while len(pending) < lookahead:
+            item = next(numbered_chunks, None)
+            if item is None:
+                return
+            index, chunk = item
+            pending.append((index, chunk, executor.submit(synthesize, chunk)))
+
+    try:
+        fill_window()
+        while pending:
+            index, chunk, future = pending.popleft()
+            try:
+                audio = future.result()
+            except Exception as e:
+                raise ChunkSynthesisError(index, e) from e
+
+            # Manter a janela cheia enquanto o consumidor processa este chunk
+            fill_window()
+            yield index, chunk, audio
+    finally:
+        for _, _, future in pending:
+            future.cancel()
+        executor.shutdown(wait=True)
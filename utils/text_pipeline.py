@@ -0,0 +1,162 @@
+"""
+Pipeline compilado de processamento de texto (velocidade, filtro e tom)
+
+Os padrões são compilados uma única vez na importação e cada combinação
+(velocidade, filtro, tom) vira uma sequência mínima de passagens:
+
+- substituições que só trocam sequências de espaços (`\\s+` -> R) e são
+  consecutivas são fundidas em uma só;
+- pares de substituições independentes do mesmo estágio viram uma única
+  expressão com alternância.
+
+O resultado é idêntico ao da aplicação sequencial original
+(ver benchmarks/bench_text_processing.py).
+"""
+import re
+from functools import lru_cache
+from config import PITCH_OPTIONS
+
+WHITESPACE_RE = re.compile(r'\s+')
+
+# rapida: vírgulas e pontos com um único espaço depois
+_COMMA_RE = re.compile(r'\s*,\s*')
+_PERIOD_RE = re.compile(r'\s*\.\s*')
+
+# robotico: ponto após cada palavra, sem pontos repetidos
+_ROBOT_RE = re.compile(r'(\w+)\.*|\.+')
+
+# dramatico / animado
+_DRAMATIC_RE = re.compile(
+    r'[.!?]|\b(muito|grande|importante|incrível|fantástico)\b', re.IGNORECASE)
+_EXCITED_RE = re.compile(
+    r'\.|\b(ótimo|excelente|maravilhoso|fantástico)\b', re.IGNORECASE)
+
+# Tom agudo: remove vírgulas e normaliza espaços
+_HIGH_PITCH_RE = re.compile(r'[\s,]+')
+
+
+class WhitespaceStep:
+    """Substitui cada sequência de espaços por `replacement` (equivale a \\s+ -> R)"""
+
+    __slots__ = ('replacement',)
+
+    def __init__(self, replacement):
+        self.replacement = replacement
+
+    def then(self, other):
+        """
+        Funde com outra substituição de espaços aplicada em seguida
+        """
+        return WhitespaceStep(WHITESPACE_RE.sub(other.replacement, self.replacement))
+
+    def __call__(self, text):
+        # str.split() e \s usam a mesma definição de espaço (Unicode)
+        words = text.split()
+        if not words:
+            return self.replacement if text else text
+
+        result = self.replacement.join(words)
+        if text[0].isspace():
+            result = self.replacement + result
+        if text[-1].isspace():
+            result = result + self.replacement
+        return result
+
+
+class SubStep:
+    """Substituição com expressão pré-compilada"""
+
+    __slots__ = ('pattern', 'replacement')
+
+    def __init__(self, pattern, replacement):
+        self.pattern = pattern
+        self.replacement = replacement
+
+    def __call__(self, text):
+        return self.pattern.sub(self.replacement, text)
+
+
+def _robot_replacement(match):
+    word = match.group(1)
+    return word + '.' if word else '.'
+
+
+def _dramatic_replacement(match):
+    word = match.group(1)
+    return f'... {word} ...' if word else '...'
+
+
+def _excited_replacement(match):
+    word = match.group(1)
+    return f'... {word}! ...' if word else '!'
+
+
+def _echo(text):
+    # Simular eco repetindo o final de palavras longas
+    words = text.split()
+    processed_words = []
+    append = processed_words.append
+    for i, word in enumerate(words):
+        append(word)
+        if i % 3 == 0 and len(word) > 6:
+            append(f"...{word[-3:]}...")
+    return ' '.join(processed_words)
+
+
+SPEED_STEPS = {
+    'muito_lenta': (WhitespaceStep(' ... '),),
+    'lenta': (WhitespaceStep(' .. '),),
+    'rapida': (SubStep(_COMMA_RE, ', '), SubStep(_PERIOD_RE, '. ')),
+}
+
+FILTER_STEPS = {
+    'robotico': (SubStep(_ROBOT_RE, _robot_replacement),),
+    'eco': (_echo,),
+    'sussurro': (WhitespaceStep(' .. '),),
+    'dramatico': (SubStep(_DRAMATIC_RE, _dramatic_replacement),),
+    'animado': (SubStep(_EXCITED_RE, _excited_replacement),),
+}
+
+
+def pitch_steps(pitch):
+    """
+    Passos de texto que simulam o tom escolhido
+    """
+    multiplier = PITCH_OPTIONS.get(pitch, PITCH_OPTIONS['normal'])['multiplier']
+
+    if multiplier < 0.9:  # Voz mais grave: pausas entre palavras
+        return (WhitespaceStep(' . '),)
+    elif multiplier > 1.1:  # Voz mais aguda: sem vírgulas nem pausas longas
+        return (SubStep(_HIGH_PITCH_RE, ' '),)
+    return ()
+
+
+def _fuse(steps):
+    fused = []
+    for step in steps:
+        if fused and isinstance(step, WhitespaceStep) and isinstance(fused[-1], WhitespaceStep):
+            fused[-1] = fused[-1].then(step)
+        else:
+            fused.append(step)
+    return tuple(fused)
+
+
+@lru_cache(maxsize=None)
+def get_text_pipeline(speed_option, voice_filter, pitch):
+    """
+    Retorna a sequência (já fundida) de passos para a combinação escolhida
+    """
+    return _fuse(
+        SPEED_STEPS.get(speed_option, ())
+        + FILTER_STEPS.get(voice_filter, ())
+        + pitch_steps(pitch)
+    )
+
+
+def run_steps(steps, text):
+    """
+    Aplica os passos em sequência
+    """
+    for step in steps:
+        text = step(text)
+    return text
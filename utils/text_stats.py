@@ -0,0 +1,358 @@
+"""
+Estatísticas do texto em uma única varredura
+
+`text_stats` retorna caracteres, palavras, sentenças, parágrafos,
+caracteres falados, chunks previstos e a duração estimada em todas as
+velocidades. A contagem é memorizada pelo hash do texto, então os reruns
+do Streamlit (a cada interação) não percorrem o texto de novo.
+
+Com NumPy, o texto vira um vetor de code points classificados por uma
+tabela (espaço, letra/dígito, ideograma, pontuação final) e todas as
+contagens saem de operações vetorizadas. `text_stats_batch` concatena
+vários documentos em um só vetor e separa as contagens por documento,
+para a conversão em lote. Sem NumPy, as mesmas regras são aplicadas com
+expressões regulares.
+
+Regras de contagem:
+    palavras     sequências sem espaço com ao menos uma letra ou dígito;
+                 em japonês e chinês, cada ideograma/kana conta como uma
+                 palavra (não há espaços entre palavras). O coreano separa
+                 palavras por espaços e segue a regra geral.
+    sentenças    trechos com letras ou dígitos entre pontuações finais
+                 (. ! ? seguidos de espaço, ou 。！？)
+    parágrafos   blocos separados por linha em branco
+    falados      letras, dígitos e ideogramas (ver utils/speech_rate.py)
+"""
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from config import LIMITS, SPEED_OPTIONS, TEXT_STATS_CONFIG
+from utils.audio_utils import count_chunks, PARAGRAPH_BREAK_RE
+from utils.metrics import metrics
+from utils.speech_rate import get_speech_rate_model
+
+try:
+    import numpy as np
+except ImportError:  # Dependência opcional
+    np = None
+
+# Ideogramas e kana (uma palavra por caractere); Hangul fica de fora
+CJK_RANGES = (
+    (0x3040, 0x30FF),    # Hiragana e katakana
+    (0x31F0, 0x31FF),    # Extensões fonéticas do katakana
+    (0x3400, 0x4DBF),    # Ideogramas, extensão A
+    (0x4E00, 0x9FFF),    # Ideogramas unificados
+    (0xF900, 0xFAFF),    # Ideogramas de compatibilidade
+    (0xFF66, 0xFF9F),    # Katakana de meia largura
+    (0x20000, 0x2FA1F),  # Ideogramas, extensões B em diante
+)
+SENTENCE_END_CHARS = '.!?'      # Fim de sentença quando seguidos de espaço
+CJK_SENTENCE_END_CHARS = '。！？｡'  # Fim de sentença sempre
+CLOSING_CHARS = '\'")]»”'       # Podem vir depois da pontuação final
+
+# Classes dos caracteres (bits)
+SPACE, WORD, CJK, SENTENCE_END, CJK_SENTENCE_END, CLOSING = 1, 2, 4, 8, 16, 32
+# Aspas/parênteses aceitos entre a pontuação e o espaço na versão vetorizada
+MAX_CLOSING = 3
+
+STATS_KEYS = ('chars', 'words', 'sentences', 'paragraphs', 'spoken_chars')
+
+_CJK_CLASS = ''.join(f'{re.escape(chr(start))}-{re.escape(chr(end))}'
+                     for start, end in CJK_RANGES)
+_CJK_WORD_RE = re.compile(rf'(?=[^\W_])[{_CJK_CLASS}]')
+_RUN_RE = re.compile(rf'[^\s{_CJK_CLASS}]+')
+_WORD_CHAR_RE = re.compile(r'[^\W_]')
+_SENTENCE_BOUNDARY_RE = re.compile(
+    rf'[{re.escape(SENTENCE_END_CHARS)}]+[{re.escape(CLOSING_CHARS)}]*(?=\s|$)'
+    rf'|[{CJK_SENTENCE_END_CHARS}]')
+
+# Separa os documentos na varredura em lote (quebra palavras e parágrafos)
+_DOCUMENT_SEPARATOR = '\n\n'
+
+
+def _char_flags(char):
+    code = ord(char)
+    flags = 0
+    if char.isspace():
+        flags |= SPACE
+    if char.isalnum():
+        flags |= WORD
+    if any(start <= code <= end for start, end in CJK_RANGES):
+        flags |= CJK
+    if char in SENTENCE_END_CHARS:
+        flags |= SENTENCE_END
+    if char in CJK_SENTENCE_END_CHARS:
+        flags |= CJK_SENTENCE_END
+    if char in CLOSING_CHARS:
+        flags |= CLOSING
+    return flags
+
+
+@lru_cache(maxsize=1)
+def _bmp_flags():
+    """
+    Tabela de classes dos 65.536 code points do plano básico
+    """
+    table = np.zeros(0x10000, dtype=np.uint8)
+    bmp = ''.join(map(chr, range(0x10000)))
+    # `\s` e `[^\W_]` equivalem a str.isspace e str.isalnum
+    for pattern, flag in ((r'\s', SPACE), (_WORD_CHAR_RE.pattern, WORD)):
+        table[[match.start() for match in re.finditer(pattern, bmp)]] |= flag
+    for start, end in CJK_RANGES:
+        table[start:min(end, 0xFFFF) + 1] |= CJK
+    for chars, flag in ((SENTENCE_END_CHARS, SENTENCE_END),
+                        (CJK_SENTENCE_END_CHARS, CJK_SENTENCE_END),
+                        (CLOSING_CHARS, CLOSING)):
+        table[[ord(char) for char in chars]] |= flag
+    return table
+
+
+def _classify(codes):
+    table = _bmp_flags()
+    if not codes.size or codes.max() < 0x10000:
+        return table[codes]
+
+    # Fora do plano básico (emoji, ideogramas raros): classificar cada valor distinto
+    flags = np.empty(codes.size, dtype=np.uint8)
+    bmp = codes < 0x10000
+    flags[bmp] = table[codes[bmp]]
+    values, inverse = np.unique(codes[~bmp], return_inverse=True)
+    flags[~bmp] = np.array([_char_flags(chr(v)) for v in values], dtype=np.uint8)[inverse]
+    return flags
+
+
+def _previous(mask):
+    shifted = np.empty_like(mask)
+    shifted[0] = False
+    shifted[1:] = mask[:-1]
+    return shifted
+
+
+def _scan_vectorized(text, starts):
+    """
+    Contagens de cada documento de `text` (documentos começam em `starts`)
+
+    Returns:
+        dict: Vetores com uma contagem por documento
+    """
+    documents = len(starts)
+    codes = np.frombuffer(text.encode('utf-32-le', 'surrogatepass'), dtype='<u4')
+    size = codes.size
+    counts = {key: np.zeros(documents, dtype=np.int64) for key in STATS_KEYS}
+    if not size:
+        return counts
+
+    flags = _classify(codes)
+    starts = np.asarray(starts)
+
+    def per_document(positions):
+        return np.bincount(np.searchsorted(starts, positions, 'right') - 1,
+                           minlength=documents)
+
+    space = (flags & SPACE) != 0
+    word = (flags & WORD) != 0
+    cjk = (flags & CJK) != 0
+    word_positions = np.flatnonzero(word)
+    counts['spoken_chars'] = per_document(word_positions)
+
+    # Palavras: sequências sem espaço e sem ideogramas que tenham letra/dígito,
+    # mais um por ideograma/kana
+    run = ~space & ~cjk
+    run_start = run & ~_previous(run)
+    run_ids = np.cumsum(run_start)
+    has_word = np.zeros(int(run_ids[-1]) + 1, dtype=bool)
+    has_word[run_ids[run & word]] = True
+    counts['words'] = (per_document(np.flatnonzero(run_start)[has_word[1:]])
+                       + per_document(np.flatnonzero(cjk & word)))
+
+    # Parágrafos: início do documento ou intervalo em branco com 2+ quebras de linha
+    non_space = np.flatnonzero(~space)
+    if non_space.size:
+        newlines = np.cumsum(codes == 10)
+        gap_newlines = newlines[non_space[1:]] - newlines[non_space[:-1]]
+        paragraph_starts = non_space[np.concatenate(([True], gap_newlines >= 2))]
+        counts['paragraphs'] = per_document(paragraph_starts)
+
+    # Sentenças: fronteiras (pontuação final) seguidas de alguma letra/dígito
+    # antes da próxima fronteira; o início de cada documento também é fronteira
+    ending = (flags & SENTENCE_END) != 0
+    closing = (flags & CLOSING) != 0
+    for _ in range(MAX_CLOSING):
+        ending = ((flags & SENTENCE_END) != 0) | (closing & _previous(ending))
+    followed_by_space = np.ones(size, dtype=bool)
+    followed_by_space[:-1] = space[1:]
+    boundaries = np.flatnonzero((ending & followed_by_space)
+                                | ((flags & CJK_SENTENCE_END) != 0))
+    boundaries = np.sort(np.concatenate((starts - 1, boundaries)))
+
+    if word_positions.size:
+        first_word = np.searchsorted(word_positions, boundaries, 'right')
+        next_boundary = np.append(boundaries[1:], size)
+        found = first_word < word_positions.size
+        first_word = word_positions[np.minimum(first_word, word_positions.size - 1)]
+        counts['sentences'] = per_document(first_word[found & (first_word < next_boundary)])
+
+    return counts
+
+
+def _scan_regex(text):
+    """
+    Mesmas contagens sem NumPy (um documento)
+    """
+    words = sum(1 for match in _RUN_RE.finditer(text) if _WORD_CHAR_RE.search(match.group()))
+    return {
+        'words': words + len(_CJK_WORD_RE.findall(text)),
+        'sentences': sum(1 for piece in _SENTENCE_BOUNDARY_RE.split(text)
+                         if _WORD_CHAR_RE.search(piece)),
+        'paragraphs': sum(1 for piece in PARAGRAPH_BREAK_RE.split(text) if piece.strip()),
+        'spoken_chars': len(_WORD_CHAR_RE.findall(text)),
+    }
+
+
+def _scan(texts):
+    """
+    Contagens de vários textos, em uma varredura quando há NumPy
+
+    Returns:
+        list: Um dicionário de contagens por texto
+    """
+    with metrics.timer('text_stats'):
+        if np is None:
+            results = [_scan_regex(text) for text in texts]
+        else:
+            starts = []
+            position = 0
+            for text in texts:
+                starts.append(position)
+                position += len(text) + len(_DOCUMENT_SEPARATOR)
+            counts = _scan_vectorized(_DOCUMENT_SEPARATOR.join(texts), starts)
+            results = [{key: int(counts[key][i]) for key in STATS_KEYS if key != 'chars'}
+                       for i in range(len(texts))]
+
+    for text, result in zip(texts, results):
+        result['chars'] = len(text)
+    return results
+
+
+_cache = OrderedDict()  # hash do texto -> contagens e chunks por tamanho
+_cache_lock = threading.Lock()
+
+
+def text_key(text):
+    """
+    Hash do texto usado na memorização
+    """
+    return hashlib.blake2b(text.encode('utf-8', 'surrogatepass'), digest_size=16).digest()
+
+
+def _cached(key):
+    with _cache_lock:
+        entry = _cache.get(key)
+        if entry is not None:
+            _cache.move_to_end(key)
+        return entry
+
+
+def _store(key, entry):
+    """
+    Memoriza a entrada; se outra thread já contou o mesmo texto, mantém e
+    retorna a dela (os chunks contados por cada uma ficam na mesma entrada)
+    """
+    with _cache_lock:
+        entry = _cache.setdefault(key, entry)
+        _cache.move_to_end(key)
+        while len(_cache) > TEXT_STATS_CONFIG['cache_entries']:
+            _cache.popitem(last=False)
+        return entry
+
+
+def clear_cache():
+    """
+    Esquece as contagens memorizadas (usado nos benchmarks)
+    """
+    with _cache_lock:
+        _cache.clear()
+
+
+def _finish(text, entry, language, chunk_size, voice_type, voice_filter):
+    """
+    Completa as contagens com chunks (memorizados por tamanho) e durações
+
+    A duração não é memorizada: a taxa de fala muda a cada áudio gerado.
+    """
+    # A entrada é compartilhada pelo cache: ler e gravar as contagens sob o
+    # lock, mas contar fora dele
+    with _cache_lock:
+        chunk_count = entry['chunks'].get(chunk_size)
+    if chunk_count is None:
+        chunk_count = count_chunks(text, chunk_size)
+        with _cache_lock:
+            entry['chunks'][chunk_size] = chunk_count
+
+    model = get_speech_rate_model()
+    durations = {}
+    for speed_option in SPEED_OPTIONS:
+        cps, _ = model.chars_per_second(language, voice_type, voice_filter, speed_option)
+        durations[speed_option] = entry['spoken_chars'] / cps
+
+    stats = {key: entry[key] for key in STATS_KEYS}
+    stats.update(chunks=chunk_count, chunk_size=chunk_size, durations=durations)
+    return stats
+
+
+def text_stats(text, language='pt', chunk_size=None, voice_type='feminina',
+               voice_filter='normal'):
+    """
+    Estatísticas do texto para a linha de métricas da interface
+
+    Returns:
+        dict: chars, words, sentences, paragraphs, spoken_chars, chunks,
+              chunk_size e durations ({velocidade: segundos})
+    """
+    chunk_size = chunk_size or LIMITS['chunk_size']
+    key = text_key(text)
+    entry = _cached(key)
+    if entry is None:
+        entry = _store(key, dict(_scan([text])[0], chunks={}))
+    return _finish(text, entry, language, chunk_size, voice_type, voice_filter)
+
+
+def text_stats_batch(texts, language='pt', chunk_size=None, voice_type='feminina',
+                     voice_filter='normal'):
+    """
+    Estatísticas de vários documentos (mesmo formato de `text_stats`)
+
+    Os documentos são lidos do iterável aos poucos e contados em grupos de
+    até `TEXT_STATS_CONFIG['batch_chars']` caracteres, cada grupo em uma
+    única varredura. Aceita um gerador para não manter todos na memória.
+
+    Returns:
+        list: Estatísticas na ordem dos documentos
+    """
+    chunk_size = chunk_size or LIMITS['chunk_size']
+    results = []
+    group = []
+    group_chars = 0
+
+    def flush():
+        keys = [text_key(text) for text in group]
+        entries = {key: _cached(key) for key in keys}
+        missing = {key: text for key, text in zip(keys, group) if entries[key] is None}
+        for (key, text), counts in zip(missing.items(), _scan(list(missing.values()))):
+            entries[key] = _store(key, dict(counts, chunks={}))
+        for key, text in zip(keys, group):
+            results.append(_finish(text, entries[key], language, chunk_size,
+                                   voice_type, voice_filter))
+        group.clear()
+
+    for text in texts:
+        group.append(text)
+        group_chars += len(text)
+        if group_chars >= TEXT_STATS_CONFIG['batch_chars']:
+            flush()
+            group_chars = 0
+    if group:
+        flush()
+    return results